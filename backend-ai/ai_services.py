@@ -1,138 +1,268 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+import asyncio
+import json
 import logging
 from startup_data_analyzer import startup_analyzer
-from openai import OpenAI
+from llm_batching import MicroBatcher
+from category_shortlist import CategoryShortlister
+from category_keywords import category_keyword_matcher
+from scoring_executor import scoring_executor
+from near_duplicates import description_index
+from llm_providers import is_rate_limit_error, llm_router
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+UNIQUENESS_RUBRIC = """
+            Rate the uniqueness on a scale from 0-100 where:
+            - 0-30: Common, saturated market with many similar solutions
+            - 31-60: Moderate uniqueness, some differentiation but not groundbreaking
+            - 61-80: Good uniqueness, clear differentiation and innovation
+            - 81-100: Exceptional uniqueness, highly innovative and rare approach
+            
+            Consider factors like:
+            - Innovation in approach
+            - Market differentiation
+            - Technology novelty
+            - Solution creativity
+"""
+
 class AIAnalyzer:
     def __init__(self):
         self.data_analyzer = startup_analyzer
-        try:
-            self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
-        except Exception as e:
-            logger.warning(f"Failed to initialize OpenAI client: {str(e)}")
-            self.openai_client = None
+        self.llm_router = llm_router
+        
+        # Answers served from fallbacks instead of a model reply: kind -> cause -> count
+        self.degradations: Dict[str, Dict[str, int]] = {}
+        
+        # Category pre-ranker, built lazily over the dataset vocabulary
+        self._shortlister = None
+        self._shortlister_source = None
         
-    async def analyze_project_risk(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Concurrent uniqueness requests are grouped into a single completion
+        self.uniqueness_batcher = MicroBatcher(
+            self._score_description_batch,
+            max_batch_size=settings.UNIQUENESS_BATCH_MAX_SIZE,
+            max_wait_ms=settings.UNIQUENESS_BATCH_MAX_WAIT_MS
+        )
+        
+    async def analyze_project_risk(self, startup_data: Dict[str, Any], determined_category: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze startup risk using category and funding patterns
         """
         try:
-            # Determine the best matching category using AI
-            user_category = startup_data.get('category', '')
-            description = startup_data.get('description', '')
-            determined_category = await self.determine_best_category(user_category, description)
+            updated_startup_data = await self._with_determined_category(startup_data, determined_category)
             
-            # Update startup data with determined category
-            updated_startup_data = startup_data.copy()
-            updated_startup_data['category'] = determined_category
-            updated_startup_data['original_category'] = user_category
-            
-            logger.info(f"Risk analysis: '{user_category}' → '{determined_category}'")
-            return self.data_analyzer.calculate_risk_score(updated_startup_data)
+            logger.info(f"Risk analysis: '{updated_startup_data['original_category']}' → '{updated_startup_data['category']}'")
+            return await scoring_executor.run('calculate_risk_score', updated_startup_data)
         except Exception as e:
             logger.error(f"Error in data-driven risk analysis: {str(e)}")
+            self._record_degradation('risk_fallback', e)
             return self._get_fallback_risk_analysis()
     
-    async def analyze_market_size(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_market_size(self, startup_data: Dict[str, Any], determined_category: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze market size using category funding patterns and investment trends
         """
         try:
-            # Determine the best matching category using AI
-            user_category = startup_data.get('category', '')
-            description = startup_data.get('description', '')
-            determined_category = await self.determine_best_category(user_category, description)
+            updated_startup_data = await self._with_determined_category(startup_data, determined_category)
+            determined_category = updated_startup_data['category']
             
-            # Update startup data with determined category
-            updated_startup_data = startup_data.copy()
-            updated_startup_data['category'] = determined_category
-            updated_startup_data['original_category'] = user_category
-            
-            logger.info(f"Market analysis: '{user_category}' → '{determined_category}'")
+            logger.info(f"Market analysis: '{updated_startup_data['original_category']}' → '{determined_category}'")
             
             # Add debug logging to see what's happening
-            result = self.data_analyzer.calculate_market_size(updated_startup_data)
+            result = await scoring_executor.run('calculate_market_size', updated_startup_data)
             logger.info(f"Market size result for '{determined_category}': {result}")
             
             return result
         except Exception as e:
             logger.error(f"Error in data-driven market analysis: {str(e)}")
+            self._record_degradation('market_fallback', e)
             return self._get_fallback_market_analysis()
     
-    async def analyze_originality(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_originality(
+        self,
+        startup_data: Dict[str, Any],
+        determined_category: Optional[str] = None,
+        ai_score: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Analyze startup originality using category frequency and AI description analysis
         """
         try:
-            # Determine the best matching category using AI
             user_category = startup_data.get('category', '')
             description = startup_data.get('description', '')
-            determined_category = await self.determine_best_category(user_category, description)
             
-            # Update startup data with determined category
-            updated_startup_data = startup_data.copy()
-            updated_startup_data['category'] = determined_category
-            updated_startup_data['original_category'] = user_category
+            # One completion for both category and uniqueness when neither is known yet
+            fused_result = None
+            if determined_category is None and ai_score is None and settings.FUSED_ORIGINALITY_ENABLED:
+                fused_result = await self.determine_category_and_uniqueness(user_category, description)
+            
+            if fused_result:
+                determined_category, ai_score = fused_result
+            elif ai_score is None:
+                # Get AI description analysis score
+                ai_score = await self.analyze_description_uniqueness(description)
+            
+            updated_startup_data = await self._with_determined_category(startup_data, determined_category)
             
-            # Get AI description analysis score
-            ai_score = await self.analyze_description_uniqueness(description)
+            # Near-duplicate lookup runs here, so the index is shared by every scoring worker.
+            # Analyses only look up; descriptions are added with the platform records
+            near_duplicates = []
+            if settings.NEAR_DUPLICATE_ENABLED:
+                near_duplicates = await asyncio.to_thread(
+                    description_index.find, description, startup_data.get('startup_name')
+                )
             
-            logger.info(f"Originality analysis: '{user_category}' → '{determined_category}'")
+            logger.info(f"Originality analysis: '{user_category}' → '{updated_startup_data['category']}'")
             # Calculate originality with AI score
-            return self.data_analyzer.calculate_originality(updated_startup_data, ai_score)
+            return await scoring_executor.run('calculate_originality', updated_startup_data, ai_score, near_duplicates)
         except Exception as e:
             logger.error(f"Error in data-driven originality analysis: {str(e)}")
+            self._record_degradation('originality_fallback', e)
             return self._get_fallback_originality_analysis()
     
+    async def analyze_all_stream(self, startup_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run risk, market and originality analysis, yielding each result as soon as it is ready.
+        
+        The category is resolved once and shared. The description uniqueness score does not
+        depend on the category, so it is requested concurrently with category resolution.
+        
+        Yields:
+            ("risk" | "market" | "originality", analysis dict) tuples
+        """
+        description = startup_data.get('description', '')
+        uniqueness_task = asyncio.ensure_future(self.analyze_description_uniqueness(description))
+        try:
+            determined_category = await self.determine_best_category(startup_data.get('category', ''), description)
+            
+            yield "risk", await self.analyze_project_risk(startup_data, determined_category)
+            yield "market", await self.analyze_market_size(startup_data, determined_category)
+            
+            ai_score = await uniqueness_task
+            yield "originality", await self.analyze_originality(startup_data, determined_category, ai_score)
+        finally:
+            if not uniqueness_task.done():
+                uniqueness_task.cancel()
+    
+    async def _with_determined_category(self, startup_data: Dict[str, Any], determined_category: Optional[str] = None) -> Dict[str, Any]:
+        """Copy of startup data with the dataset category resolved (using AI unless already known)"""
+        user_category = startup_data.get('category', '')
+        if determined_category is None:
+            # Determine the best matching category using AI
+            determined_category = await self.determine_best_category(user_category, startup_data.get('description', ''))
+        
+        # Update startup data with determined category
+        updated_startup_data = startup_data.copy()
+        updated_startup_data['category'] = determined_category
+        updated_startup_data['original_category'] = user_category
+        return updated_startup_data
+    
     async def analyze_description_uniqueness(self, description: str) -> float:
         """
-        Analyze description uniqueness using OpenAI
+        Analyze description uniqueness using the LLM providers
         Returns a score from 0-100 indicating how unique the description is
         """
-        if not self.openai_client:
-            logger.warning("OpenAI client not initialized - returning default uniqueness score")
+        if not self.llm_router.available:
+            logger.warning("No LLM provider configured - returning default uniqueness score")
+            self._record_degradation('uniqueness_default')
             return 60.0
         
+        if not settings.UNIQUENESS_BATCH_ENABLED:
+            return await self._score_description_single(description)
+        
+        try:
+            return await self.uniqueness_batcher.submit(description)
+        except Exception as e:
+            logger.error(f"Error in batched description analysis: {str(e)}")
+            self._record_degradation('uniqueness_default', e)
+            return 60.0  # Default score on error
+    
+    async def _score_description_single(self, description: str) -> float:
+        """Score one description with its own completion"""
         try:
             prompt = f"""
             Analyze the following startup description for uniqueness and innovation:
             
             "{description}"
-            
-            Rate the uniqueness on a scale from 0-100 where:
-            - 0-30: Common, saturated market with many similar solutions
-            - 31-60: Moderate uniqueness, some differentiation but not groundbreaking
-            - 61-80: Good uniqueness, clear differentiation and innovation
-            - 81-100: Exceptional uniqueness, highly innovative and rare approach
-            
-            Consider factors like:
-            - Innovation in approach
-            - Market differentiation
-            - Technology novelty
-            - Solution creativity
-            
+            {UNIQUENESS_RUBRIC}
             Respond with only a number (0-100).
             """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await self.llm_router.complete(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=10,
                 temperature=0.3
             )
             
-            score_text = response.choices[0].message.content.strip()
+            score_text = response.strip()
             score = float(score_text)
             return max(0, min(100, score))
             
         except Exception as e:
-            logger.error(f"Error in OpenAI description analysis: {str(e)}")
+            logger.error(f"Error in AI description analysis: {str(e)}")
+            self._record_degradation('uniqueness_default', e)
             return 60.0  # Default score on error
+    
+    async def _score_description_batch(self, descriptions: List[str]) -> List[float]:
+        """
+        Score several descriptions with one completion returning a JSON array.
+        Falls back to one completion per description if the reply cannot be used.
+        """
+        if len(descriptions) == 1:
+            return [await self._score_description_single(descriptions[0])]
+        
+        numbered = "\n".join(f"{i + 1}. {json.dumps(d, ensure_ascii=False)}" for i, d in enumerate(descriptions))
+        prompt = f"""
+            Analyze each of the following {len(descriptions)} startup descriptions for uniqueness and innovation:
+            
+            {numbered}
+            {UNIQUENESS_RUBRIC}
+            Respond with only a JSON array of {len(descriptions)} numbers (0-100), one per description, in the same order.
+            """
+        
+        try:
+            response = await self.llm_router.complete(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=8 * len(descriptions) + 10,
+                temperature=0.3
+            )
+            scores = json.loads(response.strip())
+            if not isinstance(scores, list) or len(scores) != len(descriptions):
+                raise ValueError(f"expected {len(descriptions)} scores, got {scores!r}")
+            return [max(0, min(100, float(score))) for score in scores]
+        except Exception as e:
+            logger.warning(f"Batched uniqueness scoring failed, scoring individually: {str(e)}")
+            return list(await asyncio.gather(*[
+                self._score_description_single(description) for description in descriptions
+            ]))
 
     
+    def _record_degradation(self, kind: str, error: Optional[BaseException] = None):
+        """
+        Count an answer served from a fallback, by cause: no_provider, rate_limited (provider
+        429 or client-side throttle), invalid_reply (unusable model output) or error
+        """
+        if error is None:
+            cause = 'no_provider'
+        elif is_rate_limit_error(error):
+            cause = 'rate_limited'
+        elif isinstance(error, ValueError):
+            cause = 'invalid_reply'
+        else:
+            cause = 'error'
+        
+        causes = self.degradations.setdefault(kind, {})
+        causes[cause] = causes.get(cause, 0) + 1
+    
+    def get_degradation_stats(self) -> Dict[str, Any]:
+        """Fallback answer counters by kind and cause, with per-kind totals"""
+        return {
+            kind: {'total': sum(causes.values()), **causes}
+            for kind, causes in sorted(self.degradations.items())
+        }
+    
     def _get_fallback_risk_analysis(self) -> Dict[str, Any]:
         """Fallback risk analysis when AI fails"""
         return {
@@ -174,32 +304,16 @@ class AIAnalyzer:
         Returns:
             Best matching category from the dataset
         """
-        if not self.openai_client:
-            logger.warning("OpenAI client not initialized - using fallback category matching")
+        if not self.llm_router.available:
+            logger.warning("No LLM provider configured - using fallback category matching")
+            self._record_degradation('category_fallback')
             return self._fallback_category_matching(user_category)
         
         try:
             # Get all available categories from dataset
             available_categories = self.data_analyzer.get_all_categories_for_matching()
             
-            # Filter for simpler categories (prefer single-word or simple categories)
-            simple_categories = []
-            complex_categories = []
-            
-            for cat in available_categories:
-                if '|' in cat:
-                    # Count pipe separators - prefer categories with fewer separators
-                    pipe_count = cat.count('|')
-                    if pipe_count <= 2:  # Allow some complexity but not too much
-                        complex_categories.append(cat)
-                else:
-                    simple_categories.append(cat)
-            
-            # Prefer simple categories, but include some complex ones for coverage
-            preferred_categories = simple_categories[:30] + complex_categories[:20]
-            
-            if len(preferred_categories) > 50:
-                preferred_categories = preferred_categories[:50]
+            preferred_categories = self._select_prompt_categories(available_categories, user_category, description)
             
             categories_text = ", ".join(preferred_categories)
             
@@ -226,14 +340,13 @@ class AIAnalyzer:
             Do not add any explanation or additional text.
             """
             
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = await self.llm_router.complete(
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=30,
                 temperature=0.1  # Low temperature for consistent categorization
             )
             
-            determined_category = response.choices[0].message.content.strip()
+            determined_category = response.strip()
             
             # Validate that the returned category is in our available categories
             if determined_category in available_categories:
@@ -241,117 +354,136 @@ class AIAnalyzer:
                 return determined_category
             else:
                 logger.warning(f"AI returned invalid category: '{determined_category}', using fallback")
+                self._record_degradation('category_fallback', ValueError(determined_category))
                 return self._fallback_category_matching(user_category)
                 
         except Exception as e:
             logger.error(f"Error in AI category determination: {str(e)}")
+            self._record_degradation('category_fallback', e)
             return self._fallback_category_matching(user_category)
     
-    def _fallback_category_matching(self, user_category: str) -> str:
+    async def determine_category_and_uniqueness(self, user_category: str, description: str) -> Optional[Tuple[str, float]]:
         """
-        Fallback category matching using simple keyword matching
+        Determine the dataset category and the description uniqueness score with a single
+        structured-JSON completion.
+        
+        Returns:
+            (category, uniqueness score) tuple, or None if the client is unavailable or the
+            reply fails validation - callers then fall back to the separate calls
         """
-        user_cat_lower = user_category.lower()
+        if not self.llm_router.available:
+            return None
         
-        # Enhanced category mappings with Turkish support
-        category_mappings = {
-            # AI and Technology
-            'ai': 'Artificial Intelligence',
-            'artificial intelligence': 'Artificial Intelligence',
-            'machine learning': 'Artificial Intelligence',
-            'yapay zeka': 'Artificial Intelligence',
-            
-            # Healthcare
-            'healthcare': 'Healthcare',
-            'health': 'Healthcare',
-            'medical': 'Healthcare',
-            'sağlık': 'Healthcare',
-            'tıp': 'Healthcare',
-            'biotech': 'Biotechnology',
-            'biotechnology': 'Biotechnology',
-            
-            # Finance
-            'finance': 'Finance',
-            'financial': 'Finance',
-            'fintech': 'Finance',
-            'banking': 'Finance',
-            'finansal': 'Finance',
-            'bankacılık': 'Finance',
-            
-            # Education
-            'education': 'Education',
-            'learning': 'Education',
-            'eğitim': 'Education',
-            'öğrenim': 'Education',
-            
-            # Technology
-            'tech': 'Technology',
-            'technology': 'Technology',
-            'teknoloji': 'Technology',
-            'software': 'Software',
-            'yazılım': 'Software',
-            'mobile': 'Mobile',
-            'mobil': 'Mobile',
-            'internet': 'Internet',
-            
-            # E-commerce
-            'ecommerce': 'E-commerce',
-            'e-commerce': 'E-commerce',
-            'retail': 'E-commerce',
-            'perakende': 'E-commerce',
-            'satış': 'E-commerce',
-            
-            # Gaming and Entertainment
-            'gaming': 'Games',
-            'games': 'Games',
-            'oyun': 'Games',
-            'entertainment': 'Entertainment',
-            'eğlence': 'Entertainment',
-            
-            # Media and Social
-            'media': 'Media',
-            'medya': 'Media',
-            'social': 'Social Media',
-            'sosyal': 'Social Media',
-            'sosyal medya': 'Social Media',
-            'social media': 'Social Media',
-            
-            # Energy and Environment
-            'energy': 'Energy',
-            'enerji': 'Energy',
-            'clean': 'Clean Technology',
-            'temiz': 'Clean Technology',
-            'green': 'Clean Technology',
-            'yeşil': 'Clean Technology',
-            'renewable': 'Clean Technology',
-            'yenilenebilir': 'Clean Technology',
-            'solar': 'Clean Technology',
-            'güneş': 'Clean Technology',
-            
-            # Transportation
-            'transportation': 'Transportation',
-            'transport': 'Transportation',
-            'ulaşım': 'Transportation',
-            'taşımacılık': 'Transportation',
-            
-            # Food and Agriculture
-            'food': 'Food and Beverage',
-            'yemek': 'Food and Beverage',
-            'agriculture': 'Agriculture',
-            'tarım': 'Agriculture',
-            
-            # Apps and Mobile
-            'app': 'Apps',
-            'apps': 'Apps',
-            'uygulama': 'Apps',
-            'platform': 'Software'
-        }
+        try:
+            available_categories = self.data_analyzer.get_all_categories_for_matching()
+            categories_text = ", ".join(
+                self._select_prompt_categories(available_categories, user_category, description)
+            )
+            
+            prompt = f"""
+            You are a startup analyst. Given a user's category input and project description, do two things:
+            
+            1. Choose the best matching category from the available dataset categories.
+               PREFER SIMPLER categories over complex pipe-separated ones when possible.
+            2. Rate the uniqueness and innovation of the description.
+            {UNIQUENESS_RUBRIC}
+            User's Category Input: "{user_category}"
+            Project Description: "{description}"
+            
+            Available Categories from Dataset:
+            {categories_text}
+            
+            Respond with only a JSON object of the form
+            {{"category": "<exact category name from the available list>", "uniqueness": <number 0-100>}}
+            """
+            
+            response = await self.llm_router.complete(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=60,
+                temperature=0.1,
+                json_mode=True
+            )
+            
+            result = json.loads(response)
+            category = str(result.get('category', '')).strip()
+            uniqueness = float(result['uniqueness'])
+            
+            if category not in available_categories:
+                raise ValueError(f"invalid category '{category}'")
+            if not 0 <= uniqueness <= 100:
+                raise ValueError(f"uniqueness out of range: {uniqueness}")
+            
+            logger.info(f"Fused analysis determined category: '{category}', uniqueness: {uniqueness}")
+            return category, uniqueness
+            
+        except Exception as e:
+            logger.warning(f"Fused category/uniqueness analysis failed, using separate calls: {str(e)}")
+            return None
+    
+    def _select_prompt_categories(self, available_categories: List[str], user_category: str, description: str) -> List[str]:
+        """
+        Pick the subset of dataset categories that is offered to the model.
         
-        # Try to find matching category
-        for keyword, category in category_mappings.items():
-            if keyword in user_cat_lower:
-                logger.info(f"Fallback matched '{user_category}' to '{category}'")
-                return category
+        Candidates come from the local shortlister ranked against the user's input, plus the
+        keyword-matched fallback category. Remaining slots are padded with the default
+        simple-first selection so the prompt is never empty.
+        """
+        limit = settings.CATEGORY_SHORTLIST_SIZE
+        shortlister = self._get_shortlister(available_categories)
+        candidates = shortlister.shortlist(f"{user_category} {description}", k=limit)
+        
+        keyword_category = self._fallback_category_matching(user_category)
+        if keyword_category in shortlister.category_set and keyword_category not in candidates:
+            candidates = [keyword_category] + candidates[:limit - 1]
+        
+        if len(candidates) < limit:
+            for cat in self._default_prompt_categories(available_categories):
+                if cat not in candidates:
+                    candidates.append(cat)
+                    if len(candidates) >= limit:
+                        break
+        
+        return candidates
+    
+    def _get_shortlister(self, available_categories: List[str]) -> CategoryShortlister:
+        """Shortlister over the current category vocabulary, rebuilt only when it changes"""
+        if self._shortlister is None or self._shortlister_source is not available_categories:
+            self._shortlister = CategoryShortlister(available_categories)
+            self._shortlister_source = available_categories
+        return self._shortlister
+    
+    def _default_prompt_categories(self, available_categories: List[str]) -> List[str]:
+        """Position-based selection used to pad the shortlist"""
+        # Filter for simpler categories (prefer single-word or simple categories)
+        simple_categories = []
+        complex_categories = []
+        
+        for cat in available_categories:
+            if '|' in cat:
+                # Count pipe separators - prefer categories with fewer separators
+                pipe_count = cat.count('|')
+                if pipe_count <= 2:  # Allow some complexity but not too much
+                    complex_categories.append(cat)
+            else:
+                simple_categories.append(cat)
+        
+        # Prefer simple categories, but include some complex ones for coverage
+        preferred_categories = simple_categories[:30] + complex_categories[:20]
+        
+        if len(preferred_categories) > 50:
+            preferred_categories = preferred_categories[:50]
+        
+        return preferred_categories
+    
+    def _fallback_category_matching(self, user_category: str) -> str:
+        """
+        Fallback category matching using weighted Turkish/English keyword matching
+        (see category_keywords.CATEGORY_KEYWORDS)
+        """
+        category = category_keyword_matcher.best_category(user_category)
+        if category:
+            logger.info(f"Fallback matched '{user_category}' to '{category}'")
+            return category
         
         # Default fallback
         logger.info(f"No match found for '{user_category}', using 'Technology' as default")
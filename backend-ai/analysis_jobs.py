@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_COMPLETED = "completed"
+JOB_STATUS_FAILED = "failed"
+
+class AnalysisJobStore:
+    """SQLite persistence for analysis jobs and their results"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+
+    def create(self, job_id: str, kind: str, priority: int, payload: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO analysis_jobs (id, kind, status, priority, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_STATUS_QUEUED, priority, json.dumps(payload), datetime.now().isoformat())
+            )
+
+    def mark_running(self, job_id: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE analysis_jobs SET status = ?, started_at = ? WHERE id = ?",
+                (JOB_STATUS_RUNNING, datetime.now().isoformat(), job_id)
+            )
+
+    def mark_finished(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        status = JOB_STATUS_FAILED if error else JOB_STATUS_COMPLETED
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE analysis_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, datetime.now().isoformat(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def get_unfinished(self):
+        """Jobs that were queued or running when the service last stopped"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, priority, payload FROM analysis_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+            ).fetchall()
+        return [(row['id'], row['kind'], row['priority'], json.loads(row['payload'])) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class AnalysisJobQueue:
+    """
+    Bounded priority queue of analysis jobs drained by a fixed pool of async workers.
+
+    Higher priority values run first; jobs with equal priority run in submission order.
+    Every state change is written to the job store, so results can be fetched after the
+    job finishes and unfinished jobs are re-queued on the next start. Recovered jobs that
+    do not fit in the queue wait in a backlog and take the slots freed by the workers.
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        store: AnalysisJobStore,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+    ):
+        self.run_job = run_job
+        self.store = store
+        self.worker_count = max(1, workers)
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._recovered = deque()
+
+    async def start(self):
+        """Start the workers and re-queue jobs left unfinished by a previous run"""
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        # Unfinished jobs come back highest priority first, so the backlog keeps the queue's order
+        unfinished = sorted(self.store.get_unfinished(), key=lambda job: -job[2])
+        self._recovered = deque(
+            (-priority, next(self._sequence), job_id, kind, payload)
+            for job_id, kind, priority, payload in unfinished
+        )
+        self._refill()
+
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(
+            f"Analysis job queue started: {self.worker_count} workers, {len(unfinished)} jobs recovered"
+            f" ({len(self._recovered)} waiting for a free slot)"
+        )
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0) -> str:
+        """
+        Queue a job and return its id.
+
+        Raises:
+            asyncio.QueueFull: if the queue is at capacity
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+        if self._queue.full():
+            raise asyncio.QueueFull()
+
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, kind, priority, payload)
+        self._queue.put_nowait((-priority, next(self._sequence), job_id, kind, payload))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def queue_depth(self) -> int:
+        return (self._queue.qsize() if self._queue is not None else 0) + len(self._recovered)
+
+    def _refill(self):
+        """Move recovered jobs into the queue while it has free slots"""
+        while self._recovered and not self._queue.full():
+            self._queue.put_nowait(self._recovered.popleft())
+
+    async def _worker(self, worker_id: int):
+        while True:
+            _, _, job_id, kind, payload = await self._queue.get()
+            # Claim the freed slot for a recovered job before a new submission can take it
+            self._refill()
+            try:
+                self.store.mark_running(job_id)
+                result = await self.run_job(kind, payload)
+                self.store.mark_finished(job_id, result=result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis job {job_id} failed in worker {worker_id}: {str(e)}")
+                self.store.mark_finished(job_id, error=str(e))
+            finally:
+                self._queue.task_done()
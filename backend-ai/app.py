@@ -1,10 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Literal
 import uvicorn
 from datetime import datetime
+import asyncio
+import gzip
+import hashlib
+import json
 import logging
+from config import settings
+from analysis_jobs import AnalysisJobQueue, AnalysisJobStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +37,13 @@ class StartupAnalysisInput(BaseModel):
     startup_name: str
     category: str  # Any category description - AI will match to dataset categories
     description: str
+    country_code: Optional[str] = None  # ISO 3166-1 alpha-3, e.g. "TUR", "USA"
+    founded_year: Optional[int] = None
+    funding_total_usd: Optional[float] = None  # Funding raised so far, in USD
+    funding_rounds: Optional[int] = None  # Input of the success model only; ignored when SUCCESS_MODEL_ENABLED=false
+    # Which outcomes count as success in the statistics (see SUCCESS_DEFINITIONS_ENABLED);
+    # default "including_operating"
+    success_definition: Optional[str] = None
     
 class AnalysisResponse(BaseModel):
     percentage: float
@@ -50,6 +64,123 @@ class OriginalityResponse(AnalysisResponse):
     originality_level: str  # "Low", "Medium", "High"
     similar_projects: List[str]
 
+class CategoryListResponse(BaseModel):
+    categories: List[str]
+
+class InvestmentCurveResponse(BaseModel):
+    category: str
+    matched_categories: int
+    years: List[int]
+    investments: List[int]  # Companies first funded in each year
+    cumulative: List[int]
+    trend: float  # Share of fundings since since_year (or the default recency windows)
+
+class CohortCurvesResponse(BaseModel):
+    category: str
+    matched_categories: int
+    years: List[int]  # Founding years
+    companies: List[int]  # Companies founded in each year
+    success_rate: List[Optional[float]]  # Percent of each founding cohort that succeeded
+    funding_delay_days: List[int]  # Lower edge of each time-to-first-funding bin, in days
+    funding_delay_companies: List[int]
+    funded_within_share: List[float]  # Percent first funded before the next bin edge
+
+class CategoryRankItem(BaseModel):
+    rank: int
+    category: str
+    count: int  # Companies in the category
+    success_rate: float
+    risk: float
+    market_size: float
+    funding_total: float  # Total funding raised, USD
+    trend: float
+    uniqueness: float
+
+class CategoryRankResponse(BaseModel):
+    sort_by: str
+    order: str
+    offset: int
+    limit: int
+    total: int  # Ranked categories
+    items: List[CategoryRankItem]
+
+class PlatformRecord(BaseModel):
+    """A platform project (Prisma Project plus its accepted SponsorYatirim rows) as a dataset record"""
+    record_id: str  # Stable id, e.g. "project-42"; re-sending it replaces the earlier version
+    name: Optional[str] = None  # projeAdi
+    category: str  # projeKonusu
+    status: str = "operating"
+    funding_total_usd: float = 0  # Sum of yatirimMiktari
+    funding_rounds: Optional[int] = None  # Number of investments
+    country_code: Optional[str] = None
+    founded_year: Optional[int] = None  # takimKurulusYili
+    first_funding_at: Optional[datetime] = None  # Earliest yatirimTarihi
+    description: Optional[str] = None  # projeAciklamasi; indexed for near-duplicate detection
+    deleted: bool = False
+
+class PlatformRecordsRequest(BaseModel):
+    records: List[PlatformRecord]
+
+class PlatformRecordsResponse(BaseModel):
+    created: int
+    updated: int
+    removed: int
+    new_categories: int
+    dataset_version: int
+
+class AnalysisJobRequest(BaseModel):
+    analysis: Literal["risk", "market", "originality", "all"] = "all"
+    priority: int = 0  # Higher runs first
+    input: StartupAnalysisInput
+
+class AnalysisJobResponse(BaseModel):
+    job_id: str
+    analysis: str
+    status: str  # "queued", "running", "completed", "failed"
+    priority: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+async def run_analysis_job(kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one queued analysis job; the result maps analysis name to its response"""
+    from ai_services import ai_analyzer
+    
+    startup_data = StartupAnalysisInput(**payload)
+    if kind == "all":
+        return {
+            analysis: RESPONSE_BUILDERS[analysis](result).model_dump(mode="json")
+            async for analysis, result in ai_analyzer.analyze_all_stream(startup_data.dict())
+        }
+    
+    analyzers = {
+        "risk": analyze_risk_factors,
+        "market": analyze_market_size,
+        "originality": analyze_originality,
+    }
+    result = await analyzers[kind](startup_data)
+    return {kind: RESPONSE_BUILDERS[kind](result).model_dump(mode="json")}
+
+job_queue = AnalysisJobQueue(
+    run_analysis_job,
+    AnalysisJobStore(settings.JOB_DB_PATH),
+    workers=settings.JOB_WORKERS,
+    max_queue_size=settings.JOB_QUEUE_MAXSIZE
+)
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await job_queue.stop()
+    
+    from scoring_executor import scoring_executor
+    scoring_executor.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Project Analysis API", "version": "1.0.0"}
@@ -66,31 +197,11 @@ async def calculate_risk(startup_data: StartupAnalysisInput):
     """
     try:
         # Validate input
-        if not startup_data.startup_name.strip():
-            raise HTTPException(status_code=400, detail="Startup name is required")
-        if not startup_data.category.strip():
-            raise HTTPException(status_code=400, detail="Category is required")
-        if not startup_data.description.strip():
-            raise HTTPException(status_code=400, detail="Description is required")
+        validate_startup_input(startup_data)
         
         # Calculate risk
         risk_factors = await analyze_risk_factors(startup_data)
-        risk_percentage = calculate_risk_percentage(risk_factors)
-        
-        # Round risk categories values
-        risk_categories = risk_factors.get("categories", {})
-        rounded_risk_categories = {k: round(v) if isinstance(v, (int, float)) else v 
-                                  for k, v in risk_categories.items()}
-        
-        return RiskAnalysisResponse(
-            percentage=risk_percentage,
-            confidence_score=round(risk_factors.get("confidence_score", 85.0)),
-            factors=risk_factors.get("factors", []),
-            recommendations=risk_factors.get("recommendations", []),
-            analysis_date=datetime.now(),
-            risk_level=determine_risk_level(risk_percentage),
-            risk_categories=rounded_risk_categories
-        )
+        return build_risk_response(risk_factors)
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
@@ -109,25 +220,10 @@ async def calculate_market_size(startup_data: StartupAnalysisInput):
     """
     try:
         # Validate input
-        if not startup_data.startup_name.strip():
-            raise HTTPException(status_code=400, detail="Startup name is required")
-        if not startup_data.category.strip():
-            raise HTTPException(status_code=400, detail="Category is required")
-        if not startup_data.description.strip():
-            raise HTTPException(status_code=400, detail="Description is required")
+        validate_startup_input(startup_data)
         
         market_analysis = await analyze_market_size(startup_data)
-        market_percentage = calculate_market_percentage(market_analysis)
-        
-        return MarketSizeResponse(
-            percentage=market_percentage,
-            confidence_score=round(market_analysis.get("confidence_score", 78.0)),
-            factors=market_analysis.get("factors", []),
-            recommendations=market_analysis.get("recommendations", []),
-            analysis_date=datetime.now(),
-            market_potential=determine_market_potential(market_percentage),
-            growth_rate=round(market_analysis.get("growth_rate", 10.0))
-        )
+        return build_market_response(market_analysis)
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
@@ -147,32 +243,313 @@ async def calculate_originality(startup_data: StartupAnalysisInput):
     """
     try:
         # Validate input
-        if not startup_data.startup_name.strip():
-            raise HTTPException(status_code=400, detail="Startup name is required")
-        if not startup_data.category.strip():
-            raise HTTPException(status_code=400, detail="Category is required")
-        if not startup_data.description.strip():
-            raise HTTPException(status_code=400, detail="Description is required")
+        validate_startup_input(startup_data)
         
         originality_analysis = await analyze_originality(startup_data)
-        originality_percentage = calculate_originality_percentage(originality_analysis)
-        
-        return OriginalityResponse(
-            percentage=originality_percentage,
-            confidence_score=round(originality_analysis.get("confidence_score", 82.0)),
-            factors=originality_analysis.get("factors", []),
-            recommendations=originality_analysis.get("recommendations", []),
-            analysis_date=datetime.now(),
-            originality_level=determine_originality_level(originality_percentage),
-            similar_projects=originality_analysis.get("similar_projects", [])
-        )
+        return build_originality_response(originality_analysis)
     except HTTPException:
         raise  # Re-raise HTTP exceptions
     except Exception as e:
         logger.error(f"Error in originality calculation: {str(e)}")
         raise HTTPException(status_code=500, detail="Originality calculation failed")
 
+@app.post("/analyze/stream")
+async def analyze_stream(startup_data: StartupAnalysisInput):
+    """
+    Run risk, market size and originality analysis in one request and stream the results
+    as newline-delimited JSON, each line emitted as soon as that analysis is ready.
+    
+    The category is resolved once for all three analyses. Each line has the form
+    {"analysis": "risk" | "market" | "originality", "result": {...}}, where result matches
+    the /riskcalc, /marketsize or /originality response.
+    """
+    validate_startup_input(startup_data)
+    
+    from ai_services import ai_analyzer
+    
+    async def result_lines():
+        try:
+            async for analysis, result in ai_analyzer.analyze_all_stream(startup_data.dict()):
+                response = RESPONSE_BUILDERS[analysis](result)
+                yield json.dumps({"analysis": analysis, "result": response.model_dump(mode="json")}) + "\n"
+        except Exception as e:
+            logger.error(f"Error in streaming analysis: {str(e)}")
+            yield json.dumps({"error": "Streaming analysis failed"}) + "\n"
+    
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+# Serialized /categories body for the dataset version it was built from
+_categories_body: Dict[str, Any] = {"version": None}
+
+def _get_categories_body(analyzer) -> Dict[str, Any]:
+    """JSON body, gzip body and ETag of the category list, built once per dataset version"""
+    global _categories_body
+    if _categories_body["version"] == analyzer.dataset_version:
+        return _categories_body
+    
+    version = analyzer.dataset_version
+    body = json.dumps({"categories": analyzer.get_available_categories()},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    cached = {
+        "version": version,
+        "body": body,
+        "gzip_body": gzip.compress(body, compresslevel=9),
+        # Derived from the content, so versions that do not change the list keep client caches valid
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+    }
+    _categories_body = cached
+    logger.info(f"Category list serialized: {len(body)} bytes, {len(cached['gzip_body'])} gzipped")
+    return cached
+
+@app.get("/categories", response_model=CategoryListResponse)
+async def get_categories(request: Request, prefix: Optional[str] = None, limit: int = 10):
+    """
+    Available dataset categories, so the frontend can offer valid names
+    
+    Without prefix the full sorted list is returned from a body serialized once per dataset
+    version, with an ETag (If-None-Match answers 304) and gzip when accepted. With prefix,
+    up to limit categories starting with it (case-insensitive) are returned for typeahead.
+    """
+    from startup_data_analyzer import startup_analyzer
+    
+    if prefix is not None:
+        if not 1 <= limit <= 50:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+        return CategoryListResponse(categories=startup_analyzer.search_categories(prefix, limit))
+    
+    cached = _get_categories_body(startup_analyzer)
+    headers = {"ETag": cached["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if cached["etag"] in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", "").lower():
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached["gzip_body"], media_type="application/json", headers=headers)
+    return Response(content=cached["body"], media_type="application/json", headers=headers)
+
+@app.get("/categories/trend", response_model=InvestmentCurveResponse)
+async def get_category_trend(category: str, since_year: Optional[int] = None):
+    """
+    Yearly investment curve for a category, for charting
+    
+    Served from per-category cumulative histograms of first funding dates, so any
+    since_year window costs the same as the default trend calculation.
+    """
+    if not category.strip():
+        raise HTTPException(status_code=400, detail="Category is required")
+    
+    from startup_data_analyzer import startup_analyzer
+    
+    curve = startup_analyzer.get_investment_curve(category, since_year)
+    curve["trend"] = round(curve["trend"], 1)
+    return InvestmentCurveResponse(**curve)
+
+@app.get("/categories/cohorts", response_model=CohortCurvesResponse)
+async def get_category_cohorts(
+    category: str,
+    success_definition: Optional[str] = None
+):
+    """
+    Founding-year cohort curves for a category: success rate per founding year and the
+    distribution of time from founding to first funding
+    
+    Served from per-category cohort tables built at dataset load, so each call costs the same.
+    """
+    if not category.strip():
+        raise HTTPException(status_code=400, detail="Category is required")
+    validate_success_definition(success_definition)
+    
+    from startup_data_analyzer import startup_analyzer
+    
+    curves = startup_analyzer.get_cohort_curves(category, success_definition)
+    curves["success_rate"] = [None if rate is None else round(rate, 1) for rate in curves["success_rate"]]
+    curves["funded_within_share"] = [round(share, 1) for share in curves["funded_within_share"]]
+    return CohortCurvesResponse(**curves)
+
+@app.get("/categories/rank", response_model=CategoryRankResponse)
+async def get_category_ranking(
+    sort_by: Literal["risk", "market_size", "funding", "trend", "uniqueness"] = "risk",
+    order: Optional[Literal["asc", "desc"]] = None,
+    offset: int = 0,
+    limit: int = 20,
+    success_definition: Optional[str] = None
+):
+    """
+    Categories ranked by risk, market size, total funding, trend or uniqueness, one page at a time
+    
+    Served from rankings presorted at dataset load, so any page costs the same. The default
+    order lists the best categories first (lowest risk, highest otherwise).
+    """
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    validate_success_definition(success_definition)
+    
+    from startup_data_analyzer import startup_analyzer
+    
+    return CategoryRankResponse(
+        **startup_analyzer.get_category_ranking(sort_by, order, offset, limit, success_definition)
+    )
+
+@app.post("/dataset/records", response_model=PlatformRecordsResponse)
+async def ingest_platform_records(request: PlatformRecordsRequest):
+    """
+    Feed projects and investments recorded on the platform into the dataset statistics
+    
+    Records are applied incrementally (no recompute of the loaded dataset) and the
+    dataset version is bumped so cached results can be invalidated. Project descriptions
+    are added to the near-duplicate index; analyses only look them up.
+    """
+    from startup_data_analyzer import startup_analyzer
+    from near_duplicates import description_index
+    
+    try:
+        summary = startup_analyzer.ingest_records([record.dict(exclude={'description'}) for record in request.records])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if settings.NEAR_DUPLICATE_ENABLED:
+        for record in request.records:
+            name = record.name or record.record_id
+            if record.deleted:
+                await asyncio.to_thread(description_index.remove, name)
+            elif record.description:
+                await asyncio.to_thread(description_index.add, name, record.description)
+    return PlatformRecordsResponse(**summary)
+
+@app.post("/jobs", response_model=AnalysisJobResponse, status_code=202)
+async def submit_analysis_job(job_request: AnalysisJobRequest):
+    """
+    Queue an analysis to run in the background and return its job id immediately
+    
+    Poll GET /jobs/{job_id} for the status and, once completed, the result.
+    """
+    validate_startup_input(job_request.input)
+    try:
+        job_id = job_queue.submit(job_request.analysis, job_request.input.dict(), job_request.priority)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Analysis job queue is full, retry later")
+    
+    return build_job_response(job_queue.get(job_id))
+
+@app.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(job_id: str):
+    """Fetch the status and result of a queued analysis job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return build_job_response(job)
+
+@app.get("/stats/scoring")
+async def get_scoring_stats():
+    """Scoring pool queue depth, wait and run times, plus job queue depth"""
+    from scoring_executor import scoring_executor
+    
+    stats = scoring_executor.get_stats()
+    stats["job_queue_depth"] = job_queue.queue_depth()
+    return stats
+
+@app.get("/stats/dataset")
+async def get_dataset_stats():
+    """Dataset load mode, preprocessing workers and per-step load timings"""
+    from startup_data_analyzer import startup_analyzer
+    
+    return {**startup_analyzer.get_load_timings(), 'dataset_version': startup_analyzer.dataset_version}
+
+@app.get("/stats/llm")
+async def get_llm_stats():
+    """Per-provider LLM latency, error, retry and throttle counters, hedging counters and fallback answer counts"""
+    from llm_providers import llm_router
+    from ai_services import ai_analyzer
+    
+    return {**llm_router.get_stats(), 'degradations': ai_analyzer.get_degradation_stats()}
+
 # Helper functions (now using AI services)
+def build_job_response(job: Dict[str, Any]) -> AnalysisJobResponse:
+    """Build the job response from a stored job row"""
+    return AnalysisJobResponse(
+        job_id=job["id"],
+        analysis=job["kind"],
+        status=job["status"],
+        priority=job["priority"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        result=job["result"],
+        error=job["error"]
+    )
+
+def validate_startup_input(startup_data: StartupAnalysisInput):
+    """Reject requests with missing required fields"""
+    if not startup_data.startup_name.strip():
+        raise HTTPException(status_code=400, detail="Startup name is required")
+    if not startup_data.category.strip():
+        raise HTTPException(status_code=400, detail="Category is required")
+    if not startup_data.description.strip():
+        raise HTTPException(status_code=400, detail="Description is required")
+    validate_success_definition(startup_data.success_definition)
+
+def validate_success_definition(success_definition: Optional[str]):
+    """Reject success definitions whose statistics were not precomputed (see SUCCESS_DEFINITIONS_ENABLED)"""
+    if not success_definition:
+        return
+    
+    from startup_data_analyzer import startup_analyzer
+    
+    if success_definition not in startup_analyzer.get_success_definitions():
+        raise HTTPException(status_code=400, detail=f"Success definition '{success_definition}' is not available")
+
+def build_risk_response(risk_factors: Dict[str, Any]) -> RiskAnalysisResponse:
+    """Build the risk response from analyzer output"""
+    risk_percentage = calculate_risk_percentage(risk_factors)
+    
+    # Round risk categories values
+    risk_categories = risk_factors.get("categories", {})
+    rounded_risk_categories = {k: round(v) if isinstance(v, (int, float)) else v 
+                              for k, v in risk_categories.items()}
+    
+    return RiskAnalysisResponse(
+        percentage=risk_percentage,
+        confidence_score=round(risk_factors.get("confidence_score", 85.0)),
+        factors=risk_factors.get("factors", []),
+        recommendations=risk_factors.get("recommendations", []),
+        analysis_date=datetime.now(),
+        risk_level=determine_risk_level(risk_percentage),
+        risk_categories=rounded_risk_categories
+    )
+
+def build_market_response(market_analysis: Dict[str, Any]) -> MarketSizeResponse:
+    """Build the market size response from analyzer output"""
+    market_percentage = calculate_market_percentage(market_analysis)
+    
+    return MarketSizeResponse(
+        percentage=market_percentage,
+        confidence_score=round(market_analysis.get("confidence_score", 78.0)),
+        factors=market_analysis.get("factors", []),
+        recommendations=market_analysis.get("recommendations", []),
+        analysis_date=datetime.now(),
+        market_potential=determine_market_potential(market_percentage),
+        growth_rate=round(market_analysis.get("growth_rate", 10.0))
+    )
+
+def build_originality_response(originality_analysis: Dict[str, Any]) -> OriginalityResponse:
+    """Build the originality response from analyzer output"""
+    originality_percentage = calculate_originality_percentage(originality_analysis)
+    
+    return OriginalityResponse(
+        percentage=originality_percentage,
+        confidence_score=round(originality_analysis.get("confidence_score", 82.0)),
+        factors=originality_analysis.get("factors", []),
+        recommendations=originality_analysis.get("recommendations", []),
+        analysis_date=datetime.now(),
+        originality_level=determine_originality_level(originality_percentage),
+        similar_projects=originality_analysis.get("similar_projects", [])
+    )
+
 async def analyze_risk_factors(startup_data: StartupAnalysisInput) -> Dict[str, Any]:
     """Analyze risk factors using AI"""
     from ai_services import ai_analyzer
@@ -180,6 +557,12 @@ async def analyze_risk_factors(startup_data: StartupAnalysisInput) -> Dict[str,
     startup_dict = startup_data.dict()
     return await ai_analyzer.analyze_project_risk(startup_dict)
 
+RESPONSE_BUILDERS = {
+    "risk": build_risk_response,
+    "market": build_market_response,
+    "originality": build_originality_response,
+}
+
 def calculate_risk_percentage(risk_factors: Dict[str, Any]) -> float:
     """Calculate overall risk percentage"""
     percentage = risk_factors.get("percentage", 65.0)
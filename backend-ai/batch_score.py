@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ANALYSES = ("risk", "market", "originality")
+ANALYZER_METHODS = {
+    "risk": "calculate_risk_score",
+    "market": "calculate_market_size",
+    "originality": "calculate_originality",
+}
+
+# Input columns / JSON keys read for each candidate (all but category are optional)
+INPUT_FIELDS = ("startup_name", "category", "description", "country_code", "founded_year",
+                "funding_total_usd", "funding_rounds", "success_definition")
+
+# Flat columns written when the output is a CSV file
+CSV_COLUMNS = ("row", "startup_name", "original_category", "category", "risk", "market", "originality", "error")
+
+# Per-process event loop for LLM calls, created by the pool initializer
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _input_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def read_records(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Stream candidate records from a CSV file (with a header row) or a JSONL file"""
+    with open(path, newline="", encoding="utf-8") as file:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+def _number(value: Any, kind=float):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    try:
+        return kind(float(value))
+    except (TypeError, ValueError):
+        return None
+
+def _json_default(value: Any):
+    # NumPy scalars from the analyzers
+    return value.item() if hasattr(value, "item") else str(value)
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Startup data in the form the analyzers expect (empty values become None)"""
+    data = {field: record.get(field) for field in INPUT_FIELDS}
+    for field in ("startup_name", "category", "description", "country_code", "success_definition"):
+        value = data[field]
+        data[field] = str(value).strip() if value is not None and str(value).strip() else None
+    data["startup_name"] = data["startup_name"] or ""
+    data["description"] = data["description"] or ""
+    data["founded_year"] = _number(data["founded_year"], int)
+    data["funding_total_usd"] = _number(data["funding_total_usd"])
+    data["funding_rounds"] = _number(data["funding_rounds"])
+    return data
+
+def _init_worker(use_llm: bool, workers: int):
+    """
+    Load the analyzer once per pool process.
+
+    With LLM calls enabled, each process gets 1/workers of the configured rate limit
+    budgets, so the pool as a whole stays under the account limits.
+    """
+    global _worker_loop
+    from config import settings
+
+    # The pool already uses the cores; each process preprocesses its own copy of the dataset
+    settings.DATASET_PREPROCESS_WORKERS = 1
+    from startup_data_analyzer import startup_analyzer
+
+    # The analyzers log every scored request, which would flood a batch run
+    logging.getLogger("startup_data_analyzer").setLevel(logging.WARNING)
+
+    if not startup_analyzer.has_data:
+        logger.warning("Dataset unavailable in batch worker - scores will be fallback values")
+
+    if use_llm:
+        from ai_services import ai_analyzer
+        from llm_providers import RateLimiter
+
+        router = ai_analyzer.llm_router
+        router.rate_limiters = {
+            name: RateLimiter(
+                max(1, limiter.requests_per_minute // workers) if limiter.requests_per_minute else 0,
+                max(1, limiter.tokens_per_minute // workers) if limiter.tokens_per_minute else 0,
+            )
+            for name, limiter in router.rate_limiters.items()
+        }
+        _worker_loop = asyncio.new_event_loop()
+
+async def _resolve_with_llm(rows: List[Dict[str, Any]], concurrency: int) -> List[Tuple[str, Optional[float]]]:
+    """Dataset category and description uniqueness score for each row, using the LLM providers"""
+    from ai_services import ai_analyzer
+    from config import settings
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def resolve(data: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+        async with slots:
+            if settings.FUSED_ORIGINALITY_ENABLED:
+                fused = await ai_analyzer.determine_category_and_uniqueness(data["category"], data["description"])
+                if fused:
+                    return fused
+            category, ai_score = await asyncio.gather(
+                ai_analyzer.determine_best_category(data["category"], data["description"]),
+                ai_analyzer.analyze_description_uniqueness(data["description"])
+            )
+            return category, ai_score
+
+    return list(await asyncio.gather(*[resolve(data) for data in rows]))
+
+def score_chunk(first_row: int, records: List[Dict[str, Any]], analyses: Tuple[str, ...],
+                use_llm: bool, llm_concurrency: int) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Score one shard of records inside a pool worker.
+
+    Without LLM calls the input category is scored as given (the analyzer resolves it
+    exactly, by label or fuzzily) and originality uses the default description score.
+
+    Returns:
+        (one result per record in input order, seconds spent)
+    """
+    from startup_data_analyzer import startup_analyzer
+
+    started = time.perf_counter()
+    rows = [normalize_record(record) for record in records]
+    valid = [data for data in rows if data["category"]]
+
+    resolved = {}
+    if use_llm and valid:
+        pairs = _worker_loop.run_until_complete(_resolve_with_llm(valid, llm_concurrency))
+        resolved = {id(data): pair for data, pair in zip(valid, pairs)}
+
+    results = []
+    for offset, data in enumerate(rows):
+        result = {"row": first_row + offset, "startup_name": data["startup_name"], "original_category": data["category"]}
+        if not data["category"]:
+            result["error"] = "missing category"
+            results.append(result)
+            continue
+
+        category, ai_score = resolved.get(id(data), (data["category"], None))
+        scored = dict(data, category=category, original_category=data["category"])
+        result["category"] = category
+        try:
+            for analysis in analyses:
+                method = getattr(startup_analyzer, ANALYZER_METHODS[analysis])
+                if analysis == "originality" and ai_score is not None:
+                    result[analysis] = method(scored, ai_score)
+                else:
+                    result[analysis] = method(scored)
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+
+    return results, time.perf_counter() - started
+
+class OutputWriter:
+    """
+    Appends results to a JSONL file (full analyses) or a CSV file (percentages only), and
+    records in a checkpoint file how many input rows are safely written.
+
+    The checkpoint holds the output size at the last flushed chunk, so a resumed run
+    first truncates anything written after it.
+    """
+
+    def __init__(self, path: str, checkpoint_path: str, resume_state: Optional[Dict[str, Any]], run_key: Dict[str, Any]):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.run_key = run_key
+        self.csv = path.lower().endswith(".csv")
+        self.rows_done = resume_state["rows_done"] if resume_state else 0
+
+        if resume_state:
+            self.file = open(path, "r+", newline="", encoding="utf-8")
+            self.file.truncate(resume_state["output_bytes"])
+            self.file.seek(resume_state["output_bytes"])
+        else:
+            self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, CSV_COLUMNS, extrasaction="ignore") if self.csv else None
+        if self.writer and not resume_state:
+            self.writer.writeheader()
+
+    def write_chunk(self, results: List[Dict[str, Any]]):
+        for result in results:
+            if self.writer:
+                self.writer.writerow({
+                    **result,
+                    **{analysis: round(result[analysis]["percentage"], 2) for analysis in ANALYSES if analysis in result},
+                })
+            else:
+                self.file.write(json.dumps(result, ensure_ascii=False, default=_json_default) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.rows_done += len(results)
+        self._save_checkpoint()
+
+    def _save_checkpoint(self):
+        state = dict(self.run_key, rows_done=self.rows_done, output_bytes=self.file.tell())
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temporary, self.checkpoint_path)
+
+    def close(self):
+        self.file.close()
+
+def _chunks(records: Iterator[Dict[str, Any]], size: int, first_row: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield first_row, chunk
+            first_row += len(chunk)
+            chunk = []
+    if chunk:
+        yield first_row, chunk
+
+def _load_resume_state(checkpoint_path: str, output: str, run_key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(checkpoint_path) or not os.path.exists(output):
+        raise SystemExit(f"Nothing to resume: {checkpoint_path} or {output} is missing")
+
+    with open(checkpoint_path, encoding="utf-8") as file:
+        state = json.load(file)
+    mismatched = [key for key, value in run_key.items() if state.get(key) != value]
+    if mismatched:
+        raise SystemExit(f"Checkpoint belongs to a different run (differs in: {', '.join(mismatched)})")
+    return state
+
+def run(args) -> Dict[str, Any]:
+    """Score the input file and return the throughput report"""
+    fmt = _input_format(args.input, args.format)
+    analyses = tuple(args.analyses)
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    run_key = {"input": os.path.abspath(args.input), "analyses": list(analyses), "llm": args.llm}
+
+    resume_state = _load_resume_state(checkpoint_path, args.output, run_key) if args.resume else None
+    skip = resume_state["rows_done"] if resume_state else 0
+    if skip:
+        logger.info(f"Resuming after {skip} rows already written to {args.output}")
+
+    records = read_records(args.input, fmt)
+    for _ in range(skip):
+        next(records, None)
+
+    writer = OutputWriter(args.output, checkpoint_path, resume_state, run_key)
+    started = time.perf_counter()
+    rows = errors = 0
+    worker_seconds = 0.0
+
+    # Chunks finish out of order; results are written in input order so the checkpoint is a row count
+    pending, finished, next_row = set(), {}, skip
+    chunks = _chunks(records, args.chunk_size, skip)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.llm, args.workers)) as executor:
+        try:
+            while True:
+                # Keep at most two chunks per worker in flight, so input is read as it is consumed
+                while len(pending) < args.workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    pending.add(executor.submit(score_chunk, *chunk, analyses, args.llm, args.llm_concurrency))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results, seconds = future.result()
+                    worker_seconds += seconds
+                    finished[results[0]["row"]] = results
+
+                while next_row in finished:
+                    results = finished.pop(next_row)
+                    writer.write_chunk(results)
+                    rows += len(results)
+                    errors += sum(1 for result in results if "error" in result)
+                    next_row += len(results)
+
+                elapsed = time.perf_counter() - started
+                logger.info(f"{writer.rows_done} rows written ({rows / elapsed:.1f} rows/s)")
+        finally:
+            for future in pending:
+                future.cancel()
+            writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "input": args.input,
+        "output": args.output,
+        "rows_scored": rows,
+        "rows_skipped_on_resume": skip,
+        "rows_total": writer.rows_done,
+        "errors": errors,
+        "workers": args.workers,
+        "llm": args.llm,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        # Average busy share of the workers; low values mean input or output is the bottleneck
+        "worker_utilization": round(worker_seconds / (elapsed * args.workers), 3) if elapsed > 0 else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score candidate startups from a CSV or JSONL export outside the web service. "
+                    "Records need a category and may have startup_name, description, country_code, "
+                    "founded_year, funding_total_usd, funding_rounds and success_definition. Start workers "
+                    "from a stats snapshot (DATASET_LOAD_MODE=stats) to avoid loading the dataset in every process."
+    )
+    parser.add_argument("input", help="Input file (.csv with a header row, or .jsonl)")
+    parser.add_argument("--output", required=True, help="Output file: .jsonl for full analyses, .csv for percentages")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Input format (default: from the file extension)")
+    parser.add_argument("--analyses", nargs="+", choices=ANALYSES, default=list(ANALYSES), help="Analyses to run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Records per work shard")
+    parser.add_argument("--llm", action="store_true",
+                        help="Resolve categories and score descriptions with the LLM providers (default: local only)")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Concurrent LLM requests per worker")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    args = parser.parse_args()
+    args.workers = max(1, args.workers)
+    args.chunk_size = max(1, args.chunk_size)
+
+    logging.basicConfig(level=logging.INFO)
+    report = run(args)
+    logger.info(
+        f"Scored {report['rows_scored']} rows in {report['elapsed_seconds']}s "
+        f"({report['rows_per_second']} rows/s, {report['errors']} errors)"
+    )
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
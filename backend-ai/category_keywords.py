@@ -0,0 +1,255 @@
+import logging
+import re
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Turkish/English keywords per fallback category with their weights: 3 for specific
+# terms, 2 for the category's own name, 1 for related terms and 0.5 for generic ones.
+# Keywords are normalized like the input (see normalize_text), so Turkish letters and
+# their ASCII spellings match alike ("sağlık" / "saglik").
+CATEGORY_KEYWORDS: Dict[str, Dict[str, float]] = {
+    'Artificial Intelligence': {
+        'ai': 2, 'a.i.': 2, 'artificial intelligence': 3, 'machine learning': 3, 'deep learning': 3,
+        'neural network': 3, 'computer vision': 3, 'natural language processing': 3, 'nlp': 3,
+        'generative': 2, 'llm': 3, 'chatbot': 2, 'large language model': 3,
+        'yapay zeka': 3, 'yapay zekâ': 3, 'makine öğrenmesi': 3, 'makine öğrenimi': 3, 'derin öğrenme': 3,
+        'sinir ağı': 3, 'görüntü işleme': 3, 'doğal dil işleme': 3, 'sohbet botu': 2,
+    },
+    'Healthcare': {
+        'healthcare': 2, 'health care': 2, 'health': 1, 'medical': 2, 'medicine': 2, 'hospital': 2,
+        'clinic': 2, 'patient': 2, 'telemedicine': 3, 'healthtech': 3, 'digital health': 3, 'wellness': 1,
+        'fitness': 1, 'mental health': 3, 'diagnosis': 2, 'dental': 2, 'pharmacy': 2,
+        'sağlık': 2, 'tıp': 2, 'tıbbi': 2, 'hastane': 2, 'klinik': 2, 'hasta': 1, 'teşhis': 2,
+        'tedavi': 2, 'eczane': 2, 'diş': 1, 'ruh sağlığı': 3, 'psikoloji': 2, 'diyet': 1,
+    },
+    'Biotechnology': {
+        'biotech': 3, 'biotechnology': 3, 'genomics': 3, 'genetic': 2, 'bioinformatics': 3, 'pharma': 2,
+        'pharmaceutical': 2, 'drug discovery': 3, 'life sciences': 2, 'vaccine': 2,
+        'biyoteknoloji': 3, 'genetik': 2, 'genom': 3, 'biyoinformatik': 3, 'ilaç': 2, 'aşı': 2,
+    },
+    'Finance': {
+        'finance': 2, 'financial': 2, 'fintech': 3, 'banking': 2, 'bank': 1, 'payment': 2, 'payments': 2,
+        'insurance': 2, 'insurtech': 3, 'lending': 2, 'loan': 2, 'credit': 1, 'investment': 1,
+        'crypto': 2, 'cryptocurrency': 3, 'blockchain': 2, 'wallet': 1, 'accounting': 2, 'trading': 2,
+        'finans': 2, 'finansal': 2, 'bankacılık': 2, 'banka': 1, 'ödeme': 2, 'sigorta': 2, 'kredi': 2,
+        'yatırım': 1, 'borsa': 2, 'kripto': 2, 'muhasebe': 2, 'cüzdan': 1, 'fatura': 1,
+    },
+    'Education': {
+        'education': 2, 'educational': 2, 'edtech': 3, 'learning': 1, 'e-learning': 3, 'elearning': 3,
+        'school': 2, 'university': 2, 'student': 2, 'teacher': 2, 'course': 1, 'tutoring': 2, 'training': 1,
+        'eğitim': 2, 'öğrenim': 2, 'öğrenme': 1, 'okul': 2, 'üniversite': 2, 'öğrenci': 2, 'öğretmen': 2,
+        'ders': 1, 'kurs': 1, 'sınav': 2, 'uzaktan eğitim': 3,
+    },
+    'Technology': {
+        'tech': 0.5, 'technology': 1, 'teknoloji': 1, 'iot': 2, 'internet of things': 3, 'nesnelerin interneti': 3,
+        'hardware': 1, 'donanım': 1, 'robotics': 2, 'robot': 2, 'robotik': 2, 'drone': 2, 'sensor': 1, 'sensör': 1,
+    },
+    'Software': {
+        'software': 2, 'saas': 3, 'platform': 0.5, 'cloud': 1, 'api': 1, 'developer': 1, 'devops': 2,
+        'enterprise software': 3, 'erp': 2, 'crm': 2, 'automation': 1, 'web': 0.5, 'website': 1,
+        'yazılım': 2, 'bulut': 1, 'otomasyon': 1, 'web sitesi': 1, 'kurumsal yazılım': 3,
+    },
+    'Mobile': {
+        'mobile': 2, 'smartphone': 2, 'ios': 2, 'android': 2, 'mobile app': 3,
+        'mobil': 2, 'akıllı telefon': 2, 'mobil uygulama': 3,
+    },
+    'Internet': {
+        'internet': 2, 'online': 1, 'digital': 0.5, 'dijital': 0.5, 'çevrimiçi': 1,
+    },
+    'E-commerce': {
+        'ecommerce': 3, 'e-commerce': 3, 'retail': 2, 'marketplace': 2, 'online store': 3, 'shopping': 2,
+        'shop': 1, 'store': 1, 'sales': 1, 'dropshipping': 3, 'subscription box': 2,
+        'e-ticaret': 3, 'eticaret': 3, 'perakende': 2, 'satış': 1, 'pazaryeri': 3, 'pazar yeri': 3,
+        'alışveriş': 2, 'mağaza': 2, 'online mağaza': 3, 'ticaret': 1,
+    },
+    'Games': {
+        'gaming': 2, 'games': 2, 'game': 2, 'esports': 3, 'e-sports': 3, 'video game': 3,
+        'oyun': 2, 'oyunlar': 2, 'espor': 3, 'e-spor': 3, 'mobil oyun': 3,
+    },
+    'Entertainment': {
+        'entertainment': 2, 'music': 2, 'movie': 2, 'film': 2, 'streaming': 2, 'event': 1, 'concert': 2,
+        'eğlence': 2, 'müzik': 2, 'sinema': 2, 'dizi': 1, 'etkinlik': 1, 'konser': 2,
+    },
+    'Media': {
+        'media': 1, 'news': 2, 'publishing': 2, 'content': 1, 'podcast': 2, 'video': 1, 'journalism': 2,
+        'medya': 1, 'haber': 2, 'yayıncılık': 2, 'içerik': 1, 'gazete': 2, 'dergi': 2,
+    },
+    'Social Media': {
+        'social': 1, 'social media': 3, 'social network': 3, 'community': 1, 'influencer': 2, 'dating': 2,
+        'sosyal': 1, 'sosyal medya': 3, 'sosyal ağ': 3, 'topluluk': 1, 'fenomen': 2, 'arkadaşlık': 2,
+    },
+    'Energy': {
+        'energy': 2, 'electricity': 2, 'battery': 2, 'power': 1, 'oil': 2, 'gas': 1, 'grid': 1,
+        'enerji': 2, 'elektrik': 2, 'batarya': 2, 'pil': 1, 'petrol': 2, 'doğalgaz': 2, 'şebeke': 1,
+    },
+    'Clean Technology': {
+        'clean': 1, 'cleantech': 3, 'clean energy': 3, 'green': 1, 'renewable': 2, 'solar': 2, 'wind': 1,
+        'recycling': 2, 'sustainability': 2, 'sustainable': 2, 'carbon': 2, 'climate': 2, 'waste': 1,
+        'electric vehicle': 3, 'temiz': 1, 'temiz enerji': 3, 'yeşil': 1, 'yenilenebilir': 2, 'güneş': 2,
+        'güneş enerjisi': 3, 'rüzgar': 2, 'geri dönüşüm': 3, 'sürdürülebilir': 2, 'sürdürülebilirlik': 2,
+        'karbon': 2, 'iklim': 2, 'atık': 2, 'elektrikli araç': 3,
+    },
+    'Transportation': {
+        'transportation': 2, 'transport': 2, 'logistics': 2, 'mobility': 2, 'delivery': 1, 'shipping': 2,
+        'fleet': 2, 'ride sharing': 3, 'automotive': 2, 'car': 1, 'vehicle': 1, 'freight': 2,
+        'ulaşım': 2, 'taşımacılık': 2, 'lojistik': 2, 'kargo': 2, 'teslimat': 1, 'filo': 2, 'araç': 1,
+        'otomotiv': 2, 'araba': 1, 'mobilite': 2, 'nakliye': 2,
+    },
+    'Food and Beverage': {
+        'food': 2, 'beverage': 2, 'restaurant': 2, 'recipe': 2, 'food delivery': 3, 'foodtech': 3,
+        'coffee': 1, 'drink': 1, 'catering': 2,
+        'yemek': 2, 'gıda': 2, 'içecek': 2, 'restoran': 2, 'tarif': 1, 'yemek siparişi': 3, 'kahve': 1,
+    },
+    'Agriculture': {
+        'agriculture': 2, 'agritech': 3, 'agtech': 3, 'farming': 2, 'farm': 2, 'farmer': 2, 'crop': 2,
+        'livestock': 2, 'irrigation': 2, 'greenhouse': 2,
+        'tarım': 2, 'tarımsal': 2, 'çiftlik': 2, 'çiftçi': 2, 'hayvancılık': 2, 'sulama': 2,
+        'hasat': 2, 'tohum': 2,
+    },
+    'Apps': {
+        'app': 1, 'apps': 1, 'application': 0.5, 'uygulama': 1, 'uygulaması': 1,
+    },
+    'Real Estate': {
+        'real estate': 3, 'proptech': 3, 'property': 2, 'rental': 1, 'housing': 2, 'construction': 2,
+        'emlak': 3, 'gayrimenkul': 3, 'konut': 2, 'kiralama': 1, 'inşaat': 2, 'ev': 0.5,
+    },
+    'Security': {
+        'security': 2, 'cybersecurity': 3, 'cyber security': 3, 'privacy': 2, 'encryption': 2, 'fraud': 2,
+        'güvenlik': 2, 'siber güvenlik': 3, 'gizlilik': 2, 'şifreleme': 2, 'dolandırıcılık': 2,
+    },
+    'Marketing': {
+        'marketing': 2, 'advertising': 2, 'adtech': 3, 'seo': 2, 'branding': 2, 'analytics': 1,
+        'pazarlama': 2, 'reklam': 2, 'dijital pazarlama': 3, 'marka': 1, 'analitik': 1,
+    },
+    'Manufacturing': {
+        'manufacturing': 2, 'factory': 2, '3d printing': 3, 'industrial': 2, 'industry 4.0': 3,
+        'üretim': 2, 'imalat': 2, 'fabrika': 2, '3d baskı': 3, 'endüstriyel': 2, 'endüstri 4.0': 3, 'sanayi': 2,
+    },
+    'Travel': {
+        'travel': 2, 'tourism': 2, 'hotel': 2, 'booking': 1, 'trip': 1, 'flight': 2,
+        'seyahat': 2, 'turizm': 2, 'otel': 2, 'tatil': 2, 'rezervasyon': 1, 'uçuş': 2,
+    },
+}
+
+# Keywords at least this long also match inflected forms (Turkish suffixes, English plurals)
+MIN_PREFIX_KEYWORD_LENGTH = 4
+
+# Dotted/dotless i in every case fold to a plain 'i' (Turkish "İ"/"ı" vs English "I"/"i")
+_I_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+_SEPARATORS = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize_text(text: str) -> str:
+    """
+    Fold text for keyword matching: Turkish-safe i folding, diacritics removed (ğ→g,
+    ş→s, ç→c, ö→o, ü→u), casefolded, with every run of non-alphanumerics turned into a
+    single space
+    """
+    decomposed = unicodedata.normalize('NFKD', text.translate(_I_FOLD))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return _SEPARATORS.sub(" ", stripped).strip()
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword occurrence in one pass over the text"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword in keywords:
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(len(self.keywords))
+            self.keywords.append(keyword)
+
+        # Failure links in breadth-first order; each state also reports its suffixes' keywords
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(end position, keyword index) for every occurrence; end is exclusive"""
+        matches = []
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_index in output[state]:
+                matches.append((position + 1, keyword_index))
+        return matches
+
+class CategoryKeywordMatcher:
+    """
+    Scores categories by every lexicon keyword found in the input.
+
+    Keywords must start at a word boundary. Short keywords must also end at one, so
+    "ai" does not match inside "retail"; longer ones may carry a suffix ("eğitimi",
+    "games"). Each category sums the weights of its distinct matched keywords, and the
+    highest total wins (ties go to the category matched earliest in the text).
+    """
+
+    def __init__(self, lexicon: Dict[str, Dict[str, float]]):
+        entries: Dict[str, List[Tuple[str, float]]] = {}
+        for category, keywords in lexicon.items():
+            for keyword, weight in keywords.items():
+                normalized = normalize_text(keyword)
+                if normalized:
+                    entries.setdefault(normalized, []).append((category, float(weight)))
+
+        self._entries = list(entries.values())
+        self.automaton = KeywordAutomaton(entries.keys())
+        logger.info(f"Category keyword automaton built: {len(self._entries)} keywords, {len(lexicon)} categories")
+
+    def score(self, text: str) -> Dict[str, Tuple[float, int]]:
+        """Category -> (total weight, position of its first match) for the text"""
+        normalized = normalize_text(text)
+        scores: Dict[str, Tuple[float, int]] = {}
+        seen = set()
+
+        for end, keyword_index in self.automaton.find_all(normalized):
+            keyword = self.automaton.keywords[keyword_index]
+            start = end - len(keyword)
+            if start > 0 and normalized[start - 1] != " ":
+                continue
+            if end < len(normalized) and normalized[end] != " " and len(keyword) < MIN_PREFIX_KEYWORD_LENGTH:
+                continue
+            if keyword_index in seen:
+                continue
+            seen.add(keyword_index)
+
+            for category, weight in self._entries[keyword_index]:
+                total, first = scores.get(category, (0.0, start))
+                scores[category] = (total + weight, min(first, start))
+
+        return scores
+
+    def best_category(self, text: str) -> Optional[str]:
+        """Highest scoring category, or None if no keyword matches"""
+        scores = self.score(text)
+        if not scores:
+            return None
+        return max(scores.items(), key=lambda item: (item[1][0], -item[1][1]))[0]
+
+# Global category keyword matcher instance
+category_keyword_matcher = CategoryKeywordMatcher(CATEGORY_KEYWORDS)
@@ -0,0 +1,80 @@
+import logging
+import math
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; pipes, commas and punctuation act as separators"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+def _features(text: str) -> Dict[str, float]:
+    """Word tokens plus character trigrams of each token, with their base weights"""
+    features: Dict[str, float] = {}
+    for token in _tokenize(text):
+        features[f"w:{token}"] = 2.0
+        padded = f"^{token}$"
+        for i in range(len(padded) - 2):
+            features.setdefault(f"t:{padded[i:i + 3]}", 1.0)
+    return features
+
+class CategoryShortlister:
+    """
+    Local pre-ranker that picks the most relevant dataset categories for a query.
+
+    An inverted index from word/trigram features to category ids is built once over
+    the full category vocabulary. Scoring a query touches only the postings of its own
+    features, so the cost depends on the query length rather than the vocabulary size.
+    """
+
+    def __init__(self, categories: Iterable[str]):
+        self.categories: List[str] = list(categories)
+        self.category_set = set(self.categories)
+        postings: Dict[str, List[int]] = {}
+        feature_counts = np.zeros(len(self.categories), dtype=np.float32)
+
+        for cat_id, category in enumerate(self.categories):
+            features = _features(category)
+            feature_counts[cat_id] = len(features)
+            for feature in features:
+                postings.setdefault(feature, []).append(cat_id)
+
+        total = max(1, len(self.categories))
+        self._postings = {
+            feature: np.array(ids, dtype=np.int32) for feature, ids in postings.items()
+        }
+        self._idf = {
+            feature: math.log(1 + total / len(ids)) for feature, ids in postings.items()
+        }
+
+        # Long pipe-separated combinations would otherwise collect matches from every part
+        pipe_counts = np.array([cat.count('|') for cat in self.categories], dtype=np.float32)
+        self._norm = 1.0 / (np.sqrt(np.maximum(feature_counts, 1.0)) * (1.0 + 0.25 * pipe_counts))
+
+        logger.info(f"Category shortlister built: {len(self.categories)} categories, {len(self._postings)} features")
+
+    def shortlist(self, query: str, k: int = 15) -> List[str]:
+        """Return up to k categories ranked by relevance to the query (only positive matches)"""
+        if not self.categories:
+            return []
+
+        scores = np.zeros(len(self.categories), dtype=np.float32)
+        for feature, weight in _features(query).items():
+            ids = self._postings.get(feature)
+            if ids is not None:
+                scores[ids] += weight * self._idf[feature]
+        scores *= self._norm
+
+        matched = int(np.count_nonzero(scores))
+        if matched == 0:
+            return []
+
+        k = min(k, matched)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [self.categories[i] for i in top]
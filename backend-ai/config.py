@@ -22,6 +22,86 @@ class Settings:
     TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1000"))
     
+    # LLM providers, in order of preference (default: DEFAULT_MODEL_PROVIDER, then openai, anthropic, google)
+    LLM_PROVIDERS: str = os.getenv("LLM_PROVIDERS", "")
+    # DEFAULT_MODEL_NAME, the model setting from before multiple providers, still names the OpenAI model
+    OPENAI_MODEL_NAME: str = os.getenv("OPENAI_MODEL_NAME", DEFAULT_MODEL_NAME)
+    ANTHROPIC_MODEL_NAME: str = os.getenv("ANTHROPIC_MODEL_NAME", "claude-3-5-haiku-latest")
+    GOOGLE_MODEL_NAME: str = os.getenv("GOOGLE_MODEL_NAME", "gemini-1.5-flash")
+    # Base URL overrides, e.g. for local stand-in servers
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")
+    GOOGLE_BASE_URL: str = os.getenv("GOOGLE_BASE_URL", "")
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+    # Start a second provider if the first has not answered within this delay (0 disables hedging)
+    LLM_HEDGE_DELAY_MS: float = float(os.getenv("LLM_HEDGE_DELAY_MS", "0"))
+    # Consecutive failures before a provider is skipped for LLM_COOLDOWN_SECONDS
+    LLM_FAILURE_THRESHOLD: int = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))
+    LLM_COOLDOWN_SECONDS: float = float(os.getenv("LLM_COOLDOWN_SECONDS", "30"))
+    # Client-side request/token budgets per minute, kept under the account limits (0 disables)
+    OPENAI_REQUESTS_PER_MINUTE: int = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+    OPENAI_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+    ANTHROPIC_REQUESTS_PER_MINUTE: int = int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "0"))
+    ANTHROPIC_TOKENS_PER_MINUTE: int = int(os.getenv("ANTHROPIC_TOKENS_PER_MINUTE", "0"))
+    GOOGLE_REQUESTS_PER_MINUTE: int = int(os.getenv("GOOGLE_REQUESTS_PER_MINUTE", "0"))
+    GOOGLE_TOKENS_PER_MINUTE: int = int(os.getenv("GOOGLE_TOKENS_PER_MINUTE", "0"))
+    # Transient errors (429, 5xx, timeouts) are retried with jittered exponential backoff,
+    # as long as the retry still fits in the request deadline
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BASE_DELAY_MS: float = float(os.getenv("LLM_RETRY_BASE_DELAY_MS", "500"))
+    LLM_RETRY_MAX_DELAY_MS: float = float(os.getenv("LLM_RETRY_MAX_DELAY_MS", "8000"))
+    LLM_REQUEST_DEADLINE_SECONDS: float = float(os.getenv("LLM_REQUEST_DEADLINE_SECONDS", "45"))
+    
+    # Uniqueness scoring micro-batching
+    UNIQUENESS_BATCH_ENABLED: bool = os.getenv("UNIQUENESS_BATCH_ENABLED", "True").lower() == "true"
+    UNIQUENESS_BATCH_MAX_SIZE: int = int(os.getenv("UNIQUENESS_BATCH_MAX_SIZE", "16"))
+    UNIQUENESS_BATCH_MAX_WAIT_MS: float = float(os.getenv("UNIQUENESS_BATCH_MAX_WAIT_MS", "10"))
+    
+    # Number of locally pre-ranked categories offered in classification prompts
+    CATEGORY_SHORTLIST_SIZE: int = int(os.getenv("CATEGORY_SHORTLIST_SIZE", "15"))
+    
+    # Ask for category and uniqueness in one completion on /originality
+    FUSED_ORIGINALITY_ENABLED: bool = os.getenv("FUSED_ORIGINALITY_ENABLED", "True").lower() == "true"
+    
+    # Dataset loading: "memory" keeps the full frame, "streaming" folds CSV chunks into aggregates,
+    # "stats" serves from a snapshot written by `python export_stats.py` without pandas
+    DATASET_LOAD_MODE: str = os.getenv("DATASET_LOAD_MODE", "memory")
+    DATASET_CHUNK_SIZE: int = int(os.getenv("DATASET_CHUNK_SIZE", "50000"))
+    STATS_SNAPSHOT_PATH: str = os.getenv("STATS_SNAPSHOT_PATH", "dataset_stats.npz")
+    # Processes preprocessing dataset chunks of DATASET_CHUNK_SIZE rows (0 = one per core, 1 = in process)
+    DATASET_PREPROCESS_WORKERS: int = int(os.getenv("DATASET_PREPROCESS_WORKERS", "0"))
+    
+    # Trained success model used for the overall risk score; SUCCESS_MODEL_PATH loads a model
+    # exported by `python success_model.py` instead of training one at load
+    SUCCESS_MODEL_ENABLED: bool = os.getenv("SUCCESS_MODEL_ENABLED", "True").lower() == "true"
+    SUCCESS_MODEL_PATH: str = os.getenv("SUCCESS_MODEL_PATH", "")
+    SUCCESS_MODEL_MIN_COUNT: int = int(os.getenv("SUCCESS_MODEL_MIN_COUNT", "20"))
+    
+    # Alternative success definitions (see dataset_preprocessing.SUCCESS_DEFINITIONS) precomputed next to
+    # the default "including_operating", selected per request with success_definition
+    SUCCESS_DEFINITIONS_ENABLED: str = os.getenv("SUCCESS_DEFINITIONS_ENABLED", "exit_only")
+    
+    # Minimum companies in a category/country/year cell before falling back to a rollup
+    REGION_MIN_CELL_COUNT: int = int(os.getenv("REGION_MIN_CELL_COUNT", "10"))
+    
+    # Minimum companies for a category to appear in /categories/rank
+    CATEGORY_RANK_MIN_COUNT: int = int(os.getenv("CATEGORY_RANK_MIN_COUNT", "10"))
+    
+    # CPU-bound scoring pool ("thread" or "process")
+    SCORING_EXECUTOR_MODE: str = os.getenv("SCORING_EXECUTOR_MODE", "thread")
+    SCORING_EXECUTOR_WORKERS: int = int(os.getenv("SCORING_EXECUTOR_WORKERS", "4"))
+    SCORING_EXECUTOR_MAX_PENDING: int = int(os.getenv("SCORING_EXECUTOR_MAX_PENDING", "64"))
+    
+    # Background analysis jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_MAXSIZE: int = int(os.getenv("JOB_QUEUE_MAXSIZE", "1000"))
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", "analysis_jobs.db")
+    
+    # Near-duplicate description detection (MinHash/LSH) for originality
+    NEAR_DUPLICATE_ENABLED: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "True").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+    NEAR_DUPLICATE_DB_PATH: str = os.getenv("NEAR_DUPLICATE_DB_PATH", "near_duplicates.db")
+    
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "100"))
     RATE_LIMIT_PERIOD: int = int(os.getenv("RATE_LIMIT_PERIOD", "3600"))
@@ -0,0 +1,315 @@
+import logging
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# pandas is only imported where frames are folded, so serving from a stats snapshot
+# (see StartupDataAnalyzer.export_stats) never loads it
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Funding histogram bins: exactly zero, below $1k, then four log-spaced bins per decade up to $100B+
+FUNDING_BIN_EDGES = np.concatenate(([0.0, 1.0], np.logspace(3, 11, 33)))
+FUNDING_BIN_COUNT = len(FUNDING_BIN_EDGES)
+
+# Year axis for first-funding histograms; years outside are clipped to the ends
+FUNDING_YEAR_MIN = 1900
+FUNDING_YEAR_MAX = datetime.now().year + 1
+
+# Founding-year cohorts: one per year from COHORT_YEAR_MIN (earlier years are folded into it)
+COHORT_YEAR_MIN = 1970
+COHORT_YEARS = np.arange(COHORT_YEAR_MIN, FUNDING_YEAR_MAX + 1)
+
+# Time from founding to first funding, in days: bins start at each edge, the last is open-ended
+# (funding dated before the founding date counts as immediate)
+FUNDING_DELAY_EDGES_DAYS = np.array([0, 90, 180, 365, 730, 1095, 1825, 3650])
+
+# Examples kept per category for "similar projects"
+EXAMPLES_PER_CATEGORY = 3
+
+# Separators between the labels of a category_list entry ("Software|Games", "Software, Games")
+CATEGORY_LABEL_SEPARATORS = r"[|,]"
+
+def funding_bins(funding: np.ndarray) -> np.ndarray:
+    """Histogram bin index for each funding amount"""
+    return np.searchsorted(FUNDING_BIN_EDGES, funding, side='right') - 1
+
+def cohort_positions(founded_years: np.ndarray) -> np.ndarray:
+    """Cohort column for each founding year; -1 where the year is missing"""
+    founded_years = np.asarray(founded_years, dtype=float)
+    positions = np.full(founded_years.shape, -1, dtype=np.int64)
+    known = ~np.isnan(founded_years) & (founded_years > 0)
+    positions[known] = np.clip(founded_years[known].astype(int), COHORT_YEAR_MIN, FUNDING_YEAR_MAX) - COHORT_YEAR_MIN
+    return positions
+
+def funding_delay_bins(days: np.ndarray) -> np.ndarray:
+    """Funding delay bin for each number of days from founding to first funding; -1 where unknown"""
+    days = np.asarray(days, dtype=float)
+    bins = np.full(days.shape, -1, dtype=np.int64)
+    known = ~np.isnan(days)
+    bins[known] = np.searchsorted(FUNDING_DELAY_EDGES_DAYS, np.maximum(days[known], 0), side='right') - 1
+    return bins
+
+def split_category_labels(category_list: str) -> List[str]:
+    """Distinct labels of one category_list value, in order"""
+    labels = (label.strip() for label in re.split(CATEGORY_LABEL_SEPARATORS, category_list))
+    return list(dict.fromkeys(label for label in labels if label))
+
+def category_label_csr(category_list: 'pd.Series') -> Tuple[np.ndarray, np.ndarray, 'pd.Index']:
+    """
+    Split category_list values into their labels as compressed sparse rows.
+
+    Returns:
+        (codes, offsets, vocabulary): the labels of row i are vocabulary[codes[offsets[i]:offsets[i + 1]]].
+        Codes are int32 and duplicate labels within a row are dropped.
+    """
+    import pandas as pd
+
+    row_count = len(category_list)
+    parts = pd.Series(category_list.to_numpy(), index=np.arange(row_count)).astype(object)
+    parts = parts.fillna('').astype(str).str.split(CATEGORY_LABEL_SEPARATORS).explode().str.strip()
+    parts = parts[parts != '']
+
+    codes, vocabulary = pd.factorize(parts, sort=False)
+    rows = parts.index.to_numpy(dtype=np.int64)
+
+    # Drop repeated labels within a row; explode keeps rows in order, so the result stays row-sorted
+    if len(codes):
+        keys = rows * len(vocabulary) + codes
+        _, first = np.unique(keys, return_index=True)
+        first.sort()
+        rows, codes = rows[first], codes[first]
+
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=row_count))))
+    return codes.astype(np.int32), offsets.astype(np.int64), vocabulary
+
+class GroupStats:
+    """
+    Additive statistics per group: a group is a main category or a single category label.
+
+    Arrays are indexed by group id (in registration order) and grow as new groups appear.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+
+        self._capacity = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.successes = np.zeros(0, dtype=np.int64)
+        self.funding_sums = np.zeros(0, dtype=np.float64)
+        self.funding_hist = np.zeros((0, FUNDING_BIN_COUNT), dtype=np.int64)
+        self.funding_success_hist = np.zeros((0, FUNDING_BIN_COUNT), dtype=np.int64)
+        self.year_hist = np.zeros((0, FUNDING_YEAR_MAX - FUNDING_YEAR_MIN + 1), dtype=np.int64)
+        # Companies and successes per founding-year cohort, companies per funding delay bin
+        self.cohort_hist = np.zeros((0, len(COHORT_YEARS)), dtype=np.int64)
+        self.cohort_success_hist = np.zeros((0, len(COHORT_YEARS)), dtype=np.int64)
+        self.funding_delay_hist = np.zeros((0, len(FUNDING_DELAY_EDGES_DAYS)), dtype=np.int64)
+
+        # group id -> [(row number, "name - status")]
+        self.examples: Dict[int, List[Tuple[int, str]]] = {}
+
+    def _ensure_capacity(self, size: int):
+        if size <= self._capacity:
+            return
+
+        capacity = max(size, self._capacity * 2, 256)
+        grow = capacity - self._capacity
+        self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=np.int64)])
+        self.successes = np.concatenate([self.successes, np.zeros(grow, dtype=np.int64)])
+        self.funding_sums = np.concatenate([self.funding_sums, np.zeros(grow)])
+        self.funding_hist = np.vstack([self.funding_hist, np.zeros((grow, FUNDING_BIN_COUNT), dtype=np.int64)])
+        self.funding_success_hist = np.vstack(
+            [self.funding_success_hist, np.zeros((grow, FUNDING_BIN_COUNT), dtype=np.int64)]
+        )
+        self.year_hist = np.vstack([self.year_hist, np.zeros((grow, self.year_hist.shape[1]), dtype=np.int64)])
+        self.cohort_hist = np.vstack([self.cohort_hist, np.zeros((grow, len(COHORT_YEARS)), dtype=np.int64)])
+        self.cohort_success_hist = np.vstack(
+            [self.cohort_success_hist, np.zeros((grow, len(COHORT_YEARS)), dtype=np.int64)]
+        )
+        self.funding_delay_hist = np.vstack(
+            [self.funding_delay_hist, np.zeros((grow, len(FUNDING_DELAY_EDGES_DAYS)), dtype=np.int64)]
+        )
+        self._capacity = capacity
+
+    def group_id(self, name: str) -> int:
+        """Id for a group name, registering it if new"""
+        group_id = self.index.get(name)
+        if group_id is None:
+            group_id = len(self.names)
+            self.index[name] = group_id
+            self.names.append(name)
+            self._ensure_capacity(len(self.names))
+        return group_id
+
+    def group_ids(self, names: Iterable[str]) -> np.ndarray:
+        """Ids for a vocabulary of names, registering new ones"""
+        return np.array([self.group_id(name) for name in names], dtype=np.int64)
+
+    def add(self, ids: np.ndarray, rows: np.ndarray, is_success: np.ndarray, funding: np.ndarray,
+            bins: np.ndarray, year_positions: np.ndarray, cohorts: np.ndarray, delay_bins: np.ndarray,
+            example_labels: np.ndarray, first_row: int):
+        """
+        Fold group memberships into the statistics.
+
+        Args:
+            ids: Group id of each membership
+            rows: Frame row of each membership (ascending)
+            is_success, funding, bins, year_positions, cohorts, delay_bins, example_labels:
+                Per-row values of the frame; year_positions, cohorts and delay_bins are -1
+                where the first funding date, founding date or either is missing
+            first_row: Dataset row number of the frame's first row
+        """
+        import pandas as pd
+
+        n = len(self.names)
+        success = is_success[rows]
+        member_funding = funding[rows]
+        member_bins = bins[rows]
+        member_years = year_positions[rows]
+        dated = member_years >= 0
+
+        self.counts[:n] += np.bincount(ids, minlength=n)
+        self.successes[:n] += np.bincount(ids[success], minlength=n)
+        self.funding_sums[:n] += np.bincount(ids, weights=member_funding, minlength=n)
+        np.add.at(self.funding_hist, (ids, member_bins), 1)
+        np.add.at(self.funding_success_hist, (ids[success], member_bins[success]), 1)
+        np.add.at(self.year_hist, (ids[dated], member_years[dated]), 1)
+
+        member_cohorts = cohorts[rows]
+        founded = member_cohorts >= 0
+        np.add.at(self.cohort_hist, (ids[founded], member_cohorts[founded]), 1)
+        np.add.at(self.cohort_success_hist, (ids[founded & success], member_cohorts[founded & success]), 1)
+        member_delays = delay_bins[rows]
+        delayed = member_delays >= 0
+        np.add.at(self.funding_delay_hist, (ids[delayed], member_delays[delayed]), 1)
+
+        # First rows of each group as examples
+        candidates = pd.DataFrame({'group': ids, 'row': rows}).groupby('group').head(EXAMPLES_PER_CATEGORY)
+        for group_id, row in zip(candidates['group'], candidates['row']):
+            examples = self.examples.setdefault(int(group_id), [])
+            if len(examples) < EXAMPLES_PER_CATEGORY:
+                examples.append((first_row + int(row), example_labels[row]))
+
+class CategoryAggregates:
+    """
+    Additive statistics over preprocessed dataset rows, folded in one frame at a time.
+
+    Everything kept here is a count or a sum (per main category and per category label,
+    per funding bin, per first-funding year, per founding-year cohort, per funding delay
+    bin, per category/country/founding-year cell),
+    so memory depends on the number of categories rather than the number of rows, and a
+    dataset can be folded in chunks of any size.
+
+    A company counts once for its main category (the first category_list entry) and
+    once for each of its labels (every '|' or ',' separated part of category_list).
+    """
+
+    def __init__(self, success_column: str = 'is_success'):
+        # Preprocessed column counted as success (see dataset_preprocessing.success_column)
+        self.success_column = success_column
+        self.categories = GroupStats()
+        self.labels = GroupStats()
+        self.rows = 0
+
+        # (category id, country or '', founding year or 0) -> [count, successes, funding sum]
+        self.cells: Dict[Tuple[int, str, int], List[float]] = {}
+        # country -> [count, successes]
+        self.countries: Dict[str, List[int]] = {}
+
+        # Overall funding pattern sums, split by outcome
+        self.outcome_totals = {
+            outcome: {'rows': 0, 'funding': 0.0, 'rounds': 0.0, 'rounds_rows': 0}
+            for outcome in ('success', 'fail')
+        }
+
+    def add_frame(self, frame: 'pd.DataFrame'):
+        """Fold preprocessed rows (see dataset_preprocessing.preprocess_frame) into the aggregates"""
+        import pandas as pd
+
+        if frame.empty:
+            return
+
+        for name in pd.unique(frame['main_category']):
+            self.categories.group_id(name)
+        ids = frame['main_category'].map(self.categories.index).to_numpy(dtype=np.int64)
+
+        is_success = frame[self.success_column].to_numpy(dtype=bool)
+        funding = frame['funding_total_usd'].to_numpy(dtype=float)
+        bins = funding_bins(funding)
+
+        first_funding_year = frame['first_funding_at'].dt.year
+        has_date = first_funding_year.notna().to_numpy()
+        year_positions = np.full(len(frame), -1, dtype=np.int64)
+        year_positions[has_date] = np.clip(
+            first_funding_year.to_numpy()[has_date].astype(int), FUNDING_YEAR_MIN, FUNDING_YEAR_MAX
+        ) - FUNDING_YEAR_MIN
+
+        cohorts = cohort_positions(frame['founded_at'].dt.year.to_numpy(dtype=float))
+        delay_bins = funding_delay_bins(frame['days_to_funding'].to_numpy(dtype=float))
+
+        names = frame['name'] if 'name' in frame.columns else pd.Series('Unknown Company', index=frame.index)
+        statuses = frame['status'] if 'status' in frame.columns else pd.Series('Unknown', index=frame.index)
+        example_labels = (
+            names.astype(object).fillna('Unknown Company').astype(str).to_numpy() + " - " +
+            statuses.astype(object).fillna('Unknown').astype(str).to_numpy()
+        )
+
+        rows = np.arange(len(frame))
+        self.categories.add(
+            ids, rows, is_success, funding, bins, year_positions, cohorts, delay_bins, example_labels, self.rows
+        )
+
+        label_codes, label_offsets, vocabulary = category_label_csr(frame['category_list'])
+        label_ids = self.labels.group_ids(vocabulary)[label_codes]
+        member_rows = np.repeat(rows, np.diff(label_offsets))
+        self.labels.add(
+            label_ids, member_rows, is_success, funding, bins, year_positions, cohorts, delay_bins, example_labels, self.rows
+        )
+
+        rounds = pd.to_numeric(frame['funding_rounds'], errors='coerce').to_numpy(dtype=float)
+        for outcome, mask in (('success', is_success), ('fail', ~is_success)):
+            totals = self.outcome_totals[outcome]
+            outcome_rounds = rounds[mask]
+            totals['rows'] += int(mask.sum())
+            totals['funding'] += float(funding[mask].sum())
+            totals['rounds'] += float(np.nansum(outcome_rounds))
+            totals['rounds_rows'] += int(np.count_nonzero(~np.isnan(outcome_rounds)))
+
+        self._add_cells(frame, ids, is_success, funding)
+        self.rows += len(frame)
+
+    def _add_cells(self, frame: 'pd.DataFrame', ids: np.ndarray, is_success: np.ndarray, funding: np.ndarray):
+        import pandas as pd
+
+        raw_country = frame['country_code'].astype(object)
+        cells = pd.DataFrame({
+            'category': ids,
+            'country': raw_country.fillna('').astype(str).str.strip().str.upper().to_numpy(),
+            'year': frame['founded_at'].dt.year.fillna(0).astype(int).to_numpy(),
+            'success': is_success,
+            'funding': funding,
+        })
+
+        grouped = cells.groupby(['category', 'country', 'year']).agg(
+            count=('success', 'size'), successes=('success', 'sum'), funding=('funding', 'sum')
+        )
+        for key, count, successes, funding_sum in zip(
+            grouped.index, grouped['count'], grouped['successes'], grouped['funding']
+        ):
+            cell = self.cells.setdefault(key, [0, 0, 0.0])
+            cell[0] += int(count)
+            cell[1] += int(successes)
+            cell[2] += float(funding_sum)
+
+        # Region success rates keep the raw country codes (missing codes excluded)
+        regions = pd.DataFrame({'country': raw_country.to_numpy(), 'success': is_success}).dropna()
+        grouped = regions.groupby('country')['success'].agg(['size', 'sum'])
+        for country, count, successes in zip(grouped.index, grouped['size'], grouped['sum']):
+            region = self.countries.setdefault(country, [0, 0])
+            region[0] += int(count)
+            region[1] += int(successes)
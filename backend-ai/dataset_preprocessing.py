@@ -0,0 +1,109 @@
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+# Kept out of startup_data_analyzer, which builds the global analyzer while it is imported:
+# forked preprocessing workers could not import that module. pandas is only imported where
+# frames are preprocessed
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Named success definitions: the statuses counted as success under each
+SUCCESS_DEFINITIONS = {
+    # 'operating' included, as the company is still active
+    'including_operating': ['acquired', 'ipo', 'operating'],
+    # Only companies that reached an exit
+    'exit_only': ['acquired', 'ipo'],
+}
+DEFAULT_SUCCESS_DEFINITION = 'including_operating'
+
+def success_column(definition: str) -> str:
+    """Preprocessed column holding success under a definition ('is_success' for the default)"""
+    return 'is_success' if definition == DEFAULT_SUCCESS_DEFINITION else f'is_success_{definition}'
+
+# Date columns of the raw dataset and the format Crunchbase exports them in
+DATE_COLUMNS = ('founded_at', 'first_funding_at', 'last_funding_at')
+DATE_FORMAT = '%Y-%m-%d'
+
+def _transform_distinct(values: 'pd.Series', transform: Callable[['pd.Series'], 'pd.Series']) -> 'pd.Series':
+    """
+    Apply a vectorized transform to the distinct values only (missing values included) and
+    broadcast the result back; category lists, statuses and dates repeat heavily.
+    """
+    import pandas as pd
+    
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    result = transform(pd.Series(uniques))
+    return pd.Series(result.to_numpy()[codes], index=values.index)
+
+def _parse_dates(values: 'pd.Series') -> 'pd.Series':
+    """Parse with the known format; only values that do not match it go through pandas' general parser"""
+    import pandas as pd
+    
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    unmatched = parsed.isna() & values.notna()
+    if unmatched.any():
+        parsed[unmatched] = pd.to_datetime(values[unmatched], format='mixed', errors='coerce')
+    return parsed
+
+def preprocess_frame(frame: 'pd.DataFrame', timings: Optional[Dict[str, float]] = None) -> 'pd.DataFrame':
+    """
+    Clean and preprocess raw dataset rows in place (the full dataset or one chunk).
+    
+    Seconds spent in each step are added to timings when given.
+    """
+    import pandas as pd
+    
+    clock = time.perf_counter()
+    
+    def lap(step: str):
+        nonlocal clock
+        now = time.perf_counter()
+        if timings is not None:
+            timings[step] = timings.get(step, 0.0) + now - clock
+        clock = now
+    
+    # Success under every definition (see SUCCESS_DEFINITIONS), so each can be aggregated
+    # side by side; by default operating companies count as successful too
+    status = _transform_distinct(frame['status'], lambda status: status.str.lower())
+    for definition, statuses in SUCCESS_DEFINITIONS.items():
+        frame[success_column(definition)] = status.isin(statuses)
+    lap('status')
+    
+    # Main category: first entry of the comma-separated list (labels are split out by
+    # category_label_csr instead of being kept as a list column)
+    def main_category(category_list: 'pd.Series') -> 'pd.Series':
+        first_entry = category_list.fillna('').str.split(',', n=1).str[0]
+        return first_entry.str.strip().where(first_entry != '', 'Unknown')
+    
+    frame['main_category'] = _transform_distinct(frame['category_list'], main_category)
+    lap('category')
+    
+    # Clean funding amounts
+    frame['funding_total_usd'] = _transform_distinct(
+        frame['funding_total_usd'], lambda amount: pd.to_numeric(amount, errors='coerce')
+    ).fillna(0)
+    lap('funding')
+    
+    # Parse dates
+    for col in DATE_COLUMNS:
+        frame[col] = _transform_distinct(frame[col], _parse_dates)
+    lap('dates')
+    
+    # Calculate time to funding
+    frame['days_to_funding'] = (
+        frame['first_funding_at'] - frame['founded_at']
+    ).dt.days
+    
+    # Calculate company age
+    frame['company_age_years'] = (
+        (datetime.now() - frame['founded_at']).dt.days / 365.25
+    ).fillna(0)
+    lap('derived')
+    
+    return frame
+
+def preprocess_chunk(frame: 'pd.DataFrame') -> Tuple['pd.DataFrame', Dict[str, float]]:
+    """Pool task: preprocess one chunk and return it with its step timings"""
+    timings = {}
+    return preprocess_frame(frame, timings), timings
@@ -0,0 +1,26 @@
+import argparse
+import logging
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the Crunchbase dataset and write the scoring tables to a stats snapshot "
+                    "served with DATASET_LOAD_MODE=stats"
+    )
+    parser.add_argument("--output", default=settings.STATS_SNAPSHOT_PATH, help="Path of the snapshot (.npz)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # The snapshot is built from the dataset itself, not from an earlier snapshot
+    if settings.DATASET_LOAD_MODE == "stats":
+        settings.DATASET_LOAD_MODE = "memory"
+    from startup_data_analyzer import startup_analyzer
+
+    startup_analyzer.export_stats(args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """
+    Collect single-item requests for a short window and process them together.
+
+    Callers await `submit(item)`. Items are buffered until either `max_batch_size`
+    items are waiting or `max_wait_ms` has elapsed since the first one arrived,
+    then `process_batch` is called once with the whole list and each caller
+    receives the result at its own position.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the buffered items over to a batch task"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        self.batches_sent += 1
+        self.items_sent += len(items)
+
+        try:
+            results = await self.process_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"Batch returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(items)} items failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        """Batching counters for monitoring"""
+        return {
+            'batches_sent': self.batches_sent,
+            'items_sent': self.items_sent,
+            'avg_batch_size': round(self.items_sent / self.batches_sent, 2) if self.batches_sent else 0.0,
+            'pending': len(self._pending),
+        }
@@ -0,0 +1,534 @@
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import openai
+import requests
+from openai import OpenAI
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the moving average latency used for routing
+LATENCY_EWMA_ALPHA = 0.2
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors and overload (Anthropic 529)
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# Rough prompt size estimate used for the tokens-per-minute budget
+CHARS_PER_TOKEN = 4
+
+class LLMThrottled(RuntimeError):
+    """The client-side rate limit has no room for the request before its deadline"""
+
+def _error_status(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    return status
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an error comes from a provider rate limit (429) or the client-side throttle"""
+    return isinstance(error, LLMThrottled) or _error_status(error) == 429
+
+def transient_error(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Whether a provider error is worth retrying, and the delay the provider asked for.
+
+    Returns:
+        (transient, retry_after seconds or None)
+    """
+    if isinstance(error, (openai.APIConnectionError, requests.ConnectionError, requests.Timeout)):
+        return True, None
+
+    status = _error_status(error)
+    if status not in TRANSIENT_STATUS_CODES:
+        return False, None
+    # An exhausted quota answers 429 too, but waiting does not help
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False, None
+
+    retry_after = None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            retry_after = float(headers["retry-after-ms"]) / 1000
+        elif headers.get("retry-after"):
+            retry_after = float(headers["retry-after"])
+    except ValueError:
+        pass  # HTTP-date form; fall back to our own backoff
+    return True, retry_after
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets for one provider (0 disables a limit).
+
+    Both budgets are token buckets refilled continuously and holding at most one minute of
+    capacity. A request takes its share up front, even if that drives a bucket negative,
+    and then waits until the bucket would have refilled, so waiting requests are served in
+    arrival order without a queue. Token counts are estimates (prompt characters / 4 plus
+    max_tokens); unused completion tokens are handed back after the reply.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = max(0, requests_per_minute)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self._requests = float(self.requests_per_minute)
+        self._tokens = float(self.tokens_per_minute)
+        self._updated = time.monotonic()
+
+        self.waits = 0
+        self.wait_ms = 0.0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    async def acquire(self, tokens: int, deadline: float):
+        """
+        Wait until the request fits in both budgets.
+
+        Raises:
+            LLMThrottled: if the wait would end after `deadline` (time.monotonic() based)
+        """
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        self._refill(now)
+        # A request larger than the whole budget waits for a full bucket instead of forever
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+        requests_needed = 1 if self.requests_per_minute else 0
+
+        self._requests -= requests_needed
+        self._tokens -= tokens
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 0:
+            wait = max(wait, -self._requests * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._tokens < 0:
+            wait = max(wait, -self._tokens * 60 / self.tokens_per_minute)
+
+        if wait <= 0:
+            return
+        if now + wait > deadline:
+            self._requests += requests_needed
+            self._tokens += tokens
+            self.rejected += 1
+            raise LLMThrottled(f"client-side rate limit needs {wait:.1f}s, past the request deadline")
+
+        self.waits += 1
+        self.wait_ms += wait * 1000
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            # Cancelled while waiting (e.g. the other side of a hedge won): nothing was sent
+            self._requests += requests_needed
+            self._tokens += tokens
+            raise
+
+    def refund(self, tokens: int):
+        """Hand back tokens reserved but not used"""
+        if self.tokens_per_minute and tokens > 0:
+            self._tokens = min(self.tokens_per_minute, self._tokens + tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'waits': self.waits,
+            'wait_ms': round(self.wait_ms, 3),
+            'rejected': self.rejected,
+        }
+
+class LLMProvider(ABC):
+    """
+    One chat-completion backend. `complete` is blocking and returns the reply text;
+    messages use the OpenAI form ({"role": "system" | "user" | "assistant", "content": ...}).
+    """
+
+    name = ""
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout: float = 30.0):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout
+
+    @abstractmethod
+    def complete(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                 json_mode: bool = False) -> str:
+        ...
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout: float = 30.0):
+        super().__init__(api_key, model, base_url, timeout)
+        # Retries are left to the router, which fails over to another provider instead
+        self.client = OpenAI(api_key=api_key, base_url=self.base_url, timeout=timeout, max_retries=0)
+
+    def complete(self, messages, max_tokens, temperature, json_mode=False) -> str:
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **options
+        )
+        return response.choices[0].message.content
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API over HTTP"""
+
+    name = "anthropic"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout: float = 30.0):
+        super().__init__(api_key, model, base_url or "https://api.anthropic.com", timeout)
+        self.session = requests.Session()
+
+    def complete(self, messages, max_tokens, temperature, json_mode=False) -> str:
+        # No JSON mode in this API; the prompts already ask for JSON-only replies
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        body = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [m for m in messages if m["role"] != "system"],
+        }
+        if system:
+            body["system"] = system
+
+        response = self.session.post(
+            f"{self.base_url}/v1/messages",
+            json=body,
+            headers={"x-api-key": self.api_key, "anthropic-version": "2023-06-01"},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return "".join(block.get("text", "") for block in response.json()["content"] if block.get("type") == "text")
+
+class GoogleProvider(LLMProvider):
+    """Gemini generateContent API over HTTP"""
+
+    name = "google"
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout: float = 30.0):
+        super().__init__(api_key, model, base_url or "https://generativelanguage.googleapis.com", timeout)
+        self.session = requests.Session()
+
+    def complete(self, messages, max_tokens, temperature, json_mode=False) -> str:
+        system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+        generation_config = {"maxOutputTokens": max_tokens, "temperature": temperature}
+        if json_mode:
+            generation_config["responseMimeType"] = "application/json"
+        body = {
+            "contents": [
+                {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+                for m in messages if m["role"] != "system"
+            ],
+            "generationConfig": generation_config,
+        }
+        if system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+
+        response = self.session.post(
+            f"{self.base_url}/v1beta/models/{self.model}:generateContent",
+            json=body,
+            headers={"x-goog-api-key": self.api_key},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        parts = response.json()["candidates"][0]["content"]["parts"]
+        return "".join(part.get("text", "") for part in parts)
+
+PROVIDER_CLASSES = {
+    "openai": OpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "google": GoogleProvider,
+}
+
+class ProviderHealth:
+    """Latency and error counters for one provider"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.consecutive_failures = 0
+        self.ewma_latency_ms: Optional[float] = None
+        self.unhealthy_until = 0.0
+        self.latencies = deque(maxlen=200)
+
+    def is_healthy(self, now: float) -> bool:
+        return self.unhealthy_until <= now
+
+class LLMRouter:
+    """
+    Sends each completion to the fastest healthy provider.
+
+    Providers are ranked by their moving-average latency (providers without samples yet
+    rank first, in configured order, so each gets measured). A provider that fails
+    `failure_threshold` times in a row is skipped for `cooldown_seconds`. A failed call
+    fails over to the next provider. With `hedge_delay_ms` > 0, a second provider is
+    also started if the first has not answered within the delay, and the first
+    successful reply wins.
+
+    Each call first waits for room in its provider's RateLimiter. Transient errors (429,
+    5xx, timeouts) are retried on the same provider with full-jitter exponential backoff
+    (or the provider's Retry-After) while the retry still fits in the request deadline;
+    only then does the call fail over.
+    """
+
+    def __init__(self, providers: List[LLMProvider], hedge_delay_ms: float = 0.0,
+                 failure_threshold: int = 3, cooldown_seconds: float = 30.0,
+                 rate_limiters: Optional[Dict[str, RateLimiter]] = None, max_retries: int = 3,
+                 retry_base_delay_ms: float = 500.0, retry_max_delay_ms: float = 8000.0,
+                 deadline_seconds: float = 45.0):
+        self.providers = providers
+        self.hedge_delay_ms = max(0.0, hedge_delay_ms)
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.rate_limiters = rate_limiters or {}
+        self.max_retries = max(0, max_retries)
+        self.retry_base_delay_ms = retry_base_delay_ms
+        self.retry_max_delay_ms = max(retry_base_delay_ms, retry_max_delay_ms)
+        self.deadline_seconds = deadline_seconds
+        self.health: Dict[str, ProviderHealth] = {provider.name: ProviderHealth() for provider in providers}
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+    @property
+    def available(self) -> bool:
+        return bool(self.providers)
+
+    def ranked_providers(self) -> List[LLMProvider]:
+        """Healthy providers fastest first, then the ones in cooldown (soonest back first)"""
+        now = time.monotonic()
+        order = {provider.name: i for i, provider in enumerate(self.providers)}
+        healthy = [p for p in self.providers if self.health[p.name].is_healthy(now)]
+        cooling = [p for p in self.providers if not self.health[p.name].is_healthy(now)]
+        healthy.sort(key=lambda p: (self.health[p.name].ewma_latency_ms or 0.0, order[p.name]))
+        cooling.sort(key=lambda p: self.health[p.name].unhealthy_until)
+        return healthy + cooling
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7,
+                       json_mode: bool = False) -> str:
+        """
+        Run a chat completion on the best provider and return the reply text.
+
+        Raises:
+            RuntimeError: if no provider is configured
+            Exception: the last provider error (LLMThrottled if no provider had rate limit room
+                before the deadline) if every provider failed
+        """
+        ranked = self.ranked_providers()
+        if not ranked:
+            raise RuntimeError("No LLM provider configured")
+
+        primary = ranked[0]
+        request = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature, "json_mode": json_mode}
+        deadline = time.monotonic() + self.deadline_seconds
+        running: Dict[asyncio.Future, LLMProvider] = {}
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        def launch():
+            provider = ranked.pop(0)
+            running[asyncio.ensure_future(self._call(provider, request, deadline))] = provider
+
+        launch()
+        try:
+            while running:
+                hedge_pending = self.hedge_delay_ms > 0 and ranked and not hedged
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_delay_ms / 1000 if hedge_pending else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # The first provider is slow: race it against the next one
+                    hedged = True
+                    self.hedged_requests += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None:
+                        if hedged and provider is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM provider '{provider.name}' failed: {str(last_error)}")
+
+                if not running and ranked:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise last_error
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        base = self.retry_base_delay_ms / 1000
+        if retry_after is not None:
+            return retry_after + random.uniform(0, base)
+        return random.uniform(0, min(self.retry_max_delay_ms / 1000, base * 2 ** attempt))
+
+    async def _call(self, provider: LLMProvider, request: Dict[str, Any], deadline: float) -> str:
+        health = self.health[provider.name]
+        limiter = self.rate_limiters.get(provider.name)
+        prompt_chars = sum(len(message["content"]) for message in request["messages"])
+        reserved_tokens = prompt_chars // CHARS_PER_TOKEN + request["max_tokens"]
+
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire(reserved_tokens, deadline)
+
+            health.requests += 1
+            started = time.perf_counter()
+            try:
+                text = await asyncio.to_thread(provider.complete, **request)
+                break
+            except asyncio.CancelledError:
+                # A hedged attempt that lost the race: its reply is discarded
+                if limiter is not None:
+                    limiter.refund(reserved_tokens)
+                raise
+            except Exception as error:
+                # Failed attempts (rate limited, timed out, ...) hand their reservation back
+                # before backing off, so errors do not drain the token budget
+                if limiter is not None:
+                    limiter.refund(reserved_tokens)
+                health.errors += 1
+                if is_rate_limit_error(error):
+                    health.rate_limited += 1
+
+                transient, retry_after = transient_error(error)
+                delay = self._retry_delay(attempt, retry_after)
+                if transient and attempt < self.max_retries and time.monotonic() + delay < deadline:
+                    attempt += 1
+                    health.retries += 1
+                    logger.info(
+                        f"LLM provider '{provider.name}' transient error, retry {attempt} in {delay:.2f}s: {str(error)}"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+                health.consecutive_failures += 1
+                if health.consecutive_failures >= self.failure_threshold:
+                    health.unhealthy_until = time.monotonic() + self.cooldown_seconds
+                    logger.warning(f"LLM provider '{provider.name}' marked unhealthy for {self.cooldown_seconds}s")
+                raise
+
+        if limiter is not None:
+            limiter.refund(request["max_tokens"] - len(text or "") // CHARS_PER_TOKEN)
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        health.consecutive_failures = 0
+        health.unhealthy_until = 0.0
+        health.latencies.append(latency_ms)
+        health.ewma_latency_ms = latency_ms if health.ewma_latency_ms is None else (
+            LATENCY_EWMA_ALPHA * latency_ms + (1 - LATENCY_EWMA_ALPHA) * health.ewma_latency_ms
+        )
+        return text
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider latency, error, retry, throttle and health counters plus hedging counters"""
+        now = time.monotonic()
+        providers = []
+        for provider in self.providers:
+            health = self.health[provider.name]
+            latencies = np.array(health.latencies) if health.latencies else None
+            providers.append({
+                'name': provider.name,
+                'model': provider.model,
+                'healthy': health.is_healthy(now),
+                'requests': health.requests,
+                'errors': health.errors,
+                'rate_limited': health.rate_limited,
+                'retries': health.retries,
+                'consecutive_failures': health.consecutive_failures,
+                'ewma_latency_ms': round(health.ewma_latency_ms, 3) if health.ewma_latency_ms is not None else None,
+                'p50_latency_ms': round(float(np.percentile(latencies, 50)), 3) if latencies is not None else None,
+                'p95_latency_ms': round(float(np.percentile(latencies, 95)), 3) if latencies is not None else None,
+                'throttle': self.rate_limiters[provider.name].get_stats() if provider.name in self.rate_limiters else None,
+            })
+
+        return {
+            'hedge_delay_ms': self.hedge_delay_ms,
+            'hedged_requests': self.hedged_requests,
+            'hedge_wins': self.hedge_wins,
+            'providers': providers,
+        }
+
+def build_providers() -> List[LLMProvider]:
+    """
+    Providers from LLM_PROVIDERS (comma-separated, in order of preference), defaulting to
+    DEFAULT_MODEL_PROVIDER followed by the others. Providers without an API key are skipped.
+    """
+    keys = {"openai": settings.OPENAI_API_KEY, "anthropic": settings.ANTHROPIC_API_KEY, "google": settings.GOOGLE_API_KEY}
+    models = {"openai": settings.OPENAI_MODEL_NAME, "anthropic": settings.ANTHROPIC_MODEL_NAME, "google": settings.GOOGLE_MODEL_NAME}
+    base_urls = {"openai": settings.OPENAI_BASE_URL, "anthropic": settings.ANTHROPIC_BASE_URL, "google": settings.GOOGLE_BASE_URL}
+
+    names = [name.strip().lower() for name in settings.LLM_PROVIDERS.split(",") if name.strip()]
+    if not names:
+        names = [settings.DEFAULT_MODEL_PROVIDER.lower()] + list(PROVIDER_CLASSES)
+
+    providers = []
+    for name in dict.fromkeys(names):
+        if name not in PROVIDER_CLASSES:
+            logger.warning(f"Unknown LLM provider '{name}' - skipped")
+            continue
+        if not keys[name]:
+            continue
+
+        try:
+            providers.append(PROVIDER_CLASSES[name](keys[name], models[name], base_urls[name] or None, settings.LLM_REQUEST_TIMEOUT))
+        except Exception as e:
+            logger.warning(f"Failed to initialize LLM provider '{name}': {str(e)}")
+
+    logger.info(f"LLM providers: {[f'{p.name}:{p.model}' for p in providers] or 'none'}")
+    return providers
+
+def build_rate_limiters() -> Dict[str, RateLimiter]:
+    """Rate limiters for providers with a configured requests or tokens per minute budget"""
+    budgets = {
+        "openai": (settings.OPENAI_REQUESTS_PER_MINUTE, settings.OPENAI_TOKENS_PER_MINUTE),
+        "anthropic": (settings.ANTHROPIC_REQUESTS_PER_MINUTE, settings.ANTHROPIC_TOKENS_PER_MINUTE),
+        "google": (settings.GOOGLE_REQUESTS_PER_MINUTE, settings.GOOGLE_TOKENS_PER_MINUTE),
+    }
+    limiters = {name: RateLimiter(rpm, tpm) for name, (rpm, tpm) in budgets.items()}
+    return {name: limiter for name, limiter in limiters.items() if limiter.enabled}
+
+# Global LLM router instance
+llm_router = LLMRouter(
+    build_providers(),
+    hedge_delay_ms=settings.LLM_HEDGE_DELAY_MS,
+    failure_threshold=settings.LLM_FAILURE_THRESHOLD,
+    cooldown_seconds=settings.LLM_COOLDOWN_SECONDS,
+    rate_limiters=build_rate_limiters(),
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_delay_ms=settings.LLM_RETRY_BASE_DELAY_MS,
+    retry_max_delay_ms=settings.LLM_RETRY_MAX_DELAY_MS,
+    deadline_seconds=settings.LLM_REQUEST_DEADLINE_SECONDS
+)
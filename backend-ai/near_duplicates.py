@@ -0,0 +1,187 @@
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# MinHash signature length and its LSH banding: 32 bands of 4 rows put the 50% candidate
+# probability near a Jaccard similarity of 0.42, so pairs above the match threshold are
+# almost always found, and candidates are then verified on the full signature
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Word shingle length
+SHINGLE_SIZE = 3
+
+_HASH_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(1, int(_HASH_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_HASH_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+
+def _shingles(text: str) -> set:
+    """Overlapping word n-grams of the normalized text (the whole text if it is shorter)"""
+    tokens = TOKEN_PATTERN.findall(text.casefold())
+    if len(tokens) < SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature of a text, or None if it has no words"""
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+
+    # Shingle hashes are 32-bit and the permutation coefficients are 31-bit, so the
+    # products fit in uint64 without overflow
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _HASH_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of submitted project descriptions, persisted in SQLite.
+
+    Each project (keyed by its normalized name) keeps the signature of its latest
+    description. Lookups hash the query into LSH_BANDS buckets and verify only the
+    projects sharing a bucket, so the cost does not grow with the number of stored
+    descriptions. The buckets are rebuilt from the database on start.
+    """
+
+    def __init__(self, db_path: str, threshold: float = 0.7):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, str] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(LSH_BANDS)]
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS description_signatures (
+                    id TEXT PRIMARY KEY,
+                    label TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            rows = self._conn.execute("SELECT id, label, signature FROM description_signatures").fetchall()
+
+        for key, label, blob in rows:
+            self._insert(key, label, np.frombuffer(blob, dtype=np.uint32))
+        logger.info(f"Near-duplicate index loaded: {len(self._signatures)} descriptions")
+
+    @staticmethod
+    def project_key(name: str) -> str:
+        return " ".join(name.casefold().split())
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in signature.reshape(LSH_BANDS, LSH_ROWS)]
+
+    def _insert(self, key: str, label: str, signature: np.ndarray):
+        self._remove(key)
+        self._signatures[key] = signature
+        self._labels[key] = label
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, set()).add(key)
+
+    def _remove(self, key: str):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        self._labels.pop(key, None)
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band_key]
+
+    def _query(self, signature: np.ndarray, exclude_key: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        candidates.discard(exclude_key)
+
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append({'project': self._labels[key], 'similarity': similarity})
+
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+
+    def find(self, description: str, exclude_name: Optional[str] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Stored descriptions with an estimated Jaccard similarity of at least `threshold`.
+
+        Returns:
+            Up to `limit` dicts with the project label and similarity (0-1), most similar first
+        """
+        signature = minhash_signature(description)
+        if signature is None:
+            return []
+
+        exclude_key = self.project_key(exclude_name) if exclude_name else None
+        with self._lock:
+            return self._query(signature, exclude_key, limit)
+
+    def add(self, name: str, description: str) -> bool:
+        """
+        Store a project's description under its name, replacing the project's previous one.
+        Unnamed projects and unchanged descriptions are not stored.
+
+        Returns:
+            Whether the index changed
+        """
+        signature = minhash_signature(description)
+        key = self.project_key(name)
+        if signature is None or not key:
+            return False
+
+        label = name.strip()
+        with self._lock:
+            stored = self._signatures.get(key)
+            if stored is not None and np.array_equal(stored, signature) and self._labels[key] == label:
+                return False
+
+            self._insert(key, label, signature)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO description_signatures (id, label, signature, updated_at) VALUES (?, ?, ?, ?)",
+                    (key, label, signature.tobytes(), datetime.now().isoformat())
+                )
+        return True
+
+    def remove(self, name: str) -> bool:
+        """Drop a project's description; returns whether it was stored"""
+        key = self.project_key(name)
+        with self._lock:
+            if key not in self._signatures:
+                return False
+            self._remove(key)
+            with self._conn:
+                self._conn.execute("DELETE FROM description_signatures WHERE id = ?", (key,))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Global near-duplicate index instance
+description_index = NearDuplicateIndex(settings.NEAR_DUPLICATE_DB_PATH, settings.NEAR_DUPLICATE_THRESHOLD)
@@ -0,0 +1,416 @@
+import logging
+import math
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dataset_aggregates import GroupStats, FUNDING_BIN_EDGES, FUNDING_YEAR_MIN, FUNDING_YEAR_MAX, funding_bins
+
+logger = logging.getLogger(__name__)
+
+# Years (first funding on or after Jan 1st) tried in order when measuring recent investment activity
+RECENT_FUNDING_THRESHOLD_YEARS = [2020, 2018, 2015, 2010]
+
+# Year of each column of the cumulative first-funding tables
+FUNDING_YEARS = np.arange(FUNDING_YEAR_MIN, FUNDING_YEAR_MAX + 1)
+
+# Pseudo-companies at the group's overall success rate added to every funding bin
+FUNDING_SUCCESS_PRIOR = 10
+
+FUNDING_BIN_EDGES_LIST = FUNDING_BIN_EDGES.tolist()
+
+# Values of the trailing sentinel entry, used for unknown groups
+TABLE_DEFAULTS = {
+    'count': 0,
+    'success_count': 0,
+    'funding_sum': 0,
+    'category_risk': 50,
+    'funding_risk': 50,
+    'funding_rank': 50,
+    'trend': 30,
+    'uniqueness': 95,
+}
+
+def funding_risk_from_histograms(hist: np.ndarray, success_hist: np.ndarray):
+    """
+    Failure rate among companies funded above the median, for one funding histogram
+    or a stack of them. The median is resolved to its histogram bin.
+    """
+    counts = hist.sum(axis=-1)
+    cumulative = np.cumsum(hist, axis=-1)
+    median_bin = (cumulative < (counts / 2)[..., None]).sum(axis=-1)
+    above = np.arange(hist.shape[-1]) > median_bin[..., None]
+    above_counts = (hist * above).sum(axis=-1)
+    above_success = (success_hist * above).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(
+            above_counts > 0,
+            np.clip((1 - above_success / above_counts) * 100, 0, 100),
+            50.0
+        )
+
+def funding_bin_success_rates(hist: np.ndarray, success_hist: np.ndarray, prior_rate: float) -> np.ndarray:
+    """
+    Success rate per funding bin, for one funding histogram or a stack of them. Sparse bins
+    are pulled towards the group's rate, and small groups towards prior_rate (the rate over
+    all groups), by FUNDING_SUCCESS_PRIOR pseudo-companies each.
+    """
+    group_rate = (
+        (success_hist.sum(axis=-1, keepdims=True) + FUNDING_SUCCESS_PRIOR * prior_rate)
+        / (hist.sum(axis=-1, keepdims=True) + FUNDING_SUCCESS_PRIOR)
+    )
+    return (success_hist + FUNDING_SUCCESS_PRIOR * group_rate) / (hist + FUNDING_SUCCESS_PRIOR)
+
+def funding_percentile(cumulative: np.ndarray, amount: float) -> Optional[float]:
+    """
+    Share (0-100) of a group's companies funded at or below an amount, from one row of
+    cumulative funding histogram counts. Within a bin companies are assumed spread evenly
+    on a log scale. None for an empty group.
+    """
+    total = cumulative[-1]
+    if total <= 0:
+        return None
+
+    amount = max(0.0, float(amount))
+    funding_bin = bisect_right(FUNDING_BIN_EDGES_LIST, amount) - 1
+    below = cumulative[funding_bin - 1] if funding_bin > 0 else 0
+    fraction = 1.0
+    if 0 < funding_bin < len(FUNDING_BIN_EDGES_LIST) - 1:
+        low, high = FUNDING_BIN_EDGES_LIST[funding_bin], FUNDING_BIN_EDGES_LIST[funding_bin + 1]
+        fraction = math.log(amount / low) / math.log(high / low)
+    return float((below + fraction * (cumulative[funding_bin] - below)) / total * 100)
+
+def exact_funding_risk(codes: np.ndarray, funding: np.ndarray, is_success: np.ndarray,
+                       n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Failure rate among companies funded above their group's exact median.
+
+    Args:
+        codes: Group id of each membership (a company appears once per group it belongs to)
+        funding, is_success: Values of each membership
+        n: Number of groups
+
+    Returns:
+        (risk per group, membership order sorted by group then funding, group offsets into that order)
+    """
+    counts = np.bincount(codes, minlength=n)
+    order = np.lexsort((funding, codes))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    sorted_funding = funding[order]
+    starts = offsets[:-1]
+    medians = np.zeros(n)
+    present = counts > 0
+    medians[present] = (
+        sorted_funding[starts[present] + (counts[present] - 1) // 2] + sorted_funding[starts[present] + counts[present] // 2]
+    ) / 2
+
+    above = funding > medians[codes]
+    above_counts = np.bincount(codes[above], minlength=n)
+    above_success = np.bincount(codes[above & is_success], minlength=n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk = np.where(above_counts > 0, np.clip((1 - above_success / above_counts) * 100, 0, 100), 50.0)
+    return risk, order, offsets
+
+def count_fundings_since(cumulative: np.ndarray, year: int):
+    """First fundings in or after the given year, for one cumulative histogram row or a stack of rows"""
+    position = int(year - FUNDING_YEARS[0])
+    if position <= 0:
+        return cumulative[..., -1]
+    if position > len(FUNDING_YEARS):
+        return np.zeros_like(cumulative[..., -1])
+    return cumulative[..., -1] - cumulative[..., position - 1]
+
+def trend_from_cumulative(cumulative: np.ndarray, threshold_years: Optional[List[int]] = None) -> float:
+    """Recent share of dated fundings; the first threshold year with any activity wins"""
+    total = int(cumulative[-1])
+    if total == 0:
+        return 30  # Lower trend for categories with no recent activity
+
+    for year in threshold_years or RECENT_FUNDING_THRESHOLD_YEARS:
+        recent = count_fundings_since(cumulative, year)
+        if recent > 0:
+            return max(0, min(100, recent / total * 100))
+
+    return 30
+
+def _word_set(name: str) -> set:
+    return set(word.strip().lower() for word in name.replace('|', ' ').split())
+
+class ScoreTables:
+    """
+    Score tables for one kind of group (main categories or category labels).
+
+    Groups are indexed by id, in sorted name order as loaded. Every table has one entry
+    per group plus a trailing sentinel entry holding TABLE_DEFAULTS, so an id of -1
+    selects the defaults without branching.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.names_lower: List[str] = []
+        self.word_sets: List[set] = []
+        self.tables: Dict[str, np.ndarray] = {}
+        self.funding_hist = None
+        self.funding_success_hist = None
+        # Derived from the funding histograms: cumulative counts per bin and smoothed success rate per bin
+        self.funding_cumulative = None
+        self.funding_bin_success = None
+        self.success_rate = 0.5
+        # Row i counts the group's companies first funded in or before each year of FUNDING_YEARS
+        self.year_cumulative = None
+        # Companies and successes per founding-year cohort (COHORT_YEARS), companies per funding delay bin
+        self.cohort_hist = None
+        self.cohort_success_hist = None
+        self.funding_delay_hist = None
+        self.sorted_funding_sums = np.zeros(0)
+        # group id -> [(row number, "name - status")]
+        self.examples: Dict[int, List[Tuple[int, str]]] = {}
+        self._lower_index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_stats(cls, stats: GroupStats, total_rows: int) -> Tuple['ScoreTables', np.ndarray]:
+        """
+        Build the tables from folded group statistics.
+
+        Returns:
+            (tables, remap) where remap[aggregate group id] is the table id
+        """
+        order = np.array(sorted(range(len(stats.names)), key=stats.names.__getitem__), dtype=np.int64)
+        n = len(order)
+        remap = np.empty(n, dtype=np.int64)
+        remap[order] = np.arange(n)
+
+        tables = cls()
+        tables.names = [stats.names[i] for i in order]
+        tables.index = {name: i for i, name in enumerate(tables.names)}
+        tables.names_lower = [name.lower() for name in tables.names]
+        tables.word_sets = [_word_set(name) for name in tables.names]
+
+        counts = stats.counts[order]
+        success_counts = stats.successes[order]
+        funding_sums = stats.funding_sums[order]
+
+        def with_empty_row(values: np.ndarray) -> np.ndarray:
+            return np.vstack([values, np.zeros((1, values.shape[1]), dtype=values.dtype)])
+
+        # Category risk: inverse of the success rate
+        with np.errstate(divide='ignore', invalid='ignore'):
+            category_risk = np.clip((1 - success_counts / counts) * 100, 0, 100)
+
+        # Funding risk: failure rate above the group median, from funding histograms
+        tables.funding_hist = with_empty_row(stats.funding_hist[order])
+        tables.funding_success_hist = with_empty_row(stats.funding_success_hist[order])
+        funding_risk = funding_risk_from_histograms(tables.funding_hist[:n], tables.funding_success_hist[:n])
+
+        # Investment trend from yearly histograms of first funding dates
+        tables.year_cumulative = np.cumsum(with_empty_row(stats.year_hist[order]), axis=1)
+        cumulative = tables.year_cumulative[:n]
+        dated_counts = cumulative[:, -1]
+        trend = np.full(n, 30.0)
+        unresolved = dated_counts > 0
+        for year in RECENT_FUNDING_THRESHOLD_YEARS:
+            recent_counts = count_fundings_since(cumulative, year)
+            resolved_now = unresolved & (recent_counts > 0)
+            trend[resolved_now] = np.clip(recent_counts[resolved_now] / dated_counts[resolved_now] * 100, 0, 100)
+            unresolved &= ~resolved_now
+
+        # Founding-year cohorts and time to first funding
+        tables.cohort_hist = with_empty_row(stats.cohort_hist[order])
+        tables.cohort_success_hist = with_empty_row(stats.cohort_success_hist[order])
+        tables.funding_delay_hist = with_empty_row(stats.funding_delay_hist[order])
+
+        tables.examples = {int(remap[group_id]): examples for group_id, examples in stats.examples.items()}
+
+        values = {
+            'count': counts,
+            'success_count': success_counts,
+            'funding_sum': funding_sums,
+            'category_risk': category_risk,
+            'funding_risk': funding_risk,
+            'funding_rank': np.zeros(n),
+            'trend': trend,
+            'uniqueness': np.zeros(n),
+        }
+        tables.tables = {key: np.append(values[key].astype(float), default) for key, default in TABLE_DEFAULTS.items()}
+        tables._derive_funding_tables()
+        tables.refresh(total_rows)
+        return tables, remap
+
+    def _derive_funding_tables(self):
+        n = len(self.names)
+        total = self.tables['count'][:n].sum()
+        self.success_rate = float(self.tables['success_count'][:n].sum() / total) if total > 0 else 0.5
+        self.funding_cumulative = np.cumsum(self.funding_hist, axis=1)
+        self.funding_bin_success = funding_bin_success_rates(self.funding_hist, self.funding_success_hist, self.success_rate)
+
+    def refresh(self, total_rows: int):
+        """Recompute the scores that compare groups with each other (funding rank, uniqueness)"""
+        n = len(self.names)
+        counts = self.tables['count'][:n]
+        funding_sums = self.tables['funding_sum'][:n]
+
+        # Funding rank: share of groups with strictly smaller total funding
+        self.sorted_funding_sums = np.sort(funding_sums)
+        self.tables['funding_rank'][:n] = np.searchsorted(self.sorted_funding_sums, funding_sums, side='left') / max(1, n) * 100
+
+        # Uniqueness: inverse of group frequency
+        self.tables['uniqueness'][:n] = np.clip(100 - (counts / max(1, total_rows)) * 100 * 2, 0, 100)
+
+    def add_group(self, name: str) -> int:
+        """Register a group first seen after load; its entries start from the defaults"""
+        group_id = len(self.names)
+        self.tables = {key: np.insert(table, group_id, table[-1]) for key, table in self.tables.items()}
+        self.funding_hist = np.insert(self.funding_hist, group_id, 0, axis=0)
+        self.funding_success_hist = np.insert(self.funding_success_hist, group_id, 0, axis=0)
+        self.funding_cumulative = np.insert(self.funding_cumulative, group_id, 0, axis=0)
+        self.funding_bin_success = np.insert(self.funding_bin_success, group_id, self.success_rate, axis=0)
+        self.year_cumulative = np.insert(self.year_cumulative, group_id, 0, axis=0)
+        self.cohort_hist = np.insert(self.cohort_hist, group_id, 0, axis=0)
+        self.cohort_success_hist = np.insert(self.cohort_success_hist, group_id, 0, axis=0)
+        self.funding_delay_hist = np.insert(self.funding_delay_hist, group_id, 0, axis=0)
+
+        self.index[name] = group_id
+        self.names.append(name)
+        self.names_lower.append(name.lower())
+        self.word_sets.append(_word_set(name))
+        if self._lower_index is not None:
+            self._lower_index.setdefault(name.lower(), group_id)
+        return group_id
+
+    def apply(self, group_id: int, success: bool, funding: float, year_position: Optional[int], sign: int,
+              cohort: Optional[int] = None, delay_bin: Optional[int] = None):
+        """
+        Add (sign=1) or remove (sign=-1) one company from a group's entries. Funding risk of a
+        touched group comes from its histogram from then on; call refresh() afterwards for
+        funding rank and uniqueness.
+
+        Args:
+            year_position, cohort, delay_bin: First funding year, founding-year cohort and
+                funding delay bin columns, or None if unknown
+        """
+        success = int(success)
+        tables = self.tables
+        tables['count'][group_id] += sign
+        tables['success_count'][group_id] += sign * success
+        tables['funding_sum'][group_id] += sign * funding
+
+        count = tables['count'][group_id]
+        tables['category_risk'][group_id] = (
+            np.clip((1 - tables['success_count'][group_id] / count) * 100, 0, 100) if count > 0 else 50
+        )
+
+        funding_bin = funding_bins(np.array([funding]))[0]
+        self.funding_hist[group_id, funding_bin] += sign
+        self.funding_success_hist[group_id, funding_bin] += sign * success
+        tables['funding_risk'][group_id] = funding_risk_from_histograms(
+            self.funding_hist[group_id], self.funding_success_hist[group_id]
+        )
+        self.funding_cumulative[group_id, funding_bin:] += sign
+        self.funding_bin_success[group_id] = funding_bin_success_rates(
+            self.funding_hist[group_id], self.funding_success_hist[group_id], self.success_rate
+        )
+
+        if year_position is not None:
+            self.year_cumulative[group_id, year_position:] += sign
+            tables['trend'][group_id] = trend_from_cumulative(self.year_cumulative[group_id])
+
+        if cohort is not None:
+            self.cohort_hist[group_id, cohort] += sign
+            self.cohort_success_hist[group_id, cohort] += sign * success
+        if delay_bin is not None:
+            self.funding_delay_hist[group_id, delay_bin] += sign
+
+    def funding_position(self, group_id: int, amount: float) -> Optional[Dict[str, float]]:
+        """
+        Where a funding amount falls within a group: the percentile of the amount (see
+        funding_percentile) and the smoothed success rate of the group's companies in the
+        same funding bin. None for an empty group.
+        """
+        percentile = funding_percentile(self.funding_cumulative[group_id], amount)
+        if percentile is None:
+            return None
+        funding_bin = bisect_right(FUNDING_BIN_EDGES_LIST, max(0.0, float(amount))) - 1
+        return {
+            'percentile': percentile,
+            'bin_success_rate': float(self.funding_bin_success[group_id, funding_bin]),
+            'bin_count': int(self.funding_hist[group_id, funding_bin]),
+        }
+
+    def index_array(self, names) -> np.ndarray:
+        """Ids for a sequence of known group names"""
+        return np.array([self.index[name] for name in names], dtype=np.int64)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Every table as named arrays (see from_arrays), for a stats snapshot"""
+        example_groups, example_rows, example_labels = [], [], []
+        for group_id, examples in sorted(self.examples.items()):
+            for row, label in examples:
+                example_groups.append(group_id)
+                example_rows.append(row)
+                example_labels.append(label)
+
+        arrays = {
+            'names': np.array(self.names, dtype=str),
+            'funding_hist': self.funding_hist,
+            'funding_success_hist': self.funding_success_hist,
+            'year_cumulative': self.year_cumulative,
+            'cohort_hist': self.cohort_hist,
+            'cohort_success_hist': self.cohort_success_hist,
+            'funding_delay_hist': self.funding_delay_hist,
+            'example_groups': np.array(example_groups, dtype=np.int64),
+            'example_rows': np.array(example_rows, dtype=np.int64),
+            'example_labels': np.array(example_labels, dtype=str),
+        }
+        arrays.update({f"table_{key}": table for key, table in self.tables.items()})
+        return {f"{prefix}{key}": values for key, values in arrays.items()}
+
+    @classmethod
+    def from_arrays(cls, data, prefix: str, total_rows: int, missing_years: int = 0) -> 'ScoreTables':
+        """
+        Rebuild tables saved by to_arrays.
+
+        missing_years widens the year columns of tables exported when FUNDING_YEAR_MAX was
+        that many years earlier: cumulative funding counts carry over, later cohorts start empty.
+        """
+        def widen(values: np.ndarray, cumulative: bool) -> np.ndarray:
+            if missing_years <= 0:
+                return values
+            return np.pad(values, ((0, 0), (0, missing_years)), mode='edge' if cumulative else 'constant')
+
+        tables = cls()
+        tables.names = data[f"{prefix}names"].tolist()
+        tables.index = {name: i for i, name in enumerate(tables.names)}
+        tables.names_lower = [name.lower() for name in tables.names]
+        tables.word_sets = [_word_set(name) for name in tables.names]
+        tables.funding_hist = data[f"{prefix}funding_hist"]
+        tables.funding_success_hist = data[f"{prefix}funding_success_hist"]
+        tables.year_cumulative = widen(data[f"{prefix}year_cumulative"], cumulative=True)
+        tables.cohort_hist = widen(data[f"{prefix}cohort_hist"], cumulative=False)
+        tables.cohort_success_hist = widen(data[f"{prefix}cohort_success_hist"], cumulative=False)
+        tables.funding_delay_hist = data[f"{prefix}funding_delay_hist"]
+        tables.tables = {key: data[f"{prefix}table_{key}"] for key in TABLE_DEFAULTS}
+        tables._derive_funding_tables()
+
+        for group_id, row, label in zip(
+            data[f"{prefix}example_groups"].tolist(), data[f"{prefix}example_rows"].tolist(),
+            data[f"{prefix}example_labels"].tolist()
+        ):
+            tables.examples.setdefault(group_id, []).append((row, label))
+
+        tables.refresh(total_rows)
+        return tables
+
+    def lookup(self, name: str) -> int:
+        """Id of a group by exact name, then case-insensitively; -1 if unknown"""
+        group_id = self.index.get(name)
+        if group_id is not None:
+            return group_id
+        if self._lower_index is None:
+            self._lower_index = {lower: i for i, lower in reversed(list(enumerate(self.names_lower)))}
+        return self._lower_index.get(str(name).strip().lower(), -1)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+def _init_process_worker(platform_records: list):
+    """Bring a new process worker's analyzer up to date with the ingested platform records"""
+    from startup_data_analyzer import startup_analyzer
+
+    if platform_records:
+        startup_analyzer.ingest_records(platform_records)
+
+def _call_analyzer_method(method_name: str, args: tuple):
+    """
+    Run a StartupDataAnalyzer method inside a pool worker.
+
+    Process workers import the module-level analyzer once and keep it for their lifetime.
+    Returns the wall-clock start time with the result so queue wait can be measured.
+    """
+    from startup_data_analyzer import startup_analyzer
+
+    started_at = time.time()
+    return started_at, getattr(startup_analyzer, method_name)(*args)
+
+class ScoringExecutor:
+    """
+    Runs CPU-bound analyzer scoring off the event loop on a thread or process pool.
+
+    At most `max_pending` calls are handed to the pool at once; further callers wait
+    for a free slot, which bounds the pool's internal queue. Queue depth and wait time
+    (from submission until the call starts running) are tracked for monitoring.
+
+    Process workers hold their own copy of the analyzer, so the process pool is replaced
+    whenever platform records change the dataset version.
+    """
+
+    def __init__(self, mode: str = "thread", workers: int = 4, max_pending: int = 64):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor: Executor = None
+        self._pool_version = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self.mode == "process":
+            from startup_data_analyzer import startup_analyzer
+
+            if self._executor is not None and self._pool_version != startup_analyzer.dataset_version:
+                logger.info("Dataset version changed - replacing scoring process pool")
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+        if self._executor is None:
+            if self.mode == "process":
+                self._pool_version = startup_analyzer.dataset_version
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_process_worker,
+                    initargs=(startup_analyzer.get_platform_records(),)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scoring")
+            logger.info(f"Scoring executor started: {self.mode} pool with {self.workers} workers")
+        return self._executor
+
+    async def run(self, method_name: str, *args) -> Any:
+        """Run startup_analyzer.<method_name>(*args) on the pool and return its result"""
+        submitted_at = time.time()
+        self.waiting += 1
+        try:
+            async with self._slots:
+                self.in_flight += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    started_at, result = await loop.run_in_executor(
+                        self._get_executor(), _call_analyzer_method, method_name, args
+                    )
+                finally:
+                    self.in_flight -= 1
+        finally:
+            self.waiting -= 1
+
+        finished_at = time.time()
+        wait_ms = max(0.0, (started_at - submitted_at) * 1000)
+        self.completed += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.total_run_ms += (finished_at - started_at) * 1000
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and timing counters"""
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            # Calls not finished yet, minus the ones the pool workers can be running
+            'queue_depth': self.waiting - min(self.in_flight, self.workers),
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'avg_wait_ms': round(self.total_wait_ms / self.completed, 3) if self.completed else 0.0,
+            'max_wait_ms': round(self.max_wait_ms, 3),
+            'avg_run_ms': round(self.total_run_ms / self.completed, 3) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Global scoring executor instance
+scoring_executor = ScoringExecutor(
+    mode=settings.SCORING_EXECUTOR_MODE,
+    workers=settings.SCORING_EXECUTOR_WORKERS,
+    max_pending=settings.SCORING_EXECUTOR_MAX_PENDING
+)
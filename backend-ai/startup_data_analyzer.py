@@ -1,14 +1,72 @@
-import pandas as pd
+import bisect
+import copy
 import numpy as np
-from typing import Dict, Any, List, Optional
-import kagglehub
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 import logging
-from datetime import datetime
-import re
-from functools import lru_cache
+from datetime import date, datetime
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
+from config import settings
+from dataset_preprocessing import (
+    DEFAULT_SUCCESS_DEFINITION, SUCCESS_DEFINITIONS, preprocess_chunk, preprocess_frame, success_column
+)
+from dataset_aggregates import (
+    COHORT_YEAR_MIN, COHORT_YEARS, FUNDING_DELAY_EDGES_DAYS, FUNDING_YEAR_MIN, FUNDING_YEAR_MAX, CategoryAggregates,
+    category_label_csr, funding_bins, funding_delay_bins, split_category_labels
+)
+from success_model import SuccessModel, SuccessModelTrainer
+from score_tables import (
+    ScoreTables, FUNDING_YEARS, exact_funding_risk, funding_bin_success_rates, funding_percentile,
+    funding_risk_from_histograms, trend_from_cumulative
+)
+
+# pandas and kagglehub are imported only where the dataset is loaded, so the stats
+# serving mode (DATASET_LOAD_MODE=stats) never imports them
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def _reads_tables(method):
+    """
+    Run an analyzer method under the ingest lock: scoring runs on worker threads while
+    platform records update the tables, dicts and name lists it reads
+    """
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._ingest_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+# Format version of stats snapshots written by export_stats
+STATS_SNAPSHOT_VERSION = 4
+
+# Category ranking sort keys and the order each defaults to (best first)
+CATEGORY_RANK_ORDERS = {
+    'risk': 'asc',
+    'market_size': 'desc',
+    'funding': 'desc',
+    'trend': 'desc',
+    'uniqueness': 'desc',
+}
+
+# Columns and dtypes read by the streaming loader; everything else in the CSV is skipped
+STREAMING_DTYPES = {
+    'name': 'object',
+    'category_list': 'object',
+    'funding_total_usd': 'object',  # Contains '-' for unknown amounts
+    'status': 'category',
+    'country_code': 'category',
+    'funding_rounds': 'float64',
+    'founded_at': 'object',
+    'first_funding_at': 'object',
+    'last_funding_at': 'object',
+}
+
 class StartupDataAnalyzer:
     def __init__(self):
         self.df = None
@@ -16,69 +74,305 @@ class StartupDataAnalyzer:
         self.category_stats = {}
         self.regional_stats = {}
         self.funding_patterns = {}
+        self._matching_categories = None
+        
+        # Seconds spent in each dataset load step (see get_load_timings)
+        self.load_timings: Dict[str, float] = {}
+        # Processes that preprocessed the last dataset load (see _preprocess_workers)
+        self.preprocess_workers = 1
+        
+        # Score tables per main category and per category label (see _apply_aggregates)
+        self.categories = ScoreTables()
+        self.labels = ScoreTables()
+        self.total_rows = 0
+        self._category_funding_offsets = None
+        
+        # Labels of each company as compressed sparse rows (full frame only): the label ids
+        # of row i are company_label_ids[company_label_offsets[i]:company_label_offsets[i + 1]]
+        self.company_label_ids: Optional[np.ndarray] = None
+        self.company_label_offsets: Optional[np.ndarray] = None
+        
+        # Trained success model (see success_model.py); None when disabled or unavailable
+        self.success_model: Optional[SuccessModel] = None
+        
+        # Records applied from the platform after load: record id -> (record, contribution)
+        self.dataset_version = 0
+        self._platform_records: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._platform_category_ids = set()
+        self._ingest_lock = threading.RLock()
+        self._derived_dirty = False
+        
+        # Category ids presorted per ranking key and order (see get_category_ranking); reset to
+        # None whenever the scores behind them change, and rebuilt on next use
+        self._category_rankings: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+        
+        # Sorted category names and their lowercase prefix-search keys (see get_available_categories)
+        self._category_listing: Optional[Tuple[List[str], List[str], List[str]]] = None
+        self._category_listing_version = -1
+        
+        # (category id, country, founding year) -> (count, successes, funding sum); None marks a rolled-up dimension
+        self.segment_cube: Dict[Tuple[Optional[int], Optional[str], Optional[int]], Tuple[int, int, float]] = {}
+        
+        # Success definition behind every success-dependent table (see SUCCESS_DEFINITIONS), and
+        # the analyzer for each precomputed definition (this one and its views, shared by all)
+        self.success_definition = DEFAULT_SUCCESS_DEFINITION
+        self._success_views: Dict[str, 'StartupDataAnalyzer'] = {self.success_definition: self}
         self._load_dataset()
     
     def _load_dataset(self):
         """Load and preprocess the Crunchbase dataset"""
+        if settings.DATASET_LOAD_MODE == "stats":
+            started = time.perf_counter()
+            self._load_stats_snapshot(settings.STATS_SNAPSHOT_PATH)
+            self.load_timings['total'] = time.perf_counter() - started
+            self._log_load_timings()
+            return
+        
+        import pandas as pd
+        
+        started = time.perf_counter()
+        timings = self.load_timings
         try:
             logger.info("Loading Crunchbase dataset...")
-            # Download dataset files
-            path = kagglehub.dataset_download("yanmaksi/big-startup-secsees-fail-dataset-from-crunchbase")
+            csv_path = self._find_dataset_csv()
             
-            # Find the CSV file in the downloaded path
-            import os
-            csv_files = [f for f in os.listdir(path) if f.endswith('.csv')]
-            if not csv_files:
-                raise FileNotFoundError("No CSV files found in the dataset")
+            if settings.DATASET_LOAD_MODE == "streaming":
+                self._load_dataset_streaming(csv_path)
+                return
             
-            # Load the first CSV file
-            csv_path = os.path.join(path, csv_files[0])
             logger.info(f"Loading CSV file: {csv_path}")
+            clock = time.perf_counter()
             self.df = pd.read_csv(csv_path)
+            timings['read_csv'] = time.perf_counter() - clock
             
             logger.info(f"Dataset loaded: {len(self.df)} records")
             logger.info(f"Dataset columns: {list(self.df.columns)}")
+            clock = time.perf_counter()
             self._preprocess_data()
+            timings['preprocess'] = time.perf_counter() - clock
             self._calculate_statistics()
+            
+            for view in self._create_success_views():
+                clock = time.perf_counter()
+                view._calculate_statistics()
+                timings[f'success_definition.{view.success_definition}'] = time.perf_counter() - clock
         except Exception as e:
             logger.warning(f"Unable to load Kaggle dataset: {str(e)}")
             logger.info("Using fallback analysis without historical data")
             self.df = pd.DataFrame()  # Empty fallback - will use synthetic calculations
+        finally:
+            timings['total'] = time.perf_counter() - started
+            self._log_load_timings()
     
-    def _preprocess_data(self):
-        """Clean and preprocess the dataset"""
-        if self.df.empty:
-            return
+    def _find_dataset_csv(self) -> str:
+        """Download the dataset files and return the path of the CSV to load"""
+        import kagglehub
+        
+        # Download dataset files
+        path = kagglehub.dataset_download("yanmaksi/big-startup-secsees-fail-dataset-from-crunchbase")
+        
+        # Find the CSV file in the downloaded path
+        csv_files = [f for f in os.listdir(path) if f.endswith('.csv')]
+        if not csv_files:
+            raise FileNotFoundError("No CSV files found in the dataset")
         
-        # Clean status column - Include operating companies as successful too
-        # Original: only 'acquired' and 'ipo' considered successful
-        # Updated: also include 'operating' as they are still active and viable
-        self.df['is_success'] = self.df['status'].str.lower().isin(['acquired', 'ipo', 'operating'])
+        # Load the first CSV file
+        return os.path.join(path, csv_files[0])
+    
+    def _load_dataset_streaming(self, csv_path: str):
+        """
+        Fold the CSV into aggregate statistics chunk by chunk.
+        
+        Only the columns in STREAMING_DTYPES are parsed, with explicit dtypes, and each chunk
+        is discarded once folded, so peak memory follows DATASET_CHUNK_SIZE rather than the
+        dataset size. The full frame is not kept (self.df stays empty).
+        """
+        import pandas as pd
+        
+        logger.info(f"Streaming CSV file: {csv_path} in chunks of {settings.DATASET_CHUNK_SIZE} rows")
+        timings = self.load_timings
+        # One set of aggregates per success definition, folded from the same chunks
+        analyzers = [self] + self._create_success_views()
+        folds = [
+            (analyzer, CategoryAggregates(success_column(analyzer.success_definition)), analyzer._success_model_trainer())
+            for analyzer in analyzers
+        ]
+        reader = pd.read_csv(
+            csv_path,
+            usecols=lambda column: column in STREAMING_DTYPES,
+            dtype=STREAMING_DTYPES,
+            chunksize=settings.DATASET_CHUNK_SIZE
+        )
         
-        # Parse categories
-        self.df['categories'] = self.df['category_list'].fillna('').str.split(',')
-        self.df['main_category'] = self.df['categories'].apply(
-            lambda x: x[0].strip() if x and x[0] else 'Unknown'
+        def read_chunks():
+            # Time spent parsing CSV chunks, excluding the consumer's work between them
+            chunks = iter(reader)
+            while True:
+                clock = time.perf_counter()
+                chunk = next(chunks, None)
+                timings['read_csv'] = timings.get('read_csv', 0.0) + time.perf_counter() - clock
+                if chunk is None:
+                    return
+                yield chunk
+        
+        timings['aggregate'] = 0.0
+        for frame in self._preprocess_chunks(read_chunks()):
+            clock = time.perf_counter()
+            for _, aggregates, trainer in folds:
+                aggregates.add_frame(frame)
+                if trainer is not None:
+                    trainer.add_frame(frame)
+            timings['aggregate'] += time.perf_counter() - clock
+        
+        aggregates = folds[0][1]
+        logger.info(
+            f"Dataset streamed: {aggregates.rows} records, {len(aggregates.categories.names)} categories, "
+            f"{len(aggregates.labels.names)} labels"
         )
+        timings['success_model'] = 0.0
+        for analyzer, aggregates, trainer in folds:
+            analyzer.df = pd.DataFrame()
+            clock = time.perf_counter()
+            analyzer._apply_aggregates(aggregates)
+            timings['aggregate'] += time.perf_counter() - clock
+            clock = time.perf_counter()
+            analyzer._finish_success_model(trainer)
+            timings['success_model'] += time.perf_counter() - clock
+            analyzer._build_category_rankings()
+    
+    def _create_success_views(self) -> List['StartupDataAnalyzer']:
+        """
+        One view per alternative success definition in SUCCESS_DEFINITIONS_ENABLED, to be
+        filled by the caller. A view is a shallow copy sharing the frame, label index and
+        ingest lock; every success-dependent table is its own.
+        """
+        views = []
+        for definition in (name.strip() for name in settings.SUCCESS_DEFINITIONS_ENABLED.split(',')):
+            if not definition or definition in self._success_views:
+                continue
+            if definition not in SUCCESS_DEFINITIONS:
+                logger.warning(f"Unknown success definition '{definition}' - skipped")
+                continue
+            
+            view = copy.copy(self)
+            view.success_definition = definition
+            view.success_rates = {}
+            view.success_model = None
+            view.load_timings = {}
+            view._category_funding_offsets = None
+            view._platform_records = {}
+            view._platform_category_ids = set()
+            view._category_rankings = None
+            view._category_listing = None
+            view._derived_dirty = False
+            self._success_views[definition] = view
+            views.append(view)
+        return views
+    
+    def get_success_definitions(self) -> List[str]:
+        """Success definitions with precomputed statistics, the default first"""
+        return list(self._success_views)
+    
+    def for_success_definition(self, definition: Optional[str]) -> 'StartupDataAnalyzer':
+        """
+        The analyzer scoring under a success definition (None for the default); switching is
+        a dict lookup, as every definition's tables are built at load
+        
+        Raises:
+            ValueError: for a definition without precomputed statistics
+        """
+        if not definition or definition == self.success_definition:
+            return self
+        view = self._success_views.get(definition)
+        if view is None:
+            raise ValueError(f"Success definition '{definition}' is not available")
+        return view
+    
+    def _preprocess_workers(self, chunk_count: Optional[int] = None) -> int:
+        """
+        Processes used to preprocess dataset chunks (DATASET_PREPROCESS_WORKERS, 0 = one per
+        core), no more than chunk_count when the number of chunks is known
+        """
+        workers = settings.DATASET_PREPROCESS_WORKERS or os.cpu_count() or 1
+        return min(workers, chunk_count) if chunk_count else workers
+    
+    def _preprocess_chunks(self, chunks, chunk_count: Optional[int] = None):
+        """
+        Preprocess raw chunks, yielding them in input order.
+        
+        With more than one worker, chunks are preprocessed in a process pool while the caller
+        consumes earlier ones; at most two chunks per worker are in flight, which bounds memory.
+        Step timings of all chunks are summed into load_timings as "preprocess.<step>".
+        """
+        step_timings = {}
+        workers = self._preprocess_workers(chunk_count)
+        self.preprocess_workers = workers
+        try:
+            if workers <= 1:
+                for chunk in chunks:
+                    yield preprocess_frame(chunk, step_timings)
+                return
+            
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(preprocess_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        frame, chunk_timings = pending.popleft().result()
+                        self._add_step_timings(step_timings, chunk_timings)
+                        yield frame
+                while pending:
+                    frame, chunk_timings = pending.popleft().result()
+                    self._add_step_timings(step_timings, chunk_timings)
+                    yield frame
+        finally:
+            for step, seconds in step_timings.items():
+                self.load_timings[f'preprocess.{step}'] = seconds
+    
+    @staticmethod
+    def _add_step_timings(totals: Dict[str, float], timings: Dict[str, float]):
+        for step, seconds in timings.items():
+            totals[step] = totals.get(step, 0.0) + seconds
+    
+    def _preprocess_data(self):
+        """
+        Clean and preprocess the dataset.
         
-        # Clean funding amounts
-        self.df['funding_total_usd'] = pd.to_numeric(
-            self.df['funding_total_usd'], errors='coerce'
-        ).fillna(0)
+        Frames larger than DATASET_CHUNK_SIZE rows are split into chunks preprocessed across
+        DATASET_PREPROCESS_WORKERS processes (at most one per chunk) and concatenated back in order.
+        """
+        import pandas as pd
         
-        # Parse dates
-        for col in ['founded_at', 'first_funding_at', 'last_funding_at']:
-            self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
+        if self.df.empty:
+            return
         
-        # Calculate time to funding
-        self.df['days_to_funding'] = (
-            self.df['first_funding_at'] - self.df['founded_at']
-        ).dt.days
+        size = settings.DATASET_CHUNK_SIZE
+        chunk_count = -(-len(self.df) // size)
+        if self._preprocess_workers(chunk_count) <= 1:
+            list(self._preprocess_chunks([self.df], 1))
+            return
         
-        # Calculate company age
-        self.df['company_age_years'] = (
-            (datetime.now() - self.df['founded_at']).dt.days / 365.25
-        ).fillna(0)
+        try:
+            chunks = (self.df.iloc[start:start + size] for start in range(0, len(self.df), size))
+            self.df = pd.concat(list(self._preprocess_chunks(chunks, chunk_count)))
+        except Exception as e:
+            # Workers only receive copies, so the raw frame can still be preprocessed here
+            logger.warning(f"Parallel preprocessing failed: {str(e)} - preprocessing in one process")
+            self.preprocess_workers = 1
+            preprocess_frame(self.df)
+    
+    def _log_load_timings(self):
+        timings = ', '.join(f"{step} {seconds * 1000:.0f}ms" for step, seconds in self.load_timings.items())
+        logger.info(f"Dataset load timings: {timings}")
+    
+    def get_load_timings(self) -> Dict[str, Any]:
+        """Milliseconds spent in each step of the last dataset load"""
+        return {
+            'mode': settings.DATASET_LOAD_MODE,
+            'preprocess_workers': self.preprocess_workers,
+            'success_definitions': self.get_success_definitions(),
+            'timings_ms': {step: round(seconds * 1000, 1) for step, seconds in self.load_timings.items()},
+        }
     
     def _calculate_statistics(self):
         """Calculate success rates and patterns"""
@@ -88,36 +382,555 @@ class StartupDataAnalyzer:
         
         logger.info("Calculating statistics...")
         
-        # Category success rates
-        self.success_rates['by_category'] = (
-            self.df.groupby('main_category')['is_success']
-            .agg(['mean', 'count'])
-            .to_dict('index')
-        )
+        clock = time.perf_counter()
+        aggregates = CategoryAggregates(success_column(self.success_definition))
+        aggregates.add_frame(self.df)
+        self._apply_aggregates(aggregates)
         
-        logger.info(f"Categories processed: {len(self.success_rates['by_category'])}")
-        logger.info(f"Sample categories: {list(self.success_rates['by_category'].keys())[:10]}")
+        # The full frame is available, so funding risk can use exact category medians
+        self._index_category_funding()
+        self.load_timings['aggregate'] = time.perf_counter() - clock
         
-        # Regional success rates
-        self.success_rates['by_region'] = (
-            self.df.groupby('country_code')['is_success']
-            .agg(['mean', 'count'])
-            .to_dict('index')
-        )
+        clock = time.perf_counter()
+        trainer = self._success_model_trainer()
+        if trainer is not None:
+            trainer.add_frame(self.df)
+        self._finish_success_model(trainer)
+        self.load_timings['success_model'] = time.perf_counter() - clock
+        
+        # Presorted once every score behind the rankings is final (exact medians, success model)
+        self._build_category_rankings()
+        
+        logger.info("Statistics calculation completed")
+    
+    def _success_model_trainer(self) -> Optional[SuccessModelTrainer]:
+        """Trainer for the success model, or None if it is disabled or loaded from a file instead"""
+        if not settings.SUCCESS_MODEL_ENABLED:
+            return None
+        
+        # An exported model file is trained under the default success definition
+        if settings.SUCCESS_MODEL_PATH and self.success_definition == DEFAULT_SUCCESS_DEFINITION:
+            try:
+                self.success_model = SuccessModel.load(settings.SUCCESS_MODEL_PATH)
+                logger.info(f"Success model loaded from {settings.SUCCESS_MODEL_PATH}")
+                return None
+            except Exception as e:
+                logger.warning(f"Unable to load success model from {settings.SUCCESS_MODEL_PATH}: {str(e)} - training instead")
+        
+        return SuccessModelTrainer(success_column(self.success_definition))
+    
+    def _finish_success_model(self, trainer: Optional[SuccessModelTrainer]):
+        if trainer is None:
+            return
+        
+        try:
+            self.success_model = trainer.fit(min_count=settings.SUCCESS_MODEL_MIN_COUNT)
+        except Exception as e:
+            logger.warning(f"Success model training failed: {str(e)}")
+    
+    @property
+    def has_data(self) -> bool:
+        """Whether dataset statistics are available for scoring"""
+        return bool(self.categories.names)
+    
+    def _apply_aggregates(self, aggregates: CategoryAggregates):
+        """
+        Derive every statistic and the main category and label score tables used for
+        scoring from folded aggregates, so request-time scoring never touches the raw rows.
+        
+        Ids follow the sorted names (see ScoreTables); segment cube cells and examples are
+        remapped to them.
+        """
+        self.total_rows = aggregates.rows
+        self.categories, remap = ScoreTables.from_stats(aggregates.categories, aggregates.rows)
+        self.labels, _ = ScoreTables.from_stats(aggregates.labels, aggregates.rows)
+        self._region_counts = {country: list(counts) for country, counts in aggregates.countries.items()}
+        self._outcome_totals = aggregates.outcome_totals
+        self.segment_cube = self._build_segment_cube(aggregates.cells, remap)
+        self._derive_summary_stats()
+    
+    def _derive_summary_stats(self):
+        """Success rates, funding patterns, year span and matching vocabulary from the score tables and counts"""
+        n = len(self.categories)
+        
+        # Category and region success rates
+        counts = self.categories.tables['count'][:n]
+        success_counts = self.categories.tables['success_count'][:n]
+        self.success_rates['by_category'] = {
+            name: {'mean': success_counts[i] / counts[i], 'count': int(counts[i])}
+            for i, name in enumerate(self.categories.names) if counts[i] > 0
+        }
+        self.success_rates['by_region'] = {
+            country: {'mean': successes / count, 'count': count}
+            for country, (count, successes) in sorted(self._region_counts.items()) if count > 0
+        }
+        logger.info(f"Categories processed: {n}, labels: {len(self.labels)}")
+        logger.info(f"Sample categories: {self.categories.names[:10]}")
         
         # Funding patterns
+        self._update_funding_patterns()
+        
+        # Span of years with any first fundings, for charting
+        yearly_totals = self.categories.year_cumulative[:n].sum(axis=0)
+        active_years = np.flatnonzero(np.diff(yearly_totals, prepend=0))
+        self._funding_year_span = (int(active_years[0]), int(active_years[-1]) + 1) if len(active_years) else (0, 0)
+        
+        # Vocabulary for AI category matching: main categories plus every category label
+        self._matching_categories = sorted(
+            set(name.strip() for name in self.categories.names if name.strip()) | set(self.labels.names)
+        )
+        logger.info(f"Total available categories for matching: {len(self._matching_categories)}")
+        logger.info(f"Score tables built for {n} categories and {len(self.labels)} labels")
+        
+        self._category_rankings = None
+    
+    def export_stats(self, path: str):
+        """
+        Write every table the scorers use to a compressed .npz stats snapshot, including
+        ingested platform records and the success model, for DATASET_LOAD_MODE=stats.
+        Tables of alternative success definitions are stored under "<definition>." keys.
+        """
+        with self._ingest_lock:
+            if not self.has_data:
+                raise ValueError("No dataset statistics to export")
+            
+            arrays = {
+                'version': np.array(STATS_SNAPSHOT_VERSION),
+                # The year axes end at FUNDING_YEAR_MAX, which follows the calendar year
+                'year_axes': np.array([FUNDING_YEAR_MIN, FUNDING_YEAR_MAX, COHORT_YEAR_MIN]),
+            }
+            for definition, analyzer in self._success_views.items():
+                prefix = '' if analyzer is self else f'{definition}.'
+                arrays.update({prefix + key: value for key, value in analyzer._stats_arrays().items()})
+            
+            np.savez_compressed(path, **arrays)
+        logger.info(
+            f"Stats snapshot written to {path}: {len(self.categories)} categories, {len(self.labels)} labels, "
+            f"success definitions {self.get_success_definitions()}"
+        )
+    
+    def _stats_arrays(self) -> Dict[str, np.ndarray]:
+        """This analyzer's tables as named arrays for export_stats"""
+        self._refresh_derived_tables()
+        cube_keys = list(self.segment_cube)
+        cube_values = np.array([self.segment_cube[key] for key in cube_keys], dtype=float).reshape(-1, 3)
+        regions = sorted(self._region_counts)
+        outcomes = ('success', 'fail')
+        outcome_fields = ('rows', 'funding', 'rounds', 'rounds_rows')
+        
+        arrays = {
+            'total_rows': np.array(self.total_rows),
+            'region_codes': np.array(regions, dtype=str),
+            'region_counts': np.array([self._region_counts[code] for code in regions], dtype=np.int64).reshape(-1, 2),
+            'outcome_totals': np.array(
+                [[self._outcome_totals[outcome][field] for field in outcome_fields] for outcome in outcomes], dtype=float
+            ),
+            'cube_categories': np.array([-1 if key[0] is None else key[0] for key in cube_keys], dtype=np.int64),
+            'cube_countries': np.array([key[1] or '' for key in cube_keys], dtype=str),
+            'cube_years': np.array([key[2] or 0 for key in cube_keys], dtype=np.int64),
+            'cube_values': cube_values,
+            'platform_category_ids': np.array(sorted(self._platform_category_ids), dtype=np.int64),
+        }
+        arrays.update(self.categories.to_arrays("category_"))
+        arrays.update(self.labels.to_arrays("label_"))
+        if self._category_funding_offsets is not None:
+            arrays.update({
+                'category_funding': self._category_funding,
+                'category_funding_success': self._category_funding_success,
+                'category_funding_offsets': self._category_funding_offsets,
+            })
+        if self.success_model is not None:
+            arrays.update(self.success_model.to_arrays("model_"))
+        return arrays
+    
+    def _load_stats_snapshot(self, path: str):
+        """
+        Serve from a snapshot written by export_stats: no CSV, pandas or kagglehub, only the
+        NumPy tables the scorers read
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != STATS_SNAPSHOT_VERSION:
+                    raise ValueError(f"unsupported snapshot version {int(data['version'])}")
+                missing_years = self._snapshot_missing_years(data['year_axes'].tolist())
+                
+                self._load_stats_arrays(data, '', missing_years)
+                for view in self._create_success_views():
+                    prefix = f'{view.success_definition}.'
+                    if f'{prefix}total_rows' not in data.files:
+                        logger.warning(f"Success definition '{view.success_definition}' missing from the stats snapshot - skipped")
+                        del self._success_views[view.success_definition]
+                        continue
+                    view._load_stats_arrays(data, prefix, missing_years)
+            
+            for analyzer in self._success_views.values():
+                analyzer._derive_summary_stats()
+                analyzer._build_category_rankings()
+            logger.info(f"Stats snapshot loaded from {path}: {self.total_rows} records")
+        except Exception as e:
+            logger.warning(f"Unable to load stats snapshot {path}: {str(e)}")
+            logger.info("Using fallback analysis without historical data")
+            self.categories = ScoreTables()
+            self.labels = ScoreTables()
+            self.success_model = None
+            self._success_views = {self.success_definition: self}
+    
+    @staticmethod
+    def _snapshot_missing_years(year_axes: List[int]) -> int:
+        """
+        Years the snapshot's year columns lack at the end, exported in an earlier calendar
+        year; a snapshot with different year axes otherwise is rejected
+        """
+        funding_year_min, funding_year_max, cohort_year_min = year_axes
+        if (funding_year_min, cohort_year_min) != (FUNDING_YEAR_MIN, COHORT_YEAR_MIN) or funding_year_max > FUNDING_YEAR_MAX:
+            raise ValueError(
+                f"snapshot year axes {year_axes} do not match {[FUNDING_YEAR_MIN, FUNDING_YEAR_MAX, COHORT_YEAR_MIN]}"
+            )
+        return FUNDING_YEAR_MAX - funding_year_max
+    
+    def _load_stats_arrays(self, data: Dict[str, np.ndarray], prefix: str, missing_years: int = 0):
+        """
+        Restore this analyzer's tables from arrays written by _stats_arrays under prefix,
+        widening year columns by missing_years (see _snapshot_missing_years)
+        """
+        def array(key: str) -> np.ndarray:
+            return data[prefix + key]
+        
+        self.total_rows = int(array('total_rows'))
+        self.categories = ScoreTables.from_arrays(data, f"{prefix}category_", self.total_rows, missing_years)
+        self.labels = ScoreTables.from_arrays(data, f"{prefix}label_", self.total_rows, missing_years)
+        self._region_counts = {
+            code: counts for code, counts in zip(array('region_codes').tolist(), array('region_counts').tolist())
+        }
+        self._outcome_totals = {
+            outcome: {
+                'rows': int(totals[0]), 'funding': float(totals[1]),
+                'rounds': float(totals[2]), 'rounds_rows': int(totals[3])
+            }
+            for outcome, totals in zip(('success', 'fail'), array('outcome_totals').tolist())
+        }
+        self.segment_cube = {
+            (None if category < 0 else category, country or None, year or None): (int(count), int(successes), funding)
+            for category, country, year, (count, successes, funding) in zip(
+                array('cube_categories').tolist(), array('cube_countries').tolist(),
+                array('cube_years').tolist(), array('cube_values').tolist()
+            )
+        }
+        self._platform_category_ids = set(array('platform_category_ids').tolist())
+        if f'{prefix}category_funding_offsets' in data.files:
+            self._category_funding = array('category_funding')
+            self._category_funding_success = array('category_funding_success')
+            self._category_funding_offsets = array('category_funding_offsets')
+        if settings.SUCCESS_MODEL_ENABLED and f'{prefix}model_intercept' in data.files:
+            self.success_model = SuccessModel.from_arrays(data, f"{prefix}model_")
+    
+    def _update_funding_patterns(self):
+        """Average funding and rounds for successful and failed companies"""
+        def mean(total: float, rows: int) -> float:
+            return total / rows if rows else float('nan')
+        
+        success_totals = self._outcome_totals['success']
+        fail_totals = self._outcome_totals['fail']
         self.funding_patterns = {
-            'avg_funding_success': self.df[self.df['is_success']]['funding_total_usd'].mean(),
-            'avg_funding_fail': self.df[~self.df['is_success']]['funding_total_usd'].mean(),
-            'avg_rounds_success': self.df[self.df['is_success']]['funding_rounds'].mean(),
-            'avg_rounds_fail': self.df[~self.df['is_success']]['funding_rounds'].mean(),
+            'avg_funding_success': mean(success_totals['funding'], success_totals['rows']),
+            'avg_funding_fail': mean(fail_totals['funding'], fail_totals['rows']),
+            'avg_rounds_success': mean(success_totals['rounds'], success_totals['rounds_rows']),
+            'avg_rounds_fail': mean(fail_totals['rounds'], fail_totals['rounds_rows']),
+        }
+    
+    def ingest_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply company records from the platform (projects and their investments) to the
+        loaded statistics without recomputing them.
+        
+        Each record carries a stable record_id; sending the same id again replaces the
+        earlier version, and a record with deleted=True removes it. Per-category counts,
+        sums, success rates, funding and year histograms and segment cells are adjusted in
+        place, so a record costs the same regardless of dataset size. Scores that compare
+        categories with each other (funding rank, uniqueness) are refreshed on next use.
+        
+        Args:
+            records: Dicts with record_id, category, status, funding_total_usd,
+                funding_rounds, country_code, founded_year, first_funding_at and deleted
+            
+        Returns:
+            Dict with created, updated and removed counts, the number of new categories
+            and the resulting dataset_version
+            
+        Raises:
+            ValueError: for an invalid record; no record of the batch is applied then
+        """
+        with self._ingest_lock:
+            # Every record is normalized under every success definition before any table changes
+            normalized = {
+                definition: view._normalize_records(records) for definition, view in self._success_views.items()
+            }
+            summary = self._apply_records(normalized[self.success_definition])
+            for definition, view in self._success_views.items():
+                if view is not self:
+                    view._apply_records(normalized[definition])
+        
+        logger.info(f"Platform records ingested: {summary}")
+        return summary
+    
+    def _normalize_records(self, records: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        (record_id, record, contribution) for each platform record, the contribution being
+        None for a deletion
+        
+        Raises:
+            ValueError: for a record that cannot be applied
+        """
+        normalized = []
+        for position, record in enumerate(records):
+            if record.get('record_id') is None:
+                raise ValueError(f"Platform record at position {position} has no record_id")
+            record_id = str(record['record_id'])
+            try:
+                contribution = None if record.get('deleted') else self._platform_contribution(record)
+            except (TypeError, ValueError, OverflowError) as e:
+                raise ValueError(f"Invalid platform record {record_id}: {str(e)}")
+            if contribution is not None:
+                if not np.isfinite(contribution['funding']) or contribution['funding'] < 0:
+                    raise ValueError(f"Invalid platform record {record_id}: funding_total_usd must be a non-negative amount")
+                if not 0 <= contribution['founded_year'] <= 9999:
+                    raise ValueError(f"Invalid platform record {record_id}: founded_year out of range")
+            normalized.append((record_id, record, contribution))
+        return normalized
+    
+    def _apply_records(self, normalized: List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+        """
+        Apply platform records normalized by _normalize_records to this analyzer's tables
+        (see ingest_records); call with the ingest lock held
+        """
+        summary = {'created': 0, 'updated': 0, 'removed': 0, 'new_categories': 0}
+        if not self.categories.tables:
+            # Nothing loaded: start from empty tables holding platform records only
+            self._apply_aggregates(CategoryAggregates())
+        
+        category_count = len(self.categories.names)
+        for record_id, record, contribution in normalized:
+            previous = self._platform_records.pop(record_id, None)
+            if previous is not None:
+                self._apply_contribution(previous[1], -1)
+            
+            if contribution is None:
+                summary['removed'] += previous is not None
+                continue
+            
+            self._apply_contribution(contribution, 1)
+            self._platform_records[record_id] = (record, contribution)
+            summary['updated' if previous is not None else 'created'] += 1
+        
+        summary['new_categories'] = len(self.categories.names) - category_count
+        if normalized:
+            self.dataset_version += 1
+            self._category_rankings = None
+        summary['dataset_version'] = self.dataset_version
+        return summary
+    
+    def get_platform_records(self) -> List[Dict[str, Any]]:
+        """Platform records currently applied, as they were ingested"""
+        with self._ingest_lock:
+            return [record for record, _ in self._platform_records.values()]
+    
+    def _platform_contribution(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a platform record the same way dataset rows are preprocessed"""
+        category_list = str(record.get('category') or '')
+        first_entry = category_list.split(',')[0]
+        rounds = record.get('funding_rounds')
+        first_funding = self._record_date(record.get('first_funding_at'))
+        return {
+            'category': first_entry.strip() if first_entry else 'Unknown',
+            'labels': split_category_labels(category_list),
+            'success': str(record.get('status') or '').lower() in SUCCESS_DEFINITIONS[self.success_definition],
+            'funding': float(record.get('funding_total_usd') or 0),
+            'rounds': float(rounds) if rounds is not None else None,
+            'country': str(record.get('country_code') or '').strip().upper(),
+            'founded_year': int(record.get('founded_year') or 0),
+            'funding_year': first_funding.year if first_funding else None,
+            'funding_delay_days': self._funding_delay_days(record.get('founded_year'), first_funding),
         }
+    
+    @staticmethod
+    def _record_date(value: Any) -> Optional[date]:
+        """A record date given as a date, datetime or ISO 8601 string; None if missing or invalid"""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return datetime.fromisoformat(str(value).strip()).date() if value else None
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _funding_delay_days(founded_year: Optional[int], first_funding: Optional[date]) -> Optional[int]:
+        """Days from founding to first funding; records only carry a founding year, taken as January 1"""
+        if not founded_year or first_funding is None:
+            return None
+        try:
+            return (first_funding - date(int(founded_year), 1, 1)).days
+        except ValueError:
+            return None
+    
+    def _apply_contribution(self, contribution: Dict[str, Any], sign: int):
+        """Add (sign=1) or remove (sign=-1) one normalized record from every statistic"""
+        name = contribution['category']
+        cat_id = self.categories.index.get(name)
+        if cat_id is None:
+            cat_id = self._add_category(name)
+        
+        success = int(contribution['success'])
+        funding = contribution['funding']
+        self.total_rows += sign
+        
+        year_position = None
+        funding_year = contribution['funding_year']
+        if funding_year is not None:
+            year_position = int(np.clip(funding_year, FUNDING_YEAR_MIN, FUNDING_YEAR_MAX)) - FUNDING_YEAR_MIN
+            first, last = self._funding_year_span
+            self._funding_year_span = (
+                (year_position, year_position + 1) if first == last
+                else (min(first, year_position), max(last, year_position + 1))
+            )
         
-        logger.info("Statistics calculation completed")
+        cohort = None
+        if contribution['founded_year'] > 0:
+            cohort = int(np.clip(contribution['founded_year'], COHORT_YEAR_MIN, FUNDING_YEAR_MAX)) - COHORT_YEAR_MIN
+        delay_bin = None
+        if contribution.get('funding_delay_days') is not None:
+            delay_bin = int(funding_delay_bins(np.array([contribution['funding_delay_days']]))[0])
+        
+        # Funding risk of a touched category or label comes from its histogram from now on
+        self.categories.apply(cat_id, success, funding, year_position, sign, cohort, delay_bin)
+        self._platform_category_ids.add(cat_id)
+        for label in contribution.get('labels', []):
+            label_id = self.labels.index.get(label)
+            if label_id is None:
+                label_id = self._add_label(label)
+            self.labels.apply(label_id, success, funding, year_position, sign, cohort, delay_bin)
+        
+        count = self.categories.tables['count'][cat_id]
+        if count > 0:
+            success_rate = self.categories.tables['success_count'][cat_id] / count
+            self.success_rates['by_category'][name] = {'mean': success_rate, 'count': int(count)}
+        else:
+            self.success_rates['by_category'].pop(name, None)
+        
+        country = contribution['country']
+        if country:
+            region = self._region_counts.setdefault(country, [0, 0])
+            region[0] += sign
+            region[1] += sign * success
+            if region[0] > 0:
+                self.success_rates['by_region'][country] = {'mean': region[1] / region[0], 'count': region[0]}
+            else:
+                self.success_rates['by_region'].pop(country, None)
+        
+        year = contribution['founded_year'] or None
+        cube_keys = []
+        if country and year:
+            cube_keys += [(cat_id, country, year), (None, country, year)]
+        if country:
+            cube_keys += [(cat_id, country, None), (None, country, None)]
+        if year:
+            cube_keys.append((cat_id, None, year))
+        for key in cube_keys:
+            cell_count, cell_successes, cell_funding = self.segment_cube.get(key, (0, 0, 0.0))
+            if cell_count + sign > 0:
+                self.segment_cube[key] = (cell_count + sign, cell_successes + sign * success, cell_funding + sign * funding)
+            else:
+                self.segment_cube.pop(key, None)
+        
+        totals = self._outcome_totals['success' if success else 'fail']
+        totals['rows'] += sign
+        totals['funding'] += sign * funding
+        if contribution['rounds'] is not None and not np.isnan(contribution['rounds']):
+            totals['rounds'] += sign * contribution['rounds']
+            totals['rounds_rows'] += sign
+        self._update_funding_patterns()
+        
+        self._derived_dirty = True
+    
+    def _add_category(self, name: str) -> int:
+        """Register a category first seen in a platform record; returns its id"""
+        cat_id = self.categories.add_group(name)
+        if self._category_funding_offsets is not None:
+            self._category_funding_offsets = np.append(self._category_funding_offsets, self._category_funding_offsets[-1])
+        self._add_matching_category(name.strip())
+        return cat_id
+    
+    def _add_label(self, name: str) -> int:
+        """Register a category label first seen in a platform record; returns its id"""
+        label_id = self.labels.add_group(name)
+        self._add_matching_category(name)
+        return label_id
     
+    def _add_matching_category(self, name: str):
+        # A new list object, so vocabulary caches keyed on it are rebuilt
+        if self._matching_categories is not None and name and name not in self._matching_categories:
+            self._matching_categories = sorted(self._matching_categories + [name])
+    
+    def _refresh_derived_tables(self):
+        """Recompute the cross-group scores (funding rank, uniqueness) after ingested records"""
+        if not self._derived_dirty:
+            return
+        
+        with self._ingest_lock:
+            self.categories.refresh(self.total_rows)
+            self.labels.refresh(self.total_rows)
+            self._derived_dirty = False
+    
+    def _index_category_funding(self):
+        """
+        Keep funding amounts and outcomes grouped by category (sorted by funding within each
+        category), index each company's labels as compressed sparse rows, and score funding
+        risk of categories and labels with exact medians.
+        
+        Only used when the full frame is loaded; streaming mode relies on the histograms.
+        """
+        n = len(self.categories)
+        codes = self.df['main_category'].map(self.categories.index).to_numpy(dtype=np.int64)
+        is_success = self.df[success_column(self.success_definition)].to_numpy(dtype=bool)
+        funding = self.df['funding_total_usd'].to_numpy(dtype=float)
+        
+        risk, order, self._category_funding_offsets = exact_funding_risk(codes, funding, is_success, n)
+        self._category_funding = funding[order]
+        self._category_funding_success = is_success[order]
+        self.categories.tables['funding_risk'][:-1] = risk
+        
+        # A company belongs to every one of its labels. Label ids do not depend on the success
+        # definition, so success definition views keep the index built for the default
+        if self.company_label_offsets is None:
+            label_codes, self.company_label_offsets, vocabulary = category_label_csr(self.df['category_list'])
+            self.company_label_ids = self.labels.index_array(vocabulary)[label_codes].astype(np.int32)
+        member_rows = np.repeat(np.arange(len(self.df)), np.diff(self.company_label_offsets))
+        label_risk, _, _ = exact_funding_risk(
+            self.company_label_ids.astype(np.int64), funding[member_rows], is_success[member_rows], len(self.labels)
+        )
+        self.labels.tables['funding_risk'][:-1] = label_risk
+        logger.info(
+            f"Company labels indexed: {len(self.company_label_ids)} memberships over {len(self.df)} companies"
+        )
+
+    
+    @_reads_tables
+    def get_company_labels(self, row: int) -> List[str]:
+        """Category labels of one dataset row (full frame only)"""
+        if self.company_label_offsets is None:
+            return []
+        start, end = self.company_label_offsets[row], self.company_label_offsets[row + 1]
+        return [self.labels.names[label_id] for label_id in self.company_label_ids[start:end]]
+    
+    @_reads_tables
     def calculate_risk_score(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate risk score based on category and funding patterns"""
-        if self.df.empty:
+        analyzer = self.for_success_definition(startup_data.get('success_definition'))
+        if analyzer is not self:
+            return analyzer.calculate_risk_score(startup_data)
+        
+        if not self.has_data:
             return self._get_fallback_risk()
         
         factors = []
@@ -130,12 +943,36 @@ class StartupDataAnalyzer:
         # Calculate category-based risk
         category_risk = self._get_category_risk_new(category)
         
+        # Prefer the region / founding-year specific success rate when available
+        segment = self.get_segment_stats(category, startup_data.get('country_code'), startup_data.get('founded_year'))
+        if segment:
+            category_risk = max(0, min(100, (1 - segment['success_rate']) * 100))
+        
         # Calculate funding vs status risk
         funding_risk = self._get_funding_status_risk(category)
         
+        # With the startup's own funding, judge it against companies funded at the same level
+        funding_amount = startup_data.get('funding_total_usd')
+        funding_position = self.get_funding_position(category, funding_amount) if funding_amount is not None else None
+        if funding_position:
+            funding_risk = (1 - funding_position['bin_success_rate']) * 100
+        
         # Calculate overall risk (inverse of success rate)
         overall_risk = (category_risk + funding_risk) / 2
         
+        # The trained model weighs category, funding, rounds, region and founding year together
+        model_risk = None
+        if self.success_model is not None:
+            success_probability = self.success_model.predict(
+                startup_data.get('category', ''),
+                startup_data.get('funding_total_usd'),
+                startup_data.get('funding_rounds'),
+                startup_data.get('country_code'),
+                startup_data.get('founded_year')
+            )
+            model_risk = (1 - success_probability) * 100
+            overall_risk = model_risk
+        
         # Add factors and recommendations
         if category_risk > 70:
             factors.append(f"High-risk category: {category}")
@@ -151,22 +988,49 @@ class StartupDataAnalyzer:
             factors.append("Limited funding success in this category")
             recommendations.append("Prepare strong funding strategy")
         
+        if segment:
+            factors.append(
+                f"Success rate for {segment['segment']}: {segment['success_rate'] * 100:.1f}% "
+                f"across {segment['count']} companies"
+            )
+        
+        if funding_position:
+            factors.append(
+                f"Funding of ${funding_amount:,.0f} is at or above {funding_position['percentile']:.0f}% of "
+                f"companies in {funding_position['segment']}; {funding_position['bin_success_rate'] * 100:.1f}% of "
+                f"companies funded at this level succeeded"
+            )
+        
+        if model_risk is not None:
+            factors.append(f"Predicted success probability: {100 - model_risk:.1f}%")
+        
+        risk_categories = {
+            'category_risk': category_risk,
+            'funding_risk': funding_risk,
+            'market_risk': (category_risk + funding_risk) / 2,
+            'overall': overall_risk
+        }
+        if funding_position:
+            risk_categories['funding_percentile'] = funding_position['percentile']
+        if model_risk is not None:
+            risk_categories['model_risk'] = model_risk
+        
         return {
             'percentage': max(0, min(100, overall_risk)),
             'factors': factors,
             'recommendations': recommendations,
-            'categories': {
-                'category_risk': category_risk,
-                'funding_risk': funding_risk,
-                'market_risk': (category_risk + funding_risk) / 2,
-                'overall': overall_risk
-            },
+            'categories': risk_categories,
             'confidence_score': 85
         }
     
+    @_reads_tables
     def calculate_market_size(self, startup_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate market size based on category funding patterns and investment data"""
-        if self.df.empty:
+        analyzer = self.for_success_definition(startup_data.get('success_definition'))
+        if analyzer is not self:
+            return analyzer.calculate_market_size(startup_data)
+        
+        if not self.has_data:
             logger.warning("Dataset is empty - using fallback market analysis")
             return self._get_fallback_market()
         
@@ -193,6 +1057,10 @@ class StartupDataAnalyzer:
         factors.append(f"Category funding patterns indicate {category_funding:.1f}% market potential")
         factors.append(f"Investment trends show {investment_trend:.1f}% growth momentum")
         
+        segment = self.get_segment_stats(category, startup_data.get('country_code'), startup_data.get('founded_year'))
+        if segment:
+            factors.append(f"Average funding for {segment['segment']}: ${segment['avg_funding']:,.0f}")
+        
         # Add recommendations
         if market_size > 75:
             recommendations.append("Excellent market opportunity - consider aggressive scaling")
@@ -214,9 +1082,21 @@ class StartupDataAnalyzer:
             'confidence_score': 78
         }
     
-    def calculate_originality(self, startup_data: Dict[str, Any], ai_description_score: float = 60.0) -> Dict[str, Any]:
-        """Calculate originality based on category frequency and AI description analysis"""
-        if self.df.empty:
+    @_reads_tables
+    def calculate_originality(self, startup_data: Dict[str, Any], ai_description_score: float = 60.0,
+                              near_duplicates: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Calculate originality based on category frequency and AI description analysis
+        
+        Args:
+            near_duplicates: Previously submitted projects with near-identical descriptions
+                (see near_duplicates.NearDuplicateIndex); looked up here when not given
+        """
+        analyzer = self.for_success_definition(startup_data.get('success_definition'))
+        if analyzer is not self:
+            return analyzer.calculate_originality(startup_data, ai_description_score, near_duplicates)
+        
+        if not self.has_data:
             return self._get_fallback_originality()
         
         factors = []
@@ -232,12 +1112,23 @@ class StartupDataAnalyzer:
         # Use AI description analysis score
         description_uniqueness = ai_description_score
         
+        # A near-identical description already on the platform caps description uniqueness
+        if near_duplicates is None:
+            near_duplicates = self._find_near_duplicates(startup_data)
+        if near_duplicates:
+            description_uniqueness = min(description_uniqueness, (1 - near_duplicates[0]['similarity']) * 100)
+        
         # Combine both scores (50% category uniqueness, 50% description uniqueness)
         originality_score = (category_uniqueness * 0.5) + (description_uniqueness * 0.5)
         
         # Add factors
         factors.append(f"Category frequency analysis: {category_uniqueness:.1f}% uniqueness")
-        factors.append(f"AI description analysis: {description_uniqueness:.1f}% uniqueness")
+        factors.append(f"AI description analysis: {ai_description_score:.1f}% uniqueness")
+        if near_duplicates:
+            factors.append(
+                f"Near-duplicate of {len(near_duplicates)} previously submitted project(s), "
+                f"closest {near_duplicates[0]['similarity'] * 100:.0f}% similar"
+            )
         
         # Add recommendations
         if originality_score > 80:
@@ -249,8 +1140,12 @@ class StartupDataAnalyzer:
         else:
             recommendations.append("Limited uniqueness - pivot to innovative approach or niche market")
         
-        # Similar projects based on category frequency
+        # Similar projects: near-duplicate submissions first, then category examples
         similar_projects = self._find_similar_projects_by_category(category)
+        if near_duplicates:
+            similar_projects = [
+                f"{match['project']} ({match['similarity'] * 100:.0f}% similar description)" for match in near_duplicates
+            ] + [project for project in similar_projects if project != "No similar projects found in this category"]
         
         return {
             'percentage': max(0, min(100, originality_score)),
@@ -260,6 +1155,364 @@ class StartupDataAnalyzer:
             'confidence_score': 82
         }
     
+    def _find_near_duplicates(self, startup_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Near-duplicate lookup of the description among other submitted projects"""
+        if not settings.NEAR_DUPLICATE_ENABLED:
+            return []
+        
+        from near_duplicates import description_index
+        return description_index.find(startup_data.get('description', ''), startup_data.get('startup_name'))
+    
+    def _label_id(self, category: str) -> int:
+        """
+        Label id for a category name that is not a main category: companies match a label
+        if any of their categories is that label (case-insensitive); -1 if unknown
+        """
+        if category in self.categories.index or not self.labels.names:
+            return -1
+        return self.labels.lookup(category)
+    
+    def _match_category_ids(self, category: str) -> np.ndarray:
+        """
+        Category ids for a name: the exact match if there is one, otherwise every category
+        sharing at least two words with it (or one word for single-word names)
+        """
+        if category in self.categories.index:
+            return np.array([self.categories.index[category]])
+        
+        # Better fuzzy matching: split on pipes and check individual words
+        category_words = set([word.strip().lower() for word in category.replace('|', ' ').split()])
+        required = min(2, len(category_words))
+        return np.array([
+            i for i, words in enumerate(self.categories.word_sets)
+            if len(category_words.intersection(words)) >= required
+        ], dtype=np.int64)
+    
+    def _funding_year_cumulative(self, category: str) -> Tuple[np.ndarray, int]:
+        """Cumulative first-funding counts per year for a category, and the number of groups matched"""
+        label_id = self._label_id(category)
+        if label_id >= 0:
+            return self.labels.year_cumulative[label_id], 1
+        
+        ids = self._match_category_ids(category)
+        return self.categories.year_cumulative[ids].sum(axis=0), len(ids)
+    
+    @_reads_tables
+    def get_investment_curve(self, category: str, since_year: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Yearly first-funding counts for a category (its label, or summed over fuzzy matches)
+        for charting, with the trend score for the since_year window (default recency
+        windows if omitted)
+        """
+        trend = self._get_category_investment_trend(category, [since_year] if since_year else None)
+        if not self.categories.tables:
+            return {'category': category, 'matched_categories': 0, 'years': [], 'investments': [],
+                    'cumulative': [], 'trend': trend}
+        
+        cumulative, matched = self._funding_year_cumulative(category)
+        investments = np.diff(cumulative, prepend=0)
+        
+        # Only the span of years that has any fundings in the dataset
+        first, last = self._funding_year_span
+        return {
+            'category': category,
+            'matched_categories': matched,
+            'years': FUNDING_YEARS[first:last].tolist(),
+            'investments': investments[first:last].tolist(),
+            'cumulative': cumulative[first:last].tolist(),
+            'trend': trend,
+        }
+    
+    @_reads_tables
+    def get_cohort_curves(self, category: str, success_definition: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Founding-year cohort curves for a category (its label, or summed over fuzzy matches):
+        companies and success rate per founding year, and the distribution of time from
+        founding to first funding. Read from per-category tables built at load, so the cost
+        does not depend on the dataset size.
+        """
+        analyzer = self.for_success_definition(success_definition)
+        if analyzer is not self:
+            return analyzer.get_cohort_curves(category)
+        
+        curves = {
+            'category': category, 'matched_categories': 0, 'years': [], 'companies': [], 'success_rate': [],
+            'funding_delay_days': FUNDING_DELAY_EDGES_DAYS.tolist(),
+            'funding_delay_companies': [0] * len(FUNDING_DELAY_EDGES_DAYS),
+            'funded_within_share': [0.0] * len(FUNDING_DELAY_EDGES_DAYS),
+        }
+        if not self.categories.tables:
+            return curves
+        
+        label_id = self._label_id(category)
+        if label_id >= 0:
+            tables, ids = self.labels, np.array([label_id])
+        else:
+            tables, ids = self.categories, self._match_category_ids(category)
+        companies = tables.cohort_hist[ids].sum(axis=0)
+        successes = tables.cohort_success_hist[ids].sum(axis=0)
+        delays = tables.funding_delay_hist[ids].sum(axis=0)
+        
+        # Only the span of founding years the category has companies in
+        founded = np.flatnonzero(companies)
+        first, last = (int(founded[0]), int(founded[-1]) + 1) if len(founded) else (0, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            success_rate = np.where(companies > 0, successes / companies * 100, np.nan)
+        delay_total = delays.sum()
+        # Share of companies (with both dates) first funded before the next bin edge; the last bin is open-ended
+        if delay_total:
+            curves['funded_within_share'] = (np.cumsum(delays) / delay_total * 100).tolist()
+        
+        curves.update({
+            'matched_categories': len(ids),
+            'years': COHORT_YEARS[first:last].tolist(),
+            'companies': companies[first:last].tolist(),
+            'success_rate': [None if np.isnan(rate) else float(rate) for rate in success_rate[first:last]],
+            'funding_delay_companies': delays.tolist(),
+        })
+        return curves
+    
+    def _build_segment_cube(self, cells: Dict[Tuple[int, str, int], List[float]], remap: np.ndarray):
+        """
+        Build the category x country x founding year cube, plus the rollups used when a cell
+        is too sparse, from the base cells, so lookups are single dict reads.
+        """
+        cube = {}
+        
+        def add(key, count, successes, funding_sum):
+            entry = cube.setdefault(key, [0, 0, 0.0])
+            entry[0] += count
+            entry[1] += successes
+            entry[2] += funding_sum
+        
+        for (cat_id, country, year), (count, successes, funding_sum) in cells.items():
+            cat_id = int(remap[cat_id])
+            year = int(year) or None
+            country = country or None
+            if country and year:
+                add((cat_id, country, year), count, successes, funding_sum)
+                add((None, country, year), count, successes, funding_sum)
+            if country:
+                add((cat_id, country, None), count, successes, funding_sum)
+                add((None, country, None), count, successes, funding_sum)
+            if year:
+                add((cat_id, None, year), count, successes, funding_sum)
+        
+        logger.info(f"Segment cube built with {len(cube)} cells")
+        return {key: (int(count), int(successes), float(funding_sum)) for key, (count, successes, funding_sum) in cube.items()}
+    
+    @_reads_tables
+    def get_segment_stats(self, category: str, country_code: Optional[str] = None,
+                          founded_year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up success and funding statistics for a category within a country and/or founding year.
+        
+        The most specific cell with at least REGION_MIN_CELL_COUNT companies wins, rolling up
+        from (category, country, year) to (category, country) and (category, year). Categories
+        not in the dataset use the country-level cells.
+        
+        Returns:
+            Dict with segment label, count, success_rate and avg_funding, or None if no
+            region or year was given or no cell is dense enough
+        """
+        if not self.segment_cube or (not country_code and not founded_year):
+            return None
+        
+        country = country_code.strip().upper() if country_code else None
+        year = int(founded_year) if founded_year else None
+        cat_id = int(self.get_category_ids([category])[0])
+        
+        candidates = []
+        if cat_id >= 0:
+            if country and year:
+                candidates.append((cat_id, country, year))
+            if country:
+                candidates.append((cat_id, country, None))
+            if year:
+                candidates.append((cat_id, None, year))
+        elif country:
+            if year:
+                candidates.append((None, country, year))
+            candidates.append((None, country, None))
+        
+        for key in candidates:
+            cell = self.segment_cube.get(key)
+            if cell and cell[0] >= settings.REGION_MIN_CELL_COUNT:
+                count, successes, funding_sum = cell
+                parts = [self.categories.names[key[0]] if key[0] is not None else "all categories"]
+                if key[1]:
+                    parts.append(key[1])
+                if key[2]:
+                    parts.append(f"founded {key[2]}")
+                return {
+                    'segment': ", ".join(parts),
+                    'count': count,
+                    'success_rate': successes / count,
+                    'avg_funding': funding_sum / count,
+                }
+        
+        return None
+    
+    @_reads_tables
+    def get_category_ids(self, categories: List[str]) -> np.ndarray:
+        """Map category names to table ids; unknown names map to -1"""
+        return np.array([self.categories.lookup(category) for category in categories], dtype=np.int64)
+    
+    @_reads_tables
+    def score_many(self, category_ids) -> Dict[str, np.ndarray]:
+        """
+        Vectorized scoring for many categories at once.
+        
+        Args:
+            category_ids: Array-like of category ids from get_category_ids (-1 for unknown)
+            
+        Returns:
+            Dict of float arrays aligned with category_ids: category_risk, funding_risk, risk,
+            funding_rank, trend, market_size, growth_rate and uniqueness
+        """
+        ids = np.asarray(category_ids, dtype=np.int64)
+        if not self.categories.tables:
+            return self._get_fallback_scores(len(ids))
+        
+        self._refresh_derived_tables()
+        n = len(self.categories.names)
+        ids = np.where((ids >= 0) & (ids < n), ids, -1)
+        tables = self.categories.tables
+        
+        category_risk = tables['category_risk'][ids]
+        funding_risk = tables['funding_risk'][ids]
+        funding_rank = tables['funding_rank'][ids]
+        trend = tables['trend'][ids]
+        
+        # Overall risk as calculate_risk_score reports it for a category alone: the trained
+        # model's failure probability when there is one (unknown ids keep the table default)
+        risk = np.clip((category_risk + funding_risk) / 2, 0, 100)
+        if self.success_model is not None:
+            known = ids >= 0
+            size = int(known.sum())
+            success_probability = self.success_model.predict_many(
+                [self.categories.names[i] for i in ids[known]], [None] * size, [None] * size, [None] * size, [None] * size
+            )
+            risk[known] = (1 - success_probability) * 100
+        
+        return {
+            'category_risk': category_risk,
+            'funding_risk': funding_risk,
+            'risk': risk,
+            'funding_rank': funding_rank,
+            'trend': trend,
+            'market_size': np.clip(funding_rank * 0.7 + trend * 0.3, 0, 100),
+            'growth_rate': np.clip(trend, 5, 50),
+            'uniqueness': tables['uniqueness'][ids],
+        }
+    
+    def _category_rank_values(self, ids: np.ndarray) -> Dict[str, np.ndarray]:
+        """Values behind each ranking key for the given category ids"""
+        scores = self.score_many(ids)
+        return {
+            'risk': scores['risk'],
+            'market_size': scores['market_size'],
+            'funding': self.categories.tables['funding_sum'][ids],
+            'trend': scores['trend'],
+            'uniqueness': scores['uniqueness'],
+        }
+    
+    def _build_category_rankings(self):
+        """
+        Presort the categories with at least CATEGORY_RANK_MIN_COUNT companies by every
+        ranking key, in both orders (ties keep name order), so a ranking page is a slice
+        """
+        n = len(self.categories)
+        counts = self.categories.tables['count'][:n] if n else np.zeros(0)
+        ids = np.array([
+            i for i in np.flatnonzero(counts >= settings.CATEGORY_RANK_MIN_COUNT) if self.categories.names[i].strip()
+        ], dtype=np.int64)
+        
+        rankings = {}
+        for key, values in self._category_rank_values(ids).items():
+            rankings[key] = {
+                'asc': ids[np.argsort(values, kind='stable')],
+                'desc': ids[np.argsort(-values, kind='stable')],
+            }
+        self._category_rankings = rankings
+        logger.info(f"Category rankings presorted for {len(ids)} categories")
+    
+    @_reads_tables
+    def get_category_ranking(self, sort_by: str = 'risk', order: Optional[str] = None,
+                             offset: int = 0, limit: int = 20,
+                             success_definition: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of categories ranked by risk, market_size, funding (total raised), trend
+        or uniqueness.
+        
+        Rankings are presorted at load and rebuilt once after platform records change the
+        dataset, so a page costs the same at any dataset size. Only categories with at
+        least CATEGORY_RANK_MIN_COUNT companies are ranked.
+        
+        Args:
+            sort_by: Ranking key (see CATEGORY_RANK_ORDERS)
+            order: "asc" or "desc"; defaults to best first (lowest risk, highest otherwise)
+            success_definition: Success definition behind risk (see SUCCESS_DEFINITIONS)
+            
+        Raises:
+            ValueError: for an unknown sort key, order or success definition
+        """
+        analyzer = self.for_success_definition(success_definition)
+        if analyzer is not self:
+            return analyzer.get_category_ranking(sort_by, order, offset, limit)
+        
+        if sort_by not in CATEGORY_RANK_ORDERS:
+            raise ValueError(f"Unknown sort key '{sort_by}'")
+        order = order or CATEGORY_RANK_ORDERS[sort_by]
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unknown order '{order}'")
+        
+        self._refresh_derived_tables()
+        if self._category_rankings is None:
+            self._build_category_rankings()
+        
+        ranked = self._category_rankings[sort_by][order]
+        page = ranked[offset:offset + limit]
+        values = self._category_rank_values(page)
+        tables = self.categories.tables
+        
+        items = []
+        for i, cat_id in enumerate(page.tolist()):
+            count = int(tables['count'][cat_id])
+            items.append({
+                'rank': offset + i + 1,
+                'category': self.categories.names[cat_id],
+                'count': count,
+                'success_rate': float(tables['success_count'][cat_id] / count) if count else 0.0,
+                'risk': float(values['risk'][i]),
+                'market_size': float(values['market_size'][i]),
+                'funding_total': float(values['funding'][i]),
+                'trend': float(values['trend'][i]),
+                'uniqueness': float(values['uniqueness'][i]),
+            })
+        
+        return {
+            'sort_by': sort_by,
+            'order': order,
+            'offset': offset,
+            'limit': limit,
+            'total': len(ranked),
+            'items': items,
+        }
+    
+    def _get_fallback_scores(self, size: int) -> Dict[str, np.ndarray]:
+        """Fallback score arrays when no dataset is loaded"""
+        return {
+            'category_risk': np.full(size, 50.0),
+            'funding_risk': np.full(size, 50.0),
+            'risk': np.full(size, 60.0),
+            'funding_rank': np.full(size, 50.0),
+            'trend': np.full(size, 30.0),
+            'market_size': np.full(size, 55.0),
+            'growth_rate': np.full(size, 10.0),
+            'uniqueness': np.full(size, 50.0),
+        }
+    
     def _get_category_risk_new(self, category: str) -> float:
         """Calculate category-specific risk based on success rates"""
         if not self.success_rates.get('by_category'):
@@ -271,6 +1524,11 @@ class StartupDataAnalyzer:
             risk_percentage = (1 - success_rate) * 100
             return max(0, min(100, risk_percentage))
         
+        # A single category label: success rate over every company carrying it
+        label_id = self._label_id(category)
+        if label_id >= 0:
+            return float(self.labels.tables['category_risk'][label_id])
+        
         # Fallback: Find similar category names (for cases where AI category doesn't exactly match dataset)
         for cat, stats in self.success_rates['by_category'].items():
             if category.lower() in cat.lower() or cat.lower() in category.lower():
@@ -296,217 +1554,214 @@ class StartupDataAnalyzer:
     
     def _get_funding_status_risk(self, category: str) -> float:
         """Calculate funding vs status risk for category"""
-        if self.df.empty:
+        if not self.has_data:
             return 50
         
         # Try exact match first (AI-determined category)
-        exact_match_data = self.df[self.df['main_category'] == category]
+        if category in self.categories.index:
+            return float(self.categories.tables['funding_risk'][self.categories.index[category]])
         
-        if not exact_match_data.empty:
-            category_data = exact_match_data
-        else:
-            # Fallback: fuzzy matching
-            category_data = self.df[
-                self.df['main_category'].str.lower().str.contains(category.lower(), na=False)
-            ]
+        label_id = self._label_id(category)
+        if label_id >= 0:
+            return float(self.labels.tables['funding_risk'][label_id])
         
-        if category_data.empty:
+        # Fallback: fuzzy matching over every matching category
+        ids = self._pattern_match_ids(category)
+        if len(ids) == 0:
             return 50
         
-        # Calculate risk based on funding patterns and status
-        if len(category_data) == 0:
-            return 50
-            
-        funding_median = category_data['funding_total_usd'].median()
-        high_funding_success = category_data[
-            (category_data['funding_total_usd'] > funding_median) &
-            (category_data['is_success'] == True)
-        ]
+        if self._category_funding_offsets is None or self._platform_category_ids.intersection(ids.tolist()):
+            # Streaming mode or platform records involved: the median is resolved on the combined histogram
+            return float(funding_risk_from_histograms(
+                self.categories.funding_hist[ids].sum(axis=0), self.categories.funding_success_hist[ids].sum(axis=0)
+            ))
         
-        total_high_funding = category_data[
-            category_data['funding_total_usd'] > funding_median
-        ]
+        offsets = self._category_funding_offsets
+        funding = np.concatenate([self._category_funding[offsets[i]:offsets[i + 1]] for i in ids])
+        is_success = np.concatenate([self._category_funding_success[offsets[i]:offsets[i + 1]] for i in ids])
         
-        if len(total_high_funding) > 0:
-            success_rate = len(high_funding_success) / len(total_high_funding)
-            risk_percentage = (1 - success_rate) * 100
-            return max(0, min(100, risk_percentage))
+        above = funding > np.median(funding)
+        if not above.any():
+            return 50
         
-        return 50
+        success_rate = is_success[above].sum() / above.sum()
+        risk_percentage = (1 - success_rate) * 100
+        return max(0, min(100, risk_percentage))
+    
+    @_reads_tables
+    def get_funding_position(self, category: str, amount: float) -> Optional[Dict[str, Any]]:
+        """
+        Place a funding amount within a category's funding distribution.
+        
+        Main categories use their exact sorted funding amounts where available; labels,
+        fuzzy matches and categories changed by platform records use the funding histogram
+        CDF. Both are binary searches.
+        
+        Returns:
+            Dict with the matched segment, percentile (share of its companies funded at or
+            below the amount), bin_success_rate (success rate at that funding level) and
+            bin_count, or None if the category is unknown
+        """
+        if not self.has_data or amount is None:
+            return None
+        
+        cat_id = self.categories.lookup(category)
+        if cat_id >= 0:
+            position = self.categories.funding_position(cat_id, amount)
+            if position and self._category_funding_offsets is not None and cat_id not in self._platform_category_ids:
+                start, end = self._category_funding_offsets[cat_id], self._category_funding_offsets[cat_id + 1]
+                at_or_below = np.searchsorted(self._category_funding[start:end], max(0.0, amount), side='right')
+                position['percentile'] = float(at_or_below / (end - start) * 100)
+            segment = self.categories.names[cat_id]
+        else:
+            label_id = self._label_id(category)
+            if label_id >= 0:
+                position = self.labels.funding_position(label_id, amount)
+                segment = self.labels.names[label_id]
+            else:
+                ids = self._pattern_match_ids(category)
+                if len(ids) == 0:
+                    return None
+                hist = self.categories.funding_hist[ids].sum(axis=0)
+                success_hist = self.categories.funding_success_hist[ids].sum(axis=0)
+                percentile = funding_percentile(np.cumsum(hist), amount)
+                if percentile is None:
+                    return None
+                funding_bin = int(funding_bins(np.array([max(0.0, amount)]))[0])
+                position = {
+                    'percentile': percentile,
+                    'bin_success_rate': float(
+                        funding_bin_success_rates(hist, success_hist, self.categories.success_rate)[funding_bin]
+                    ),
+                    'bin_count': int(hist[funding_bin]),
+                }
+                segment = f"{len(ids)} categories matching '{category}'"
+        
+        if position:
+            position['segment'] = segment
+        return position
+    
+    def _pattern_match_ids(self, category: str) -> np.ndarray:
+        """
+        Ids of categories whose lowercased name contains any "|"-separated label of the
+        lowercased input, as plain substrings (user input such as "Health (Digital)" is
+        not read as a regex)
+        """
+        needles = category.lower().split('|')
+        return np.array(
+            [i for i, name in enumerate(self.categories.names_lower) if any(needle in name for needle in needles)],
+            dtype=np.int64
+        )
     
     def _get_category_funding_size(self, category: str) -> float:
         """Calculate market size based on category funding patterns"""
-        if self.df.empty:
+        if not self.has_data:
             logger.warning("_get_category_funding_size: Dataset is empty")
             return 50
         
-        logger.info(f"_get_category_funding_size: Looking for category '{category}'")
+        # A single category label: its funding ranked against every label's total
+        label_id = self._label_id(category)
+        if label_id >= 0:
+            self._refresh_derived_tables()
+            percentile_score = float(self.labels.tables['funding_rank'][label_id])
+            logger.info(f"Category label '{self.labels.names[label_id]}' percentile score: {percentile_score}%")
+            return percentile_score
         
-        # Try exact match first (AI-determined category)
-        exact_match_data = self.df[self.df['main_category'] == category]
-        logger.info(f"Exact match found: {len(exact_match_data)} records")
+        # Exact match first (AI-determined category), otherwise categories sharing words with it
+        ids = self._match_category_ids(category)
+        logger.info(f"_get_category_funding_size: '{category}' matched {len(ids)} categories")
         
-        if not exact_match_data.empty:
-            category_data = exact_match_data
-        else:
-            # Better fuzzy matching: split on pipes and check individual words
-            category_words = set([word.strip().lower() for word in category.replace('|', ' ').split()])
-            
-            # Function to check if category matches
-            def category_matches(row_category):
-                if pd.isna(row_category):
-                    return False
-                row_words = set([word.strip().lower() for word in str(row_category).replace('|', ' ').split()])
-                # Require at least 2 word matches or 1 exact match for broader categories
-                common_words = category_words.intersection(row_words)
-                return len(common_words) >= min(2, len(category_words))
-            
-            # Apply fuzzy matching
-            mask = self.df['main_category'].apply(category_matches)
-            category_data = self.df[mask]
-            logger.info(f"Improved fuzzy match found: {len(category_data)} records")
-        
-        if category_data.empty:
+        if len(ids) == 0:
             logger.warning(f"No data found for category '{category}'")
             return 50
         
         # Calculate funding statistics
-        total_funding = category_data['funding_total_usd'].sum()
+        total_funding = self.categories.tables['funding_sum'][ids].sum()
         logger.info(f"Total funding for category '{category}': ${total_funding:,.2f}")
         
-        # Calculate percentile ranking compared to all categories
-        all_categories = self.df.groupby('main_category')['funding_total_usd'].agg(['sum'])
-        
-        if len(all_categories) == 0:
-            logger.warning("No categories found in dataset")
-            return 50
-        
-        # Rank this category's funding
-        category_rank = (all_categories['sum'] < total_funding).sum() / len(all_categories)
+        # Rank this category's funding against every category's total
+        self._refresh_derived_tables()
+        category_rank = np.searchsorted(self.categories.sorted_funding_sums, total_funding, side='left') / len(self.categories.names)
         percentile_score = max(0, min(100, category_rank * 100))
         
         logger.info(f"Category '{category}' rank: {category_rank:.3f}, percentile score: {percentile_score}%")
         
         # Convert to percentage (0-100)
-        return percentile_score
+        return float(percentile_score)
     
-    def _get_category_investment_trend(self, category: str) -> float:
-        """Calculate investment trend for category"""
-        if self.df.empty:
+    def _get_category_investment_trend(self, category: str, threshold_years: Optional[List[int]] = None) -> float:
+        """
+        Calculate investment trend for category
+        
+        Args:
+            category: Category name; exact match first, then a category label, otherwise
+                fuzzy word matching
+            threshold_years: Optional recency windows (first funding on or after Jan 1st of
+                each year), tried in order; defaults to RECENT_FUNDING_THRESHOLD_YEARS
+        """
+        if not self.categories.tables:
             logger.warning("_get_category_investment_trend: Dataset is empty")
             return 50
         
-        logger.info(f"_get_category_investment_trend: Looking for category '{category}'")
-        
-        # Try exact match first (AI-determined category)
-        exact_match_data = self.df[
-            (self.df['main_category'] == category) &
-            (self.df['first_funding_at'].notna())
-        ]
-        logger.info(f"Exact match with funding dates: {len(exact_match_data)} records")
-        
-        if not exact_match_data.empty:
-            category_data = exact_match_data
-        else:
-            # Better fuzzy matching: split on pipes and check individual words
-            category_words = set([word.strip().lower() for word in category.replace('|', ' ').split()])
-            
-            # Function to check if category matches
-            def category_matches(row_category):
-                if pd.isna(row_category):
-                    return False
-                row_words = set([word.strip().lower() for word in str(row_category).replace('|', ' ').split()])
-                # Require at least 2 word matches or 1 exact match for broader categories
-                common_words = category_words.intersection(row_words)
-                return len(common_words) >= min(2, len(category_words))
-            
-            # Apply fuzzy matching with funding date filter
-            mask = (
-                self.df['main_category'].apply(category_matches) & 
-                self.df['first_funding_at'].notna()
-            )
-            category_data = self.df[mask]
-            logger.info(f"Improved fuzzy match with funding dates: {len(category_data)} records")
+        cumulative, matched = self._funding_year_cumulative(category)
+        logger.info(f"_get_category_investment_trend: '{category}' matched {matched} categories, "
+                    f"{int(cumulative[-1]) if len(cumulative) else 0} dated fundings")
         
-        if category_data.empty:
+        if matched == 0 or cumulative[-1] == 0:
             logger.warning(f"No funding data found for category '{category}', returning 30%")
             return 30  # Lower trend for categories with no recent activity
         
-        # Calculate trend based on recent funding activity
-        # Try different recent thresholds to find meaningful data
-        recent_thresholds = ['2020-01-01', '2018-01-01', '2015-01-01', '2010-01-01']
-        trend_score = 30  # Default
-        
-        for threshold in recent_thresholds:
-            recent_data = category_data[
-                category_data['first_funding_at'] >= threshold
-            ]
-            
-            logger.info(f"Recent data ({threshold}+): {len(recent_data)} out of {len(category_data)} total records")
-            
-            if len(recent_data) > 0:
-                # Higher recent activity = higher trend score
-                recent_ratio = len(recent_data) / len(category_data)
-                trend_score = max(0, min(100, recent_ratio * 100))
-                logger.info(f"Using threshold {threshold}: recent ratio: {recent_ratio:.3f}, trend score: {trend_score}%")
-                break
-        
-        if trend_score == 30:
-            logger.info("No recent funding activity found in any threshold, returning 30%")
-        
-        return trend_score
+        return trend_from_cumulative(cumulative, threshold_years)
     
     def _get_category_uniqueness(self, category: str) -> float:
         """Calculate category uniqueness based on frequency"""
-        if self.df.empty:
+        if not self.has_data:
             return 50
         
-        # Get category frequency
-        category_counts = self.df['main_category'].value_counts()
-        total_companies = len(self.df)
+        counts = self.categories.tables['count']
         
         # Try exact match first (AI-determined category)
-        if category in category_counts:
-            category_count = category_counts[category]
+        if category in self.categories.index:
+            category_count = counts[self.categories.index[category]]
+        elif self._label_id(category) >= 0:
+            # A single category label: every company carrying it
+            category_count = self.labels.tables['count'][self._label_id(category)]
         else:
-            # Fallback: find similar category
-            category_count = 0
-            for cat, count in category_counts.items():
-                if category.lower() in cat.lower() or cat.lower() in category.lower():
-                    category_count = count
-                    break
+            # Fallback: most frequent category containing (or contained in) the name
+            needle = category.lower()
+            matches = [
+                i for i, name in enumerate(self.categories.names_lower) if needle in name or name in needle
+            ]
+            category_count = counts[matches].max() if matches else 0
         
         if category_count == 0:
             return 95  # Very unique if not found in dataset
         
         # Calculate uniqueness (inverse of frequency)
-        frequency_percentage = (category_count / total_companies) * 100
+        frequency_percentage = (category_count / self.total_rows) * 100
         uniqueness = max(0, min(100, 100 - frequency_percentage * 2))  # Scale uniqueness
         
-        return uniqueness
+        return float(uniqueness)
     
     def _find_similar_projects_by_category(self, category: str) -> List[str]:
         """Find similar projects based on category"""
-        if self.df.empty:
+        if not self.has_data:
             return ["No similar projects found"]
         
         # Try exact match first (AI-determined category)
-        exact_match_data = self.df[self.df['main_category'] == category].head(3)
-        
-        if not exact_match_data.empty:
-            category_data = exact_match_data
+        if category in self.categories.index:
+            examples = self.categories.examples.get(self.categories.index[category], [])
+        elif self._label_id(category) >= 0:
+            examples = self.labels.examples.get(self._label_id(category), [])
         else:
-            # Fallback: fuzzy matching
-            category_data = self.df[
-                self.df['main_category'].str.lower().str.contains(category.lower(), na=False)
-            ].head(3)
-        
-        similar = []
-        for _, project in category_data.iterrows():
-            name = project.get('name', 'Unknown Company')
-            status = project.get('status', 'Unknown')
-            similar.append(f"{name} - {status}")
+            # Fallback: fuzzy matching, earliest examples across matching categories
+            examples = sorted(
+                example
+                for cat_id in self._pattern_match_ids(category)
+                for example in self.categories.examples.get(int(cat_id), [])
+            )
         
+        similar = [label for _, label in examples[:3]]
         return similar or ["No similar projects found in this category"]
     
     def _get_fallback_risk(self) -> Dict[str, Any]:
@@ -539,52 +1794,69 @@ class StartupDataAnalyzer:
             'confidence_score': 50
         }
     
+    @_reads_tables
     def get_available_categories(self) -> List[str]:
-        """Get list of available categories for frontend validation"""
-        if self.df.empty:
-            return [
+        """Get list of available categories for frontend validation (sorted once per dataset version)"""
+        return self._get_category_listing()[0]
+    
+    @_reads_tables
+    def search_categories(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Categories starting with prefix (case-insensitive), in alphabetical order, for typeahead.
+        Binary search over the presorted lowercase names, so the cost is O(log n + limit).
+        """
+        _, keys, names = self._get_category_listing()
+        prefix = prefix.strip().lower()
+        start = bisect.bisect_left(keys, prefix)
+        matches = []
+        for i in range(start, min(start + limit, len(keys))):
+            if not keys[i].startswith(prefix):
+                break
+            matches.append(names[i])
+        return matches
+    
+    def _get_category_listing(self) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Category names sorted as listed, plus lowercase keys and names sorted by those keys
+        for prefix search; rebuilt only after platform records change the dataset.
+        """
+        listing = self._category_listing
+        if listing is not None and self._category_listing_version == self.dataset_version:
+            return listing
+        
+        version = self.dataset_version
+        if not self.has_data:
+            categories = [
                 "Technology", "Healthcare", "Finance", "E-commerce", "Education",
                 "Entertainment", "Food & Beverage", "Transportation", "Real Estate",
                 "Energy", "Manufacturing", "Agriculture", "Marketing", "Security"
             ]
-        
-        # Get unique categories from dataset
-        categories = self.df['main_category'].dropna().unique().tolist()
-        
-        # Clean and sort categories
-        categories = [cat.strip() for cat in categories if cat.strip()]
-        categories.sort()
-        
-        return categories
+        else:
+            # Clean and sort categories
+            categories = sorted(set(cat.strip() for cat in self.categories.names if cat.strip()))
+        
+        keyed = sorted((name.lower(), name) for name in categories)
+        listing = (categories, [key for key, _ in keyed], [name for _, name in keyed])
+        self._category_listing = listing
+        self._category_listing_version = version
+        return listing
 
+    @_reads_tables
     def get_all_categories_for_matching(self) -> List[str]:
-        """Get all available categories from dataset for AI category matching"""
-        if self.df.empty:
-            return [
-                "Technology", "Healthcare", "Finance", "E-commerce", "Education",
-                "Entertainment", "Food & Beverage", "Transportation", "Real Estate",
-                "Energy", "Manufacturing", "Agriculture", "Marketing", "Security",
-                "Software", "Internet", "Mobile", "Biotechnology", "Clean Technology",
-                "Financial Services", "Media", "Games", "Social Media", "Artificial Intelligence"
-            ]
-        
-        # Get unique categories from dataset with more comprehensive coverage
-        categories = self.df['main_category'].dropna().unique().tolist()
-        
-        # Also get from category_list for more comprehensive categories
-        if 'category_list' in self.df.columns:
-            all_category_lists = self.df['category_list'].dropna().tolist()
-            for category_list in all_category_lists:
-                if category_list and isinstance(category_list, str):
-                    individual_cats = [cat.strip() for cat in category_list.split(',')]
-                    categories.extend(individual_cats)
-        
-        # Clean, deduplicate and sort categories
-        categories = list(set([cat.strip() for cat in categories if cat.strip()]))
-        categories.sort()
-        
-        logger.info(f"Total available categories for matching: {len(categories)}")
-        return categories
+        """Get all available categories from dataset for AI category matching (computed once)"""
+        if self._matching_categories is None:
+            self._matching_categories = self._collect_categories_for_matching()
+        return self._matching_categories
+    
+    def _collect_categories_for_matching(self) -> List[str]:
+        """Category vocabulary used for AI category matching when no dataset is loaded"""
+        return [
+            "Technology", "Healthcare", "Finance", "E-commerce", "Education",
+            "Entertainment", "Food & Beverage", "Transportation", "Real Estate",
+            "Energy", "Manufacturing", "Agriculture", "Marketing", "Security",
+            "Software", "Internet", "Mobile", "Biotechnology", "Clean Technology",
+            "Financial Services", "Media", "Games", "Social Media", "Artificial Intelligence"
+        ]
 
 # Global instance
 startup_analyzer = StartupDataAnalyzer() 
\ No newline at end of file
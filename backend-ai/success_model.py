@@ -0,0 +1,264 @@
+import argparse
+import logging
+import math
+from bisect import bisect_right
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from dataset_aggregates import FUNDING_BIN_COUNT, FUNDING_BIN_EDGES, FUNDING_YEAR_MAX, funding_bins
+
+logger = logging.getLogger(__name__)
+
+# Funding rounds are clipped to this many; bucket 0 holds unknown round counts
+MAX_ROUNDS = 10
+
+# Founding year buckets: 0 unknown, 1 before the first edge, then one bucket per 5 years
+FOUNDED_YEAR_EDGES = np.arange(1970, FUNDING_YEAR_MAX + 5, 5)
+
+def _round_buckets(rounds: np.ndarray) -> np.ndarray:
+    rounds = np.asarray(rounds, dtype=float)
+    return np.where(np.isnan(rounds), 0, np.clip(np.nan_to_num(rounds), 0, MAX_ROUNDS) + 1).astype(np.int64)
+
+def _year_buckets(years: np.ndarray) -> np.ndarray:
+    years = np.nan_to_num(np.asarray(years, dtype=float))
+    return np.where(years > 0, np.searchsorted(FOUNDED_YEAR_EDGES, years, side='right') + 1, 0).astype(np.int64)
+
+class SuccessModel:
+    """
+    Logistic success model exported as additive lookup tables.
+
+    The success logit of a company is the intercept plus one weight per feature: its main
+    category, funding bin, funding rounds bucket, country and founding year bucket
+    (categories and countries too rare to get their own weight share entry 0). Scoring
+    is a handful of array lookups and needs NumPy only.
+    """
+
+    def __init__(self, intercept: float, weights: Dict[str, np.ndarray], categories: Iterable[str],
+                 countries: Iterable[str]):
+        self.intercept = float(intercept)
+        # A model trained in an earlier calendar year has fewer founding year buckets; its last
+        # bucket already covered every later year
+        missing_years = len(FOUNDED_YEAR_EDGES) + 2 - len(weights['year'])
+        if missing_years > 0:
+            weights = dict(weights, year=np.pad(weights['year'], (0, missing_years), mode='edge'))
+        self.weights = weights
+        self.categories = list(categories)
+        self.countries = list(countries)
+        # Entry 0 of the category and country weights is the shared "other" entry
+        self._category_index = {name: i + 1 for i, name in enumerate(self.categories)}
+        self._category_index_lower = {name.lower(): i + 1 for i, name in reversed(list(enumerate(self.categories)))}
+        self._country_index = {code: i + 1 for i, code in enumerate(self.countries)}
+        
+        # Plain lists for single predictions, which skip array construction
+        self._weight_lists = {name: values.tolist() for name, values in weights.items()}
+        self._funding_edges = FUNDING_BIN_EDGES.tolist()
+        self._year_edges = FOUNDED_YEAR_EDGES.tolist()
+
+    def _category_code(self, category: str) -> int:
+        """Weight entry of a category: exact name first, then case-insensitive, else "other" """
+        return self._category_index.get(category) or self._category_index_lower.get(str(category).strip().lower(), 0)
+
+    def _category_codes(self, categories: Iterable[str]) -> np.ndarray:
+        return np.array([self._category_code(name) for name in categories], dtype=np.int64)
+
+    def _country_codes(self, countries: Iterable[Optional[str]]) -> np.ndarray:
+        return np.array([
+            self._country_index.get(str(code).strip().upper(), 0) if code else 0 for code in countries
+        ], dtype=np.int64)
+
+    def predict_many(self, categories: Iterable[str], funding: Iterable[Optional[float]],
+                     rounds: Iterable[Optional[float]], countries: Iterable[Optional[str]],
+                     founded_years: Iterable[Optional[int]]) -> np.ndarray:
+        """
+        Success probabilities for aligned sequences of inputs; None marks an unknown value
+        (unknown funding counts as zero, as in the dataset)
+        """
+        funding = np.array([np.nan if value is None else value for value in funding], dtype=float)
+        rounds = np.array([np.nan if value is None else value for value in rounds], dtype=float)
+        years = np.array([0 if value is None else value for value in founded_years], dtype=float)
+
+        logit = (
+            self.intercept
+            + self.weights['category'][self._category_codes(categories)]
+            + self.weights['funding'][funding_bins(np.nan_to_num(funding))]
+            + self.weights['rounds'][_round_buckets(rounds)]
+            + self.weights['country'][self._country_codes(countries)]
+            + self.weights['year'][_year_buckets(years)]
+        )
+        return 1 / (1 + np.exp(-logit))
+
+    def predict(self, category: str, funding: Optional[float] = None, rounds: Optional[float] = None,
+                country: Optional[str] = None, founded_year: Optional[int] = None) -> float:
+        """Success probability of one company (same result as predict_many, without NumPy overhead)"""
+        weights = self._weight_lists
+        category_code = self._category_code(category)
+        rounds_bucket = 0 if rounds is None or math.isnan(rounds) else int(min(max(rounds, 0), MAX_ROUNDS)) + 1
+        year_bucket = bisect_right(self._year_edges, founded_year) + 1 if founded_year and founded_year > 0 else 0
+        country_code = self._country_index.get(str(country).strip().upper(), 0) if country else 0
+
+        logit = (
+            self.intercept
+            + weights['category'][category_code]
+            + weights['funding'][bisect_right(self._funding_edges, funding or 0) - 1]
+            + weights['rounds'][rounds_bucket]
+            + weights['country'][country_code]
+            + weights['year'][year_bucket]
+        )
+        return 1 / (1 + math.exp(-logit))
+
+    def to_arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        """The model as named arrays (see from_arrays)"""
+        arrays = {
+            'intercept': np.array(self.intercept),
+            'categories': np.array(self.categories, dtype=str),
+            'countries': np.array(self.countries, dtype=str),
+        }
+        arrays.update({f"weights_{name}": values for name, values in self.weights.items()})
+        return {f"{prefix}{key}": values for key, values in arrays.items()}
+
+    @classmethod
+    def from_arrays(cls, data, prefix: str = "") -> 'SuccessModel':
+        weight_prefix = f"{prefix}weights_"
+        weights = {key[len(weight_prefix):]: data[key] for key in data.files if key.startswith(weight_prefix)}
+        return cls(
+            float(data[f"{prefix}intercept"]), weights,
+            data[f"{prefix}categories"].tolist(), data[f"{prefix}countries"].tolist()
+        )
+
+    def save(self, path: str):
+        np.savez_compressed(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path: str) -> 'SuccessModel':
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays(data)
+
+class SuccessModelTrainer:
+    """
+    Collects training data for SuccessModel one preprocessed frame at a time.
+
+    Rows are reduced to feature cells with success and failure counts, so the fit runs on
+    weighted cells instead of every row, and streaming chunks can be folded in as they come.
+    """
+
+    def __init__(self, success_column: str = 'is_success'):
+        # Preprocessed column counted as success (see dataset_preprocessing.success_column)
+        self.success_column = success_column
+        # (main category, funding bin, rounds bucket, country, year bucket) -> [successes, failures]
+        self.cells: Dict[Tuple[str, int, int, str, int], list] = {}
+
+    def add_frame(self, frame):
+        """Fold preprocessed rows (see dataset_preprocessing.preprocess_frame) into the training cells"""
+        import pandas as pd
+
+        if frame.empty:
+            return
+
+        is_success = frame[self.success_column].to_numpy(dtype=bool)
+        cells = pd.DataFrame({
+            'category': frame['main_category'].to_numpy(),
+            'funding': funding_bins(frame['funding_total_usd'].to_numpy(dtype=float)),
+            'rounds': _round_buckets(pd.to_numeric(frame['funding_rounds'], errors='coerce').to_numpy(dtype=float)),
+            'country': frame['country_code'].astype(object).fillna('').astype(str).str.strip().str.upper().to_numpy(),
+            'year': _year_buckets(frame['founded_at'].dt.year.to_numpy(dtype=float)),
+            'success': is_success,
+            'fail': ~is_success,
+        })
+        grouped = cells.groupby(['category', 'funding', 'rounds', 'country', 'year'])[['success', 'fail']].sum()
+        for key, successes, failures in zip(grouped.index, grouped['success'], grouped['fail']):
+            cell = self.cells.setdefault(key, [0, 0])
+            cell[0] += int(successes)
+            cell[1] += int(failures)
+
+    def fit(self, min_count: int = 20, regularization: float = 1.0) -> Optional[SuccessModel]:
+        """
+        Fit an L2-regularized logistic regression on the one-hot encoded cells.
+
+        Args:
+            min_count: Companies a category or country needs for its own weight
+            regularization: Inverse regularization strength (scikit-learn's C)
+
+        Returns:
+            The exported model, or None if there is nothing to learn from
+        """
+        if not self.cells:
+            return None
+
+        from scipy import sparse
+        from sklearn.linear_model import LogisticRegression
+
+        # Sorted, so the fit does not depend on how the data was chunked
+        keys = sorted(self.cells)
+        counts = np.array([self.cells[key] for key in keys], dtype=float)
+        if counts[:, 0].sum() == 0 or counts[:, 1].sum() == 0:
+            logger.warning("Success model not trained: the data has a single outcome")
+            return None
+
+        def frequent(position: int):
+            totals = {}
+            for key, (successes, failures) in zip(keys, counts):
+                if key[position]:
+                    totals[key[position]] = totals.get(key[position], 0) + successes + failures
+            return sorted(value for value, total in totals.items() if total >= min_count)
+
+        categories, countries = frequent(0), frequent(3)
+        category_index = {name: i + 1 for i, name in enumerate(categories)}
+        country_index = {code: i + 1 for i, code in enumerate(countries)}
+
+        # One-hot blocks, in the order of the exported weight tables
+        blocks = [
+            ('category', len(categories) + 1, [category_index.get(key[0], 0) for key in keys]),
+            ('funding', FUNDING_BIN_COUNT, [key[1] for key in keys]),
+            ('rounds', MAX_ROUNDS + 2, [key[2] for key in keys]),
+            ('country', len(countries) + 1, [country_index.get(key[3], 0) for key in keys]),
+            ('year', len(FOUNDED_YEAR_EDGES) + 2, [key[4] for key in keys]),
+        ]
+        columns, offset = [], 0
+        for _, size, codes in blocks:
+            columns.append(np.asarray(codes, dtype=np.int64) + offset)
+            offset += size
+        columns = np.stack(columns, axis=1)
+
+        # Each cell becomes a success row and a failure row weighted by their counts
+        rows = np.repeat(np.arange(len(keys)), columns.shape[1])
+        features = sparse.csr_matrix((np.ones(rows.size), (rows, columns.ravel())), shape=(len(keys), offset))
+        X = sparse.vstack([features, features]).tocsr()
+        y = np.concatenate([np.ones(len(keys)), np.zeros(len(keys))])
+        sample_weight = np.concatenate([counts[:, 0], counts[:, 1]])
+        keep = sample_weight > 0
+
+        classifier = LogisticRegression(C=regularization, max_iter=1000)
+        classifier.fit(X[keep], y[keep], sample_weight=sample_weight[keep])
+
+        coefficients, weights, offset = classifier.coef_[0], {}, 0
+        for name, size, _ in blocks:
+            weights[name] = coefficients[offset:offset + size].copy()
+            offset += size
+
+        logger.info(
+            f"Success model trained on {int(counts.sum())} companies in {len(keys)} cells: "
+            f"{len(categories)} categories, {len(countries)} countries, {offset} weights"
+        )
+        return SuccessModel(float(classifier.intercept_[0]), weights, categories, countries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the success model on the Crunchbase dataset and export it")
+    parser.add_argument("--output", default="success_model.npz", help="Path of the exported model (.npz)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from config import settings
+
+    # Train from the dataset even if a previously exported model is configured
+    settings.SUCCESS_MODEL_ENABLED = True
+    settings.SUCCESS_MODEL_PATH = ""
+    from startup_data_analyzer import startup_analyzer
+
+    if startup_analyzer.success_model is None:
+        raise SystemExit("Success model could not be trained (dataset unavailable)")
+    startup_analyzer.success_model.save(args.output)
+    logger.info(f"Success model written to {args.output}")
+
+if __name__ == "__main__":
+    main()